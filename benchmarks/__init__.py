@@ -0,0 +1,9 @@
+"""
+性能基准测试
+在 SDL dummy 视频驱动下测量绘制帧率和核心逻辑吞吐量，结果保存为 JSON，
+并与保存的基线比较，便于发现性能回退。
+
+用法：python -m benchmarks.run [--quick] [--save-baseline]
+      python -m benchmarks.memory  # 长时间对局的内存分配检查
+      python -m benchmarks.roundtrip  # 保存后重新读取、录制后回放的一致性检查
+"""
@@ -0,0 +1,119 @@
+"""
+逻辑基准
+出题、GameState 逻辑步和保存对局结果的吞吐量
+"""
+import os
+import tempfile
+import time
+from benchmarks.timing import measure, measure_timed
+
+
+def bench_generate(difficulty: str, min_time: float = 0.5) -> float:
+    """QuestionGenerator.generate 每秒出题数"""
+    import random
+    from core.question_generator import QuestionGenerator
+    
+    generator = QuestionGenerator(difficulty=difficulty, rng=random.Random(0))
+    generator.generate()  # 首次调用时枚举题目表，不计入
+    return measure(generator.generate, min_time)
+
+
+def bench_game_state_update(min_time: float = 0.5) -> float:
+    """GameState.update 每秒逻辑步数（含生成怪兽）"""
+    from core.game_state import GameState
+    from core.rules import GameRules
+    
+    # 堆叠上限设为极大值，避免游戏结束
+    state = GameState(GameRules.create_settings(max_stack=10 ** 9))
+    state.start_game()
+    return measure(lambda: state.update(1 / 60), min_time)
+
+
+def _game_stats(index: int) -> dict:
+    return {
+        'session_id': f'bench-{index}',
+        'score': index % 500,
+        'correct_count': 20,
+        'wrong_count': 5,
+        'total_questions': 25,
+        'accuracy': 80.0,
+        'elapsed_time': 60.0,
+        'max_combo': 7,
+        'difficulty': 'basic'
+    }
+
+
+def bench_save_json(min_time: float = 0.5) -> float:
+    """
+    RecordManager.save_game_result 每秒保存数（默认的 JSON 快照加追加日志存储；
+    写盘在后台线程中进行，这里计的是主线程的耗时）
+    不按对局数分档：JSON 存储只保留最近 HISTORY_LIMIT 局和各榜前 K 名，更早的对局只计入总计，
+    日志也会定期压缩，保存的数据量与对局总数无关。历史记录预先填满，测的是稳定状态
+    """
+    from storage.backends import HISTORY_LIMIT
+    from storage.records import RecordManager
+    
+    with tempfile.TemporaryDirectory() as directory:
+        manager = RecordManager(os.path.join(directory, 'records.json'))
+        template = _game_stats(0)
+        manager.records['history'] = [dict(template, timestamp='')] * HISTORY_LIMIT
+        counter = [0]
+        
+        def step() -> float:
+            counter[0] += 1
+            start = time.perf_counter()
+            manager.save_game_result(_game_stats(counter[0]), 'normal')
+            return time.perf_counter() - start
+        
+        result = measure_timed(step, min_time)
+        manager.close()
+    return result
+
+
+def bench_save_sqlite(history_size: int, min_time: float = 0.5) -> float:
+    """
+    SQLiteRecordManager.save_game_result 每秒保存数
+    :param history_size: 数据库中已有的对局数
+    """
+    from storage.sqlite_records import SQLiteRecordManager
+    
+    with tempfile.TemporaryDirectory() as directory:
+        manager = SQLiteRecordManager(os.path.join(directory, 'records.db'), import_from=None)
+        with manager.conn:
+            for index in range(history_size):
+                record = _game_stats(index)
+                record['timestamp'] = f'2026-01-01T00:00:{index:07d}'
+                record['speed_mode'] = 'normal'
+                manager._insert(record)
+        counter = [history_size]
+        
+        def step() -> float:
+            counter[0] += 1
+            start = time.perf_counter()
+            manager.save_game_result(_game_stats(counter[0]), 'normal')
+            return time.perf_counter() - start
+        
+        result = measure_timed(step, min_time)
+        manager.close()
+    return result
+
+
+def benchmarks(quick: bool = False) -> list:
+    """
+    本模块的基准列表
+    :return: [(名称, 单位, 无参函数)]
+    """
+    min_time = 0.2 if quick else 0.5
+    cases = [
+        ('question_generator.generate[basic]', 'ops/s',
+         lambda: bench_generate('basic', min_time)),
+        ('question_generator.generate[advanced]', 'ops/s',
+         lambda: bench_generate('advanced', min_time)),
+        ('game_state.update', 'ticks/s', lambda: bench_game_state_update(min_time)),
+    ]
+    cases.append(('record_manager.save[json]', 'ops/s', lambda: bench_save_json(min_time)))
+    sizes = (100, 10_000) if quick else (100, 10_000, 1_000_000)
+    for size in sizes:
+        cases.append((f'record_manager.save[sqlite,{size}]', 'ops/s',
+                      lambda size=size: bench_save_sqlite(size, min_time)))
+    return cases
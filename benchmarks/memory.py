@@ -0,0 +1,134 @@
+"""
+内存检查
+长时间运行无界面对局（逻辑更新加绘制，机器人按固定节奏答题），
+用 tracemalloc 检查稳定状态下实体相关代码是否还在分配内存：
+净增长应为 0，每帧的临时分配峰值应很小，且不应触发 0 代垃圾回收。
+
+用法：python -m benchmarks.memory [--frames 10000]
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import tracemalloc
+from typing import List
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+
+
+SCREEN_SIZE = (1000, 800)
+
+# 实体池和每帧更新、绘制所在的文件（只检查这些文件中的净增长）
+ENTITY_FILES = ('ui/entities.py', 'ui/game_view.py', 'ui/particles.py')
+
+# 实体代码允许的净增长（字节）：快照时屏幕上的子弹和脏矩形数量不同会带来少量波动，
+# 泄漏则会随帧数线性增长
+GROWTH_LIMIT = 1024
+
+# 机器人每隔多少帧答一题，以及答对的概率（场上保持有怪兽、子弹和消除动画，对局不会结束）
+ANSWER_EVERY = 30
+ACCURACY = 0.95
+
+
+def run_session(frames: int = 10000, warmup: int = 6000, seed: int = 0) -> dict:
+    """
+    运行一局长时间的对局并统计内存分配
+    :param frames: 计入统计的帧数（每帧一次逻辑更新和一次绘制）
+    :param warmup: 预热帧数（填满文本缓存，之后缓存只替换不增长）
+    :return: 统计结果
+    """
+    from core.rules import GameRules
+    from ui.fonts import get_text_cache
+    from ui.game_view import GameView
+    
+    pygame.init()
+    screen = pygame.display.set_mode(SCREEN_SIZE)
+    view = GameView(screen, GameRules.create_settings(), seed=seed)
+    rng = random.Random(seed)
+    
+    def frame(index: int):
+        view.update(1 / 60)
+        if index % ANSWER_EVERY == 0 and not view.is_game_over():
+            # 直接提交答案，不经过 press_key（回放记录的按键会随对局增长，不属于检查范围）
+            question = view.game_state.current_question
+            answer = question.answer if rng.random() < ACCURACY else question.answer + 1
+            view.user_input = str(answer)
+            view._submit_answer()
+        view.draw(0.5)
+    
+    # 预热时就开始跟踪：缓存淘汰的旧条目也要被跟踪到，替换才不会被误算成增长
+    tracemalloc.start()
+    for index in range(warmup):
+        frame(index)
+    
+    # 文本缓存中的字符串由界面代码创建、被缓存持有（有上限），两次快照前都清空，不计入增长
+    text_cache = get_text_cache()
+    text_cache.clear()
+    gc.collect()
+    before = tracemalloc.take_snapshot()
+    collections = gc.get_stats()[0]['collections']
+    peaks = []
+    for index in range(warmup, warmup + frames):
+        tracemalloc.reset_peak()
+        current = tracemalloc.get_traced_memory()[0]
+        frame(index)
+        peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    collections = gc.get_stats()[0]['collections'] - collections
+    text_cache.clear()
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    
+    growth = after.compare_to(before, 'lineno')
+    entity_growth = [stat for stat in growth
+                     if stat.size_diff and _is_entity_file(stat.traceback[0].filename)]
+    return {
+        'frames': frames,
+        'game_over': view.is_game_over(),
+        'gen0_collections': collections,
+        'mean_frame_peak': sum(peaks) / len(peaks),
+        'max_frame_peak': max(peaks),
+        'total_growth': sum(stat.size_diff for stat in growth),
+        'entity_growth': sum(stat.size_diff for stat in entity_growth),
+        'entity_growth_lines': [str(stat) for stat in entity_growth[:10]],
+        'top_growth_lines': [str(stat) for stat in growth[:5]],
+    }
+
+
+def _is_entity_file(filename: str) -> bool:
+    filename = filename.replace(os.sep, '/')
+    return any(filename.endswith(name) for name in ENTITY_FILES)
+
+
+def main(argv: List[str] = None) -> int:
+    """命令行入口：实体代码净增长超过上限时返回 1"""
+    parser = argparse.ArgumentParser(description='速算闯关内存检查')
+    parser.add_argument('--frames', type=int, default=10000, help='计入统计的帧数')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子')
+    args = parser.parse_args(argv)
+    
+    result = run_session(args.frames, seed=args.seed)
+    print(f"帧数 {result['frames']}（对局{'已' if result['game_over'] else '未'}结束）")
+    print(f"0 代垃圾回收次数: {result['gen0_collections']}")
+    print(f"单帧临时分配峰值: 平均 {result['mean_frame_peak']:,.0f} B，最大 {result['max_frame_peak']:,} B")
+    print(f"总净增长: {result['total_growth']:,} B")
+    for line in result['top_growth_lines']:
+        print(f"    {line}")
+    print(f"实体代码净增长: {result['entity_growth']:,} B")
+    for line in result['entity_growth_lines']:
+        print(f"    {line}")
+    
+    if result['game_over']:
+        print("对局提前结束，统计不完整")
+        return 1
+    if result['entity_growth'] > GROWTH_LIMIT:
+        print(f"实体代码净增长超过 {GROWTH_LIMIT} B")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+绘制基准
+GameView.draw（不同数量的怪兽，子弹持续飞行）、粒子系统满负载和 MainMenu.draw（悬停、选中状态切换）
+"""
+import os
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+from benchmarks.timing import measure_timed
+
+
+SCREEN_SIZE = (1000, 800)
+
+# 每隔多少帧发射一颗子弹（子弹飞行约 0.5 秒，同时有 3 颗左右在飞）
+BULLET_EVERY = 10
+
+# 粒子基准每帧爆发的次数（足以让粒子数维持在预算附近）
+PARTICLE_BURSTS = 6
+
+
+def _screen() -> pygame.Surface:
+    pygame.init()
+    return pygame.display.set_mode(SCREEN_SIZE)
+
+
+def bench_game_view(obstacles: int, min_time: float = 0.5) -> float:
+    """
+    游戏界面绘制帧率（只计 draw 的耗时，不计逻辑更新）
+    :param obstacles: 场上怪兽数量
+    """
+    from core.rules import GameRules
+    from ui.game_view import GameView
+    
+    # 生成间隔设为极大值，怪兽数量保持不变
+    settings = GameRules.create_settings(max_stack=max(10, obstacles), spawn_interval_base=1e9)
+    view = GameView(_screen(), settings, seed=0)
+    for _ in range(obstacles):
+        view._spawn_obstacle()
+    frame = [0]
+    
+    def step() -> float:
+        frame[0] += 1
+        if frame[0] % BULLET_EVERY == 0:
+            # 瞄准最后一只怪兽（没有怪兽时瞄准第一只的位置）
+            if view.obstacles:
+                view._fire_bullet(view.obstacles['target_x'][-1], view.obstacles['target_y'][-1])
+            else:
+                view._fire_bullet(view.obstacle_area_x, view.obstacle_start_y)
+        view.update(1 / 60)
+        start = time.perf_counter()
+        view.draw(0.5)
+        return time.perf_counter() - start
+    
+    return measure_timed(step, min_time)
+
+
+def bench_main_menu(mode: str, min_time: float = 0.5) -> float:
+    """
+    主菜单绘制帧率（只计 draw 的耗时）
+    :param mode: 'redraw' 每帧整屏重绘；'hover' 鼠标在两个按钮间来回移动；
+        'select' 交替点击运算类型按钮
+    """
+    from ui.main_menu import MainMenu
+    
+    menu = MainMenu(_screen())
+    buttons = list(menu.op_buttons.values())
+    frame = [0]
+    
+    def step() -> float:
+        frame[0] += 1
+        pos = buttons[frame[0] % 2].rect.center
+        if mode == 'redraw':
+            menu.invalidate()
+        elif mode == 'hover':
+            menu.handle_event(pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(0, 0),
+                                                 buttons=(0, 0, 0)))
+        else:
+            menu.handle_event(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1))
+        start = time.perf_counter()
+        menu.draw()
+        return time.perf_counter() - start
+    
+    return measure_timed(step, min_time)
+
+
+def bench_particles(min_time: float = 0.5) -> float:
+    """
+    粒子系统满负载时的帧率（计更新和绘制）
+    每帧在场中爆发多次，粒子数一直维持在预算附近
+    """
+    import numpy as np
+    from ui.particles import ParticleSystem
+    
+    screen = _screen()
+    particles = ParticleSystem(rng=np.random.default_rng(0))
+    
+    def step() -> float:
+        for _ in range(PARTICLE_BURSTS):
+            particles.emit('explosion', 250, 400, (255, 100, 100))
+        particles.emit('sparkle', 750, 560)
+        start = time.perf_counter()
+        particles.update(1 / 60)
+        particles.draw(screen, 0.5)
+        return time.perf_counter() - start
+    
+    return measure_timed(step, min_time)
+
+
+def benchmarks(quick: bool = False) -> list:
+    """
+    本模块的基准列表
+    :return: [(名称, 单位, 无参函数)]
+    """
+    min_time = 0.2 if quick else 0.5
+    cases = []
+    for count in (0, 5, 10):
+        cases.append((f'game_view.draw[{count}_monsters]', 'fps',
+                      lambda count=count: bench_game_view(count, min_time)))
+    cases.append(('particles.frame[budget]', 'fps', lambda: bench_particles(min_time)))
+    for mode in ('redraw', 'hover', 'select'):
+        cases.append((f'main_menu.draw[{mode}]', 'fps',
+                      lambda mode=mode: bench_main_menu(mode, min_time)))
+    return cases
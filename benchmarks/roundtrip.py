@@ -0,0 +1,182 @@
+"""
+往返检查
+保存后重新读取、录制后重新回放，核对结果与原来一致：
+- 首次玩某个难度（算式掌握情况为空）的对局回放能重现原成绩
+- 连续保存跨过日志压缩点后，关闭再读取的记录与内存中的记录相同
+- 排行榜保留条数不是默认值时，重新读取后榜单不被截短，SQLite 记录给出的名次相同
+
+用法：python -m benchmarks.roundtrip
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+from typing import Callable, List, Optional, Tuple
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+
+
+SCREEN_SIZE = (1000, 800)
+
+# 回放检查中机器人每隔多少个逻辑步答一题，以及答对的概率
+ANSWER_EVERY = 90
+ACCURACY = 0.8
+
+
+def check_replay_empty_mastery(seed: int = 0) -> Tuple[bool, str]:
+    """
+    用空的算式掌握情况（玩家第一次玩该难度）录一局，再回放核对成绩
+    :return: (是否一致, 说明)
+    """
+    from core.mastery import MasteryTracker
+    from core.replay import Replay
+    from core.rules import GameRules
+    from ui.game_view import GameView
+    from ui.replay import verify_replay
+    
+    pygame.init()
+    settings = GameRules.create_settings()
+    view = GameView(pygame.Surface(SCREEN_SIZE), settings, mastery=MasteryTracker(), seed=seed)
+    rng = random.Random(seed)
+    while not view.is_game_over():
+        view.update(1 / 60)
+        if view.tick % ANSWER_EVERY == 0:
+            question = view.game_state.current_question
+            answer = question.answer if rng.random() < ACCURACY else question.answer + 1
+            for char in str(answer) + '\r':
+                view.press_key(char)
+    view.replay.finish(view.tick, view.get_stats())
+    
+    # 经过编码和解码，与保存到文件后再读取相同
+    replay = Replay.from_bytes(view.replay.to_bytes())
+    matched, stats = verify_replay(replay)
+    recorded = view.replay.stats
+    return matched, (f"录制得分 {recorded['score']}（{recorded['total_questions']} 题），"
+                     f"回放得分 {stats['score']}（{stats['total_questions']} 题）")
+
+
+# 记录检查保存的对局数（跨过默认的日志压缩点 JournalBackend.compact_every 两次）
+SAVE_GAMES = 450
+
+# 记录检查中比较的字段
+RECORD_KEYS = ('total_games', 'total_questions', 'total_correct', 'total_wrong',
+               'history', 'best_scores')
+
+
+def _game_stats(index: int) -> dict:
+    return {
+        'session_id': f'roundtrip-{index}',
+        'score': index * 7 % 300,
+        'correct_count': index % 20,
+        'wrong_count': index % 3,
+        'total_questions': index % 20 + index % 3,
+    }
+
+
+def _diff_records(expected: dict, loaded: Optional[dict]) -> List[str]:
+    """读取的记录与预期不同的字段"""
+    if loaded is None:
+        return ['<无记录>']
+    return [key for key in RECORD_KEYS if loaded.get(key) != expected.get(key)]
+
+
+def check_records_compaction() -> Tuple[bool, str]:
+    """
+    跨过日志压缩点保存后关闭，再读取并与内存中的记录比较：
+    默认的 RecordManager（后台写盘，一批可能含多局），以及直接按批写入、批中跨过压缩点的日志
+    :return: (是否一致, 说明)
+    """
+    from storage.backends import JournalBackend, apply_game_record, create_empty_records
+    from storage.records import RecordManager
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'records.json')
+        manager = RecordManager(path)
+        for index in range(SAVE_GAMES):
+            manager.save_game_result(_game_stats(index), 'normal')
+        expected = manager.records
+        manager.close()
+        manager_diff = _diff_records(expected, RecordManager(path).records)
+        
+        # 每批 3 局，压缩点（每 5 行）落在批的中间
+        path = os.path.join(directory, 'batched.json')
+        backend = JournalBackend(path, compact_every=5)
+        records = create_empty_records()
+        games, batch_size = 23, 3
+        for start in range(0, games, batch_size):
+            batch = [dict(_game_stats(index), timestamp=str(index), speed_mode='normal')
+                     for index in range(start, min(start + batch_size, games))]
+            for game_record in batch:
+                apply_game_record(records, game_record)
+            backend.append_many(records, batch)
+        backend.close()
+        batch_diff = _diff_records(records, JournalBackend(path, compact_every=5).load())
+    
+    detail = (f"RecordManager {SAVE_GAMES} 局: {'一致' if not manager_diff else manager_diff}；"
+              f"分批写入日志: {'一致' if not batch_diff else batch_diff}")
+    return not manager_diff and not batch_diff, detail
+
+
+# 排行榜检查的保留条数（不同于默认的 DEFAULT_K）和保存的对局数
+BEST_K = 20
+BEST_K_GAMES = 30
+
+
+def check_records_best_k() -> Tuple[bool, str]:
+    """
+    按非默认的保留条数保存后关闭，再读取比较排行榜；SQLite 记录逐局比较名次
+    :return: (是否一致, 说明)
+    """
+    from storage.records import RecordManager
+    from storage.sqlite_records import SQLiteRecordManager
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'records.json')
+        manager = RecordManager(path, best_k=BEST_K)
+        sqlite_manager = SQLiteRecordManager(os.path.join(directory, 'records.db'),
+                                             import_from=None, best_k=BEST_K)
+        rank_mismatches = 0
+        for index in range(BEST_K_GAMES):
+            manager.save_game_result(_game_stats(index), 'normal')
+            sqlite_manager.save_game_result(_game_stats(index), 'normal')
+            rank_mismatches += manager.last_rank != sqlite_manager.last_rank
+        expected = manager.get_best_records('normal', limit=BEST_K)
+        manager.close()
+        sqlite_manager.close()
+        loaded = RecordManager(path, best_k=BEST_K).get_best_records('normal', limit=BEST_K)
+    
+    matched = loaded == expected and len(loaded) == BEST_K and not rank_mismatches
+    return matched, (f"K={BEST_K}: 保存后 {len(expected)} 条，重新读取 {len(loaded)} 条"
+                     f"{'' if loaded == expected else '（内容不同）'}；"
+                     f"SQLite 名次不同 {rank_mismatches} 局")
+
+
+# 全部检查：(名称, 函数)
+CHECKS: List[Tuple[str, Callable[[], Tuple[bool, str]]]] = [
+    ('replay[empty_mastery]', check_replay_empty_mastery),
+    ('records[compaction]', check_records_compaction),
+    ('records[best_k]', check_records_best_k),
+]
+
+
+def main(argv: List[str] = None) -> int:
+    """命令行入口：有检查不一致时返回 1"""
+    parser = argparse.ArgumentParser(description='速算闯关往返检查')
+    parser.add_argument('-k', dest='keyword', default=None, help='只运行名称包含该关键字的检查')
+    args = parser.parse_args(argv)
+    
+    failed = 0
+    for name, check in CHECKS:
+        if args.keyword and args.keyword not in name:
+            continue
+        passed, detail = check()
+        failed += not passed
+        print(f"{'通过' if passed else '失败'}  {name}  {detail}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
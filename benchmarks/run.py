@@ -0,0 +1,127 @@
+"""
+基准测试入口
+运行全部基准，结果写入 JSON，并与基线比较（下降超过阈值的标记为回退）。
+
+用法：
+    python -m benchmarks.run                  # 运行并与基线比较
+    python -m benchmarks.run --save-baseline  # 运行并把结果保存为新的基线
+    python -m benchmarks.run --quick -k draw  # 快速模式，只运行名称包含 draw 的基准
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+RESULTS_DIR = os.path.join('benchmarks', 'results')
+DEFAULT_OUTPUT = os.path.join(RESULTS_DIR, 'latest.json')
+DEFAULT_BASELINE = os.path.join(RESULTS_DIR, 'baseline.json')
+
+# 默认回退阈值：比基线慢 10% 以上
+DEFAULT_THRESHOLD = 0.10
+
+
+def collect(quick: bool = False, keyword: Optional[str] = None) -> list:
+    """收集基准列表"""
+    from benchmarks import logic, render
+    
+    cases = render.benchmarks(quick) + logic.benchmarks(quick)
+    if keyword:
+        cases = [case for case in cases if keyword in case[0]]
+    return cases
+
+
+def run(cases: list) -> Dict[str, dict]:
+    """
+    依次运行基准
+    :return: 名称 -> {'value': 数值, 'unit': 单位}（数值越大越好）
+    """
+    results = {}
+    for name, unit, func in cases:
+        value = func()
+        results[name] = {'value': round(value, 2), 'unit': unit}
+        print(f"{name:<42} {value:>14,.1f} {unit}", flush=True)
+    return results
+
+
+def environment() -> dict:
+    """运行环境信息（比较不同机器上的结果时参考）"""
+    import pygame
+    return {
+        'time': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'platform': platform.platform(),
+        'video_driver': os.environ.get('SDL_VIDEODRIVER', '')
+    }
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict],
+            threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """
+    与基线比较并打印变化
+    :return: 回退的基准名称
+    """
+    regressions = []
+    print(f"\n{'基准':<40} {'基线':>14} {'本次':>14} {'变化':>8}")
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name:<42} {'-':>14} {result['value']:>14,.1f}   (新增)")
+            continue
+        old = baseline[name]['value']
+        change = (result['value'] - old) / old if old else 0.0
+        flag = ''
+        if change < -threshold:
+            flag = '  回退'
+            regressions.append(name)
+        print(f"{name:<42} {old:>14,.1f} {result['value']:>14,.1f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def _write_json(path: str, data: dict):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def main(argv: List[str] = None) -> int:
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description='速算闯关性能基准')
+    parser.add_argument('--quick', action='store_true', help='缩短计时并跳过最大规模的用例')
+    parser.add_argument('-k', dest='keyword', default=None, help='只运行名称包含该关键字的基准')
+    parser.add_argument('--out', default=DEFAULT_OUTPUT, help='结果输出路径')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='基线文件路径')
+    parser.add_argument('--save-baseline', action='store_true', help='把本次结果保存为基线')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='回退阈值（比例，默认 0.10）')
+    args = parser.parse_args(argv)
+    
+    results = run(collect(args.quick, args.keyword))
+    data = {'environment': environment(), 'results': results}
+    _write_json(args.out, data)
+    print(f"\n结果已写入 {args.out}")
+    
+    if args.save_baseline:
+        _write_json(args.baseline, data)
+        print(f"已保存为基线 {args.baseline}")
+        return 0
+    
+    if not os.path.exists(args.baseline):
+        print("没有基线，使用 --save-baseline 保存")
+        return 0
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)['results']
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} 项性能回退（阈值 {args.threshold:.0%}）")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,44 @@
+"""
+计时工具
+"""
+import time
+from typing import Callable
+
+
+def measure(func: Callable[[], object], min_time: float = 0.5, repeat: int = 3) -> float:
+    """
+    测量每秒可调用次数
+    每轮至少运行 min_time 秒，取 repeat 轮中最快的一轮（减少偶发干扰）
+    :param func: 被测函数（无参数）
+    :return: 每秒调用次数
+    """
+    best = 0.0
+    for _ in range(repeat):
+        calls = 0
+        start = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < min_time:
+            func()
+            calls += 1
+            elapsed = time.perf_counter() - start
+        best = max(best, calls / elapsed)
+    return best
+
+
+def measure_timed(step: Callable[[], float], min_time: float = 0.5, repeat: int = 3) -> float:
+    """
+    测量只计入部分耗时的操作的频率
+    :param step: 执行一次操作并返回其中需要计入的耗时（秒），例如只计绘制不计更新
+    :return: 每秒次数
+    """
+    best = 0.0
+    for _ in range(repeat):
+        calls = 0
+        counted = 0.0
+        start = time.perf_counter()
+        while time.perf_counter() - start < min_time:
+            counted += step()
+            calls += 1
+        if counted > 0:
+            best = max(best, calls / counted)
+    return best
@@ -1,8 +1,11 @@
 """
 核心模块
 """
-from .question_generator import Question, QuestionGenerator
+from .question_generator import Question, QuestionBank, QuestionGenerator
 from .game_state import GameState
 from .rules import GameRules
+from .mastery import MasteryTracker
+from .replay import Replay
 
-__all__ = ['Question', 'QuestionGenerator', 'GameState', 'GameRules']
+__all__ = ['Question', 'QuestionBank', 'QuestionGenerator', 'GameState', 'GameRules',
+           'MasteryTracker', 'Replay']
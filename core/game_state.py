@@ -3,7 +3,8 @@
 负责管理游戏的各种状态：分数、时间、障碍物堆叠等
 """
 import time
-from typing import Optional
+import uuid
+from typing import Callable, Dict, List, Optional
 from core.question_generator import Question
 
 
@@ -15,6 +16,12 @@ class GameState:
         初始化游戏状态
         :param settings: 游戏设置字典
         """
+        # 本局唯一标识（保存记录时用于防止重复写入）
+        self.session_id = uuid.uuid4().hex
+        
+        # 生命周期事件订阅者：事件类型 -> 回调列表
+        self._listeners: Dict[str, List[Callable[[dict], None]]] = {}
+        
         # 基础状态
         self.score = 0
         self.correct_count = 0
@@ -32,8 +39,14 @@ class GameState:
         
         # 速度控制
         self.speed_mode = settings.get('speed_mode', 'normal')
+        self.difficulty = settings.get('difficulty', 'basic')
         self.spawn_interval_base = settings.get('spawn_interval_base', 2.0)
         self.spawn_interval_min = settings.get('spawn_interval_min', 0.5)
+        self.speed_multipliers = settings.get('speed_multipliers', {
+            'slow': 1.5,
+            'normal': 1.0,
+            'fast': 0.6
+        })
         self.spawn_interval = self._calculate_spawn_interval()
         self.time_since_last_spawn = 0.0
         
@@ -52,14 +65,22 @@ class GameState:
         self.combo = 0
         self.max_combo = 0
     
+    def subscribe(self, event_type: str, callback: Callable[[dict], None]):
+        """
+        订阅生命周期事件
+        :param event_type: 事件类型，目前支持 'game_ended'（每局只触发一次）
+        :param callback: 回调函数，参数为事件字典
+        """
+        self._listeners.setdefault(event_type, []).append(callback)
+    
+    def _emit(self, event: dict):
+        """通知事件订阅者"""
+        for callback in self._listeners.get(event['type'], []):
+            callback(event)
+    
     def _calculate_spawn_interval(self) -> float:
         """根据速度模式计算生成间隔"""
-        multipliers = {
-            'slow': 1.5,
-            'normal': 1.0,
-            'fast': 0.6
-        }
-        multiplier = multipliers.get(self.speed_mode, 1.0)
+        multiplier = self.speed_multipliers.get(self.speed_mode, 1.0)
         return self.spawn_interval_base * multiplier
     
     def start_game(self):
@@ -126,7 +147,9 @@ class GameState:
             'is_correct': True,
             'removed_count': removed,
             'score_gained': score_gained,
-            'combo': self.combo
+            'combo': self.combo,
+            # 连击达到新的加分档位（第 15 连击之后加成不再增长，不再算新档位）
+            'combo_milestone': self.combo % 3 == 0 and self.combo // 3 <= 5
         }
     
     def on_wrong_answer(self) -> dict:
@@ -159,9 +182,12 @@ class GameState:
         }
     
     def game_over(self):
-        """游戏结束"""
+        """游戏结束（只在第一次调用时触发 game_ended 事件）"""
+        if self.is_game_over:
+            return
         self.is_running = False
         self.is_game_over = True
+        self._emit({'type': 'game_ended', 'session_id': self.session_id, 'stats': self.get_stats()})
     
     def get_accuracy(self) -> float:
         """获取正确率"""
@@ -179,7 +205,9 @@ class GameState:
             'accuracy': self.get_accuracy(),
             'elapsed_time': self.elapsed_time,
             'max_combo': self.max_combo,
-            'speed_mode': self.speed_mode
+            'speed_mode': self.speed_mode,
+            'difficulty': self.difficulty,
+            'session_id': self.session_id
         }
     
     def set_speed_mode(self, mode: str):
@@ -0,0 +1,205 @@
+"""
+自适应练习模块
+按单个算式（如 7×8）记录答题用时和正确率，维护指数衰减的掌握度，
+并按间隔重复的节奏安排复习：越不熟的算式间隔越短，越快再次出现。
+"""
+import heapq
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# 算式记录各字段在列表中的位置：[掌握度, 平均用时, 作答次数, 熟练等级, 下次复习的步数]
+MASTERY, AVG_TIME, ATTEMPTS, BOX, DUE = range(5)
+
+# 最高熟练等级（复习间隔 = 基础间隔 × 2^等级）
+MAX_BOX = 8
+
+# 每种运算保存的算式数上限（高级难度的加法有几十万道题，记录不能随作答无限增长）
+MAX_FACTS_PER_OP = 500
+
+# 超过上限时一次删到上限的这个比例，之后新算式可以再记录一段时间才需要清理
+EVICT_TO = 0.9
+
+
+def fact_key(a: int, b: int, op: str) -> str:
+    """算式的键，如 'mul:7:8'"""
+    return f'{op}:{a}:{b}'
+
+
+def parse_fact_key(key: str) -> Tuple[int, int, str]:
+    """从键还原 (a, b, 运算类型)"""
+    op, a, b = key.split(':')
+    return int(a), int(b), op
+
+
+class MasteryTracker:
+    """
+    单个难度下的算式掌握情况
+    直接包装可序列化的字典 {'step': 已作答题数, 'facts': {键: 记录}}，
+    记录用短列表保存（更新时整体替换，不原地修改）；每种运算一个按复习时间排序的堆，记录和取题都是 O(log n)。
+    记录的大小有上限：升到最高等级的算式到了复习时间就视为已掌握、不再保存；
+    某种运算的算式超过上限时，先删掉最熟练的（删掉的算式以后抽到时按新算式重新记录）。
+    清理只看同一种运算的算式，只保存部分运算的数据（如回放只保存本局启用的运算）时结果相同
+    """
+    
+    def __init__(self, data: dict = None, decay: float = 0.7, target_time: float = 3.0,
+                 base_interval: int = 4, max_facts_per_op: int = MAX_FACTS_PER_OP):
+        """
+        :param data: 已保存的数据（原地维护）
+        :param decay: 掌握度衰减系数（越大越看重历史表现）
+        :param target_time: 目标答题用时（秒），答对且不超过该时间视为熟练
+        :param base_interval: 基础复习间隔（题数）
+        :param max_facts_per_op: 每种运算保存的算式数上限
+        """
+        self.data = data if data is not None else {}
+        self.data.setdefault('step', 0)
+        self.data.setdefault('facts', {})
+        self.facts: Dict[str, list] = self.data['facts']
+        self.decay = decay
+        self.target_time = target_time
+        self.base_interval = base_interval
+        self.max_facts_per_op = max_facts_per_op
+        
+        # 本次保存后有变化的算式和删掉的算式
+        self._dirty = set()
+        self._removed = set()
+        
+        # 运算类型 -> [(复习步数, 键)]；过期和已删除的条目在取用时丢弃
+        self._due: Dict[str, List[Tuple[int, str]]] = {}
+        self._counts: Dict[str, int] = {}  # 运算类型 -> 算式数
+        for key, entry in self.facts.items():
+            op = key.split(':', 1)[0]
+            self._due.setdefault(op, []).append((entry[DUE], key))
+            self._counts[op] = self._counts.get(op, 0) + 1
+        for heap in self._due.values():
+            heapq.heapify(heap)
+        for op, count in list(self._counts.items()):
+            if count > self.max_facts_per_op:
+                self._evict(op)
+    
+    @property
+    def step(self) -> int:
+        return self.data['step']
+    
+    def __len__(self) -> int:
+        return len(self.facts)
+    
+    def record(self, a: int, b: int, op: str, correct: bool, response_time: float):
+        """
+        记录一次作答
+        :param response_time: 答题用时（秒）
+        """
+        self.data['step'] += 1
+        key = fact_key(a, b, op)
+        
+        # 每次作答换一个新列表，不原地修改旧记录：保存用的快照只需浅复制 facts
+        entry = self.facts.get(key)
+        if entry is None:
+            entry = [0.5, response_time, 0, 0, 0]
+            self._counts[op] = self._counts.get(op, 0) + 1
+            self._removed.discard(key)
+        else:
+            entry = list(entry)
+        self.facts[key] = entry
+        
+        # 答错得0分，答对按用时打分（不超过目标用时为满分）
+        performance = min(1.0, self.target_time / max(response_time, 0.1)) if correct else 0.0
+        entry[MASTERY] = round(self.decay * entry[MASTERY] + (1 - self.decay) * performance, 3)
+        entry[AVG_TIME] = round(self.decay * entry[AVG_TIME] + (1 - self.decay) * response_time, 2)
+        entry[ATTEMPTS] += 1
+        
+        # 答错回到最低等级，又快又对升一级，答对但偏慢保持不变
+        if not correct:
+            entry[BOX] = 0
+        elif response_time <= self.target_time:
+            entry[BOX] = min(MAX_BOX, entry[BOX] + 1)
+        entry[DUE] = self.step + self.base_interval * 2 ** entry[BOX]
+        
+        heapq.heappush(self._due.setdefault(op, []), (entry[DUE], key))
+        self._dirty.add(key)
+        if self._counts[op] > self.max_facts_per_op:
+            self._evict(op, keep=key)
+    
+    def _forget(self, key: str):
+        """删除一个算式（堆中的条目在取用时丢弃）"""
+        del self.facts[key]
+        self._counts[key.split(':', 1)[0]] -= 1
+        self._dirty.discard(key)
+        self._removed.add(key)
+    
+    def _evict(self, op: str, keep: str = None):
+        """
+        某种运算的算式超过上限时，按熟练等级和掌握度从高到低删到上限的 EVICT_TO
+        :param keep: 不删除的算式（刚作答的）
+        """
+        prefix = op + ':'
+        candidates = [(key, entry) for key, entry in self.facts.items()
+                      if key.startswith(prefix) and key != keep]
+        excess = self._counts[op] - int(self.max_facts_per_op * EVICT_TO)
+        for key, _ in heapq.nlargest(excess, candidates,
+                                     key=lambda item: (item[1][BOX], item[1][MASTERY])):
+            self._forget(key)
+    
+    def _peek(self, op: str) -> Optional[Tuple[int, str]]:
+        """
+        某种运算最早需要复习的算式（丢弃堆顶过期的条目；
+        已在最高等级又到了复习时间的算式视为已掌握，删除后继续找）
+        """
+        heap = self._due.get(op)
+        while heap:
+            due, key = heap[0]
+            entry = self.facts.get(key)
+            if entry is not None and entry[DUE] == due:
+                if entry[BOX] < MAX_BOX or due > self.step:
+                    return heap[0]
+                self._forget(key)
+            heapq.heappop(heap)
+        return None
+    
+    def next_due(self, ops: Iterable[str]) -> Optional[Tuple[int, int, str]]:
+        """
+        已到复习时间的算式中最早到期的一个
+        :param ops: 允许的运算类型
+        :return: (a, b, 运算类型)，没有到期的算式时返回 None
+        """
+        best = None
+        for op in ops:
+            top = self._peek(op)
+            if top is not None and top[0] <= self.step and (best is None or top < best):
+                best = top
+        return parse_fact_key(best[1]) if best else None
+    
+    def mastery(self, a: int, b: int, op: str) -> Optional[float]:
+        """算式的掌握度（0~1，没有作答过时返回 None）"""
+        entry = self.facts.get(fact_key(a, b, op))
+        return entry[MASTERY] if entry else None
+    
+    def weakest(self, limit: int = 10) -> List[Tuple[str, list]]:
+        """掌握度最低的算式（用于统计展示）"""
+        return heapq.nsmallest(limit, self.facts.items(), key=lambda item: item[1][MASTERY])
+    
+    def snapshot(self, ops: Iterable[str] = None) -> dict:
+        """
+        当前数据的可序列化副本（如回放头部保存的开局掌握情况）
+        记录更新时整体替换、不原地修改，复制 facts 字典即可，不需要深复制
+        :param ops: 只保留这些运算的算式（None 表示全部）
+        """
+        facts = self.facts
+        if ops is not None:
+            prefixes = tuple(op + ':' for op in ops)
+            facts = {key: entry for key, entry in facts.items() if key.startswith(prefixes)}
+        return {'step': self.step, 'facts': dict(facts)}
+    
+    def pop_updates(self) -> Optional[dict]:
+        """
+        取出上次调用以来有变化的算式（用于增量保存）
+        :return: {'step': 已作答题数, 'facts': {键: 记录}, 'removed': [删掉的键]}，
+            没有变化时返回 None
+        """
+        if not self._dirty and not self._removed:
+            return None
+        updates = {'step': self.step,
+                   'facts': {key: self.facts[key] for key in self._dirty},
+                   'removed': sorted(self._removed)}
+        self._dirty.clear()
+        self._removed.clear()
+        return updates
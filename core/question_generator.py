@@ -2,28 +2,62 @@
 题目生成器模块
 负责生成加减乘除四则运算题目
 """
+import operator
 import random
-from typing import Tuple, Optional
+import sys
+from array import array
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Tuple, Optional
+
+
+# 运算类型编码（批量存储时用整数表示运算类型）
+OPS = ('add', 'sub', 'mul', 'div')
+
+# 运算符号
+OP_SYMBOLS = {
+    'add': '+',
+    'sub': '-',
+    'mul': '×',
+    'div': '÷'
+}
+
+# 运算函数（由两个操作数计算答案）
+OP_FUNCS = {
+    'add': operator.add,
+    'sub': operator.sub,
+    'mul': operator.mul,
+    'div': operator.floordiv
+}
+
+
+@lru_cache(maxsize=16384)
+def format_question(a: int, b: int, op: str) -> str:
+    """生成题目文本（相同题目共用同一个字符串）"""
+    return sys.intern(f"{a} {OP_SYMBOLS[op]} {b} = ?")
 
 
 class Question:
     """题目对象"""
+    __slots__ = ('a', 'b', 'op', 'answer', '_text')
+    
     def __init__(self, a: int, b: int, op: str, answer: int):
         self.a = a
         self.b = b
         self.op = op
         self.answer = answer
-        self.text = self._generate_text()
+        self._text = None
+    
+    @property
+    def text(self) -> str:
+        """题目文本（首次访问时生成）"""
+        if self._text is None:
+            self._text = self._generate_text()
+        return self._text
     
     def _generate_text(self) -> str:
         """生成题目文本"""
-        op_symbol = {
-            'add': '+',
-            'sub': '-',
-            'mul': '×',
-            'div': '÷'
-        }
-        return f"{self.a} {op_symbol[self.op]} {self.b} = ?"
+        return format_question(self.a, self.b, self.op)
     
     def check_answer(self, user_answer: str) -> bool:
         """检查答案是否正确"""
@@ -33,17 +67,133 @@ class Question:
             return False
 
 
+class QuestionBank:
+    """
+    紧凑的题目容器
+    a、b、运算类型编码（OPS 中的下标）和答案分别存放在平行的列中，
+    默认用 array('h')（每道题 7 字节），也可以直接使用 NumPy 数组；
+    只有按下标访问时才创建 Question 对象
+    """
+    
+    def __init__(self, a=None, b=None, op=None, answer=None):
+        """
+        :param a: 第一个操作数列
+        :param b: 第二个操作数列
+        :param op: 运算类型编码列
+        :param answer: 答案列
+        """
+        self.a = a if a is not None else array('h')
+        self.b = b if b is not None else array('h')
+        self.op = op if op is not None else array('b')
+        self.answer = answer if answer is not None else array('h')
+    
+    def append(self, question: Question):
+        """追加一道题（仅适用于 array 列）"""
+        self.a.append(question.a)
+        self.b.append(question.b)
+        self.op.append(OPS.index(question.op))
+        self.answer.append(question.answer)
+    
+    def __len__(self) -> int:
+        return len(self.answer)
+    
+    def __getitem__(self, index: int) -> Question:
+        return Question(int(self.a[index]), int(self.b[index]),
+                        OPS[self.op[index]], int(self.answer[index]))
+    
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+    
+    def text(self, index: int) -> str:
+        """第 index 道题的文本（按需生成并缓存）"""
+        return format_question(int(self.a[index]), int(self.b[index]), OPS[self.op[index]])
+    
+    @property
+    def nbytes(self) -> int:
+        """各列占用的字节数"""
+        return sum(len(column) * column.itemsize for column in (self.a, self.b, self.op, self.answer))
+
+
+@lru_cache(maxsize=None)
+def enumerate_questions(op: str, bounds: tuple, difficulty: str = 'basic') -> QuestionBank:
+    """
+    枚举某种运算在给定数值范围内的全部合法题目（结果缓存，每种配置只枚举一次）
+    :param op: 运算类型
+    :param bounds: (最小值, 最大值, 结果限制)，同 QuestionGenerator.config
+    :param difficulty: 难度级别（基础难度的减法要求结果非负）
+    :return: 按 (a, b) 顺序排列的题目表
+    """
+    min_val, max_val, result_limit = bounds
+    bank = QuestionBank()
+    code = array('b', [OPS.index(op)])
+    
+    for x in range(min_val, max_val + 1):
+        if op == 'add':
+            # 确保结果不超过上限
+            low, high = min_val, min(max_val, result_limit - x)
+        elif op == 'sub' and difficulty == 'basic':
+            # 被减数必须大于等于减数
+            low, high = min_val, x
+        else:
+            low, high = min_val, max_val
+        count = high - low + 1
+        if count <= 0:
+            continue
+        
+        if op == 'add':
+            bank.a.extend([x] * count)
+            bank.b.extend(range(low, high + 1))
+            bank.answer.extend(range(x + low, x + high + 1))
+        elif op == 'sub':
+            bank.a.extend([x] * count)
+            bank.b.extend(range(low, high + 1))
+            bank.answer.extend(range(x - low, x - high - 1, -1))
+        elif op == 'mul':
+            bank.a.extend([x] * count)
+            bank.b.extend(range(low, high + 1))
+            bank.answer.extend(range(x * low, x * high + 1, x))
+        else:
+            # x 为商，枚举除数，被除数 = 商 × 除数
+            bank.a.extend(range(x * low, x * high + 1, x))
+            bank.b.extend(range(low, high + 1))
+            bank.answer.extend([x] * count)
+        bank.op.extend(code * count)
+    
+    return bank
+
+
 class QuestionGenerator:
-    """题目生成器"""
+    """
+    题目生成器
+    每种运算的合法题目预先枚举成表，出题时按运算权重选定运算，
+    再在表中随机取一个下标，同一运算内每道题被抽中的概率完全相同。
+    提供 MasteryTracker 时，会按一定比例插入已到复习时间的薄弱算式
+    """
     
-    def __init__(self, enabled_ops: list = None, difficulty: str = 'basic'):
+    def __init__(self, enabled_ops: list = None, difficulty: str = 'basic',
+                 op_weights: Dict[str, float] = None, recent_window: int = 10,
+                 mastery=None, review_rate: float = 0.4, rng: random.Random = None):
         """
         初始化题目生成器
         :param enabled_ops: 启用的运算类型列表 ['add', 'sub', 'mul', 'div']
         :param difficulty: 难度级别 'basic' 或 'advanced'
+        :param op_weights: 各运算类型的出题权重，如 {'mul': 2}（未列出的为1，默认等概率）
+        :param recent_window: 避免与最近多少道题重复（0 表示不去重）
+        :param mastery: 当前难度的 MasteryTracker（None 表示不做自适应）
+        :param review_rate: 有算式到期时出复习题的概率
+        :param rng: 随机数生成器（传入带种子的生成器可重现出题顺序）
         """
         self.enabled_ops = enabled_ops or ['add', 'sub', 'mul', 'div']
         self.difficulty = difficulty
+        self.op_weights = op_weights or {}
+        self.mastery = mastery
+        self.review_rate = review_rate
+        self.rng = rng or random.Random()
+        
+        # 最近出过的题目 (运算类型, 表中下标)
+        self._recent = deque(maxlen=recent_window) if recent_window > 0 else None
+        self._recent_set = set()
         
         # 数值范围配置
         self.config = {
@@ -61,63 +211,85 @@ class QuestionGenerator:
             }
         }
     
+    def question_table(self, op: str) -> QuestionBank:
+        """当前难度下某种运算的全部合法题目"""
+        return enumerate_questions(op, self.config[self.difficulty][op], self.difficulty)
+    
+    def space_size(self, op: str = None) -> int:
+        """题目空间大小（op 为 None 时为全部启用运算之和）"""
+        ops = [op] if op else self.enabled_ops
+        return sum(len(self.question_table(o)) for o in ops)
+    
+    def _choose_op(self) -> str:
+        """按权重选择运算类型"""
+        if not self.op_weights:
+            return self.rng.choice(self.enabled_ops)
+        weights = [self.op_weights.get(op, 1.0) for op in self.enabled_ops]
+        return self.rng.choices(self.enabled_ops, weights)[0]
+    
     def generate(self) -> Question:
         """生成一个新题目"""
-        op = random.choice(self.enabled_ops)
+        if self.mastery is not None and self.rng.random() < self.review_rate:
+            fact = self.mastery.next_due(self.enabled_ops)
+            if fact is not None:
+                a, b, op = fact
+                return Question(a, b, op, OP_FUNCS[op](a, b))
         
-        if op == 'add':
-            return self._generate_addition()
-        elif op == 'sub':
-            return self._generate_subtraction()
-        elif op == 'mul':
-            return self._generate_multiplication()
-        elif op == 'div':
-            return self._generate_division()
-    
-    def _generate_addition(self) -> Question:
-        """生成加法题"""
-        min_val, max_val, result_limit = self.config[self.difficulty]['add']
+        op = self._choose_op()
+        table = self.question_table(op)
+        index = self.rng.randrange(len(table))
         
-        # 确保结果不超过上限
-        a = random.randint(min_val, max_val)
-        b = random.randint(min_val, min(max_val, result_limit - a))
+        if self._recent is not None:
+            # 与最近的题目重复时重抽（题目空间比窗口小时放宽，避免死循环）
+            for _ in range(8):
+                if (op, index) not in self._recent_set:
+                    break
+                index = self.rng.randrange(len(table))
+            if len(self._recent) == self._recent.maxlen:
+                self._recent_set.discard(self._recent[0])
+            self._recent.append((op, index))
+            self._recent_set.add((op, index))
         
-        return Question(a, b, 'add', a + b)
+        return table[index]
     
-    def _generate_subtraction(self) -> Question:
-        """生成减法题"""
-        min_val, max_val, result_limit = self.config[self.difficulty]['sub']
+    def generate_batch(self, n: int, rng=None) -> QuestionBank:
+        """
+        批量生成 n 道题（使用 NumPy 一次性抽取，约束与逐题生成相同）
+        :param n: 题目数量
+        :param rng: numpy.random.Generator（默认新建一个）
+        """
+        import numpy as np
         
-        # 确保结果非负（基础模式）或符合下限
-        if self.difficulty == 'basic':
-            # 被减数必须大于等于减数
-            a = random.randint(min_val, max_val)
-            b = random.randint(min_val, a)
-        else:
-            a = random.randint(min_val, max_val)
-            b = random.randint(min_val, max_val)
+        rng = rng if rng is not None else np.random.default_rng()
         
-        return Question(a, b, 'sub', a - b)
-    
-    def _generate_multiplication(self) -> Question:
-        """生成乘法题"""
-        min_val, max_val, _ = self.config[self.difficulty]['mul']
+        bank = QuestionBank(np.zeros(n, dtype=np.int16), np.zeros(n, dtype=np.int16),
+                            np.zeros(n, dtype=np.int8), np.zeros(n, dtype=np.int16))
+        weights = np.array([self.op_weights.get(op, 1.0) for op in self.enabled_ops])
+        op_codes = np.array([OPS.index(op) for op in self.enabled_ops], dtype=np.int8)
+        bank.op[:] = op_codes[rng.choice(len(op_codes), n, p=weights / weights.sum())]
         
-        a = random.randint(min_val, max_val)
-        b = random.randint(min_val, max_val)
+        for op in self.enabled_ops:
+            mask = bank.op == OPS.index(op)
+            count = int(mask.sum())
+            if count == 0:
+                continue
+            
+            # 在题目表中随机取下标（与 generate() 相同的均匀分布，不做去重）
+            table = self.question_table(op)
+            index = rng.integers(0, len(table), count)
+            bank.a[mask] = np.frombuffer(table.a, dtype=np.int16)[index]
+            bank.b[mask] = np.frombuffer(table.b, dtype=np.int16)[index]
+            bank.answer[mask] = np.frombuffer(table.answer, dtype=np.int16)[index]
         
-        return Question(a, b, 'mul', a * b)
+        return bank
     
-    def _generate_division(self) -> Question:
-        """生成除法题（确保整除）"""
-        min_val, max_val, _ = self.config[self.difficulty]['div']
-        
-        # 先生成商和除数，再计算被除数
-        quotient = random.randint(min_val, max_val)
-        divisor = random.randint(min_val, max_val)
-        dividend = quotient * divisor
-        
-        return Question(dividend, divisor, 'div', quotient)
+    def record_answer(self, question: Question, correct: bool, response_time: float):
+        """
+        记录作答结果（用于自适应出题）
+        :param response_time: 答题用时（秒）
+        """
+        if self.mastery is not None:
+            self.mastery.record(question.a, question.b, question.op, correct, response_time)
     
     def set_enabled_ops(self, ops: list):
         """设置启用的运算类型"""
@@ -129,3 +301,10 @@ class QuestionGenerator:
         """设置难度"""
         if difficulty in ['basic', 'advanced']:
             self.difficulty = difficulty
+            self._recent_set.clear()
+            if self._recent is not None:
+                self._recent.clear()
+    
+    def set_op_weights(self, op_weights: Dict[str, float]):
+        """设置各运算类型的出题权重"""
+        self.op_weights = op_weights or {}
@@ -0,0 +1,150 @@
+"""
+对局回放模块
+一局游戏由随机种子、游戏设置和按键序列完全确定：逻辑按固定步长推进，
+所以只需记录 (逻辑步序号, 按键)，就能在无界面的情况下重新跑出完全相同的结果。
+
+文件格式（小端）：
+    b'SMRP' + 版本号 (1 字节)
+    头部长度 (4 字节) + zlib 压缩的 JSON 头部（种子、设置、结束步数、最终成绩等）
+    按键数量 (4 字节) + 按键序列：与上一个按键相隔的步数 (varint) + 按键编码 (1 字节)
+"""
+import json
+import os
+import struct
+import zlib
+from typing import List, Optional, Tuple
+
+
+MAGIC = b'SMRP'
+VERSION = 1
+
+# 按键编码：数字 0-9 直接用数值，其余按键见下表
+KEY_MINUS = 10
+KEY_BACKSPACE = 11
+KEY_ENTER = 12
+
+_KEY_CODES = {'-': KEY_MINUS, '\b': KEY_BACKSPACE, '\r': KEY_ENTER}
+_KEY_CHARS = {code: char for char, code in _KEY_CODES.items()}
+
+
+def encode_key(char: str) -> int:
+    """按键字符 -> 编码（'\\b' 为退格，'\\r' 为回车）"""
+    if char.isdigit():
+        return int(char)
+    return _KEY_CODES[char]
+
+
+def decode_key(code: int) -> str:
+    """编码 -> 按键字符"""
+    if code < 10:
+        return str(code)
+    return _KEY_CHARS[code]
+
+
+def _write_varint(out: bytearray, value: int):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class Replay:
+    """一局游戏的回放数据"""
+    
+    def __init__(self, seed: int, settings: dict, step: float = 1 / 60,
+                 mastery: Optional[dict] = None):
+        """
+        :param seed: 本局随机种子
+        :param settings: 游戏设置
+        :param step: 逻辑步长（秒）
+        :param mastery: 开局时的算式掌握情况（自适应出题时需要，用于重现题目）
+        """
+        self.seed = seed
+        self.settings = settings
+        self.step = step
+        self.mastery = mastery
+        self.events: List[Tuple[int, str]] = []  # (逻辑步序号, 按键)
+        self.end_tick: Optional[int] = None      # 结束时的逻辑步数
+        self.stats: Optional[dict] = None         # 结束时的成绩
+    
+    def record(self, tick: int, char: str):
+        """记录一次按键（在第 tick 个逻辑步之前生效）"""
+        self.events.append((tick, char))
+    
+    def finish(self, tick: int, stats: Optional[dict] = None):
+        """记录结束时的逻辑步数和成绩"""
+        self.end_tick = tick
+        self.stats = stats
+    
+    def to_bytes(self) -> bytes:
+        """编码为二进制"""
+        header = zlib.compress(json.dumps({
+            'seed': self.seed,
+            'settings': self.settings,
+            'step': self.step,
+            'mastery': self.mastery,
+            'end_tick': self.end_tick,
+            'stats': self.stats
+        }, ensure_ascii=False).encode('utf-8'))
+        
+        out = bytearray(MAGIC)
+        out += struct.pack('<BI', VERSION, len(header))
+        out += header
+        out += struct.pack('<I', len(self.events))
+        last_tick = 0
+        for tick, char in self.events:
+            _write_varint(out, tick - last_tick)
+            out.append(encode_key(char))
+            last_tick = tick
+        return bytes(out)
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Replay':
+        """从二进制解码"""
+        if data[:4] != MAGIC:
+            raise ValueError('不是回放文件')
+        version, header_len = struct.unpack_from('<BI', data, 4)
+        if version != VERSION:
+            raise ValueError(f'不支持的回放版本: {version}')
+        pos = 9
+        header = json.loads(zlib.decompress(data[pos:pos + header_len]).decode('utf-8'))
+        pos += header_len
+        
+        replay = cls(header['seed'], header['settings'], header['step'], header['mastery'])
+        replay.finish(header['end_tick'], header['stats'])
+        
+        count, = struct.unpack_from('<I', data, pos)
+        pos += 4
+        tick = 0
+        for _ in range(count):
+            delta, pos = _read_varint(data, pos)
+            tick += delta
+            replay.events.append((tick, decode_key(data[pos])))
+            pos += 1
+        return replay
+    
+    def save(self, path: str):
+        """保存到文件"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+    
+    @classmethod
+    def load(cls, path: str) -> 'Replay':
+        """从文件读取"""
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
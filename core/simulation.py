@@ -0,0 +1,195 @@
+"""
+无界面模拟引擎
+不依赖 pygame，直接驱动 GameState 和 QuestionGenerator，
+用机器人玩家代替真人答题，以远快于实时的速度跑大量对局，用于调整游戏参数。
+
+用法：python -m core.simulation --games 1000 --accuracy 0.85 --median-time 2.5
+"""
+import argparse
+import math
+import random
+import statistics
+import time
+from typing import Dict, List, Optional, Tuple
+from core.game_state import GameState
+from core.question_generator import Question, QuestionGenerator
+from core.rules import GameRules
+
+
+class BotPolicy:
+    """机器人玩家策略基类"""
+    
+    def answer(self, question: Question, rng: random.Random) -> Tuple[float, bool]:
+        """
+        回答一道题
+        :return: (答题用时秒数, 是否答对)
+        """
+        raise NotImplementedError
+
+
+class FixedAccuracyBot(BotPolicy):
+    """固定正确率、固定答题用时"""
+    
+    def __init__(self, accuracy: float = 0.9, response_time: float = 2.0):
+        self.accuracy = accuracy
+        self.response_time = response_time
+    
+    def answer(self, question: Question, rng: random.Random) -> Tuple[float, bool]:
+        return self.response_time, rng.random() < self.accuracy
+
+
+class DistributionBot(BotPolicy):
+    """
+    答题用时服从对数正态分布（更接近真人：大多数题很快，偶尔卡住很久）
+    可按运算类型调整正确率和用时
+    """
+    
+    def __init__(self, accuracy: float = 0.9, median_time: float = 2.5, sigma: float = 0.4,
+                 op_accuracy: Dict[str, float] = None, op_time_factor: Dict[str, float] = None,
+                 min_time: float = 0.3):
+        """
+        :param accuracy: 默认正确率
+        :param median_time: 答题用时中位数（秒）
+        :param sigma: 对数正态分布的 sigma（越大用时越分散）
+        :param op_accuracy: 各运算类型的正确率，如 {'div': 0.7}
+        :param op_time_factor: 各运算类型的用时倍率，如 {'mul': 1.3}
+        :param min_time: 最短答题用时（秒）
+        """
+        self.accuracy = accuracy
+        self.mu = math.log(median_time)
+        self.sigma = sigma
+        self.op_accuracy = op_accuracy or {}
+        self.op_time_factor = op_time_factor or {}
+        self.min_time = min_time
+    
+    def answer(self, question: Question, rng: random.Random) -> Tuple[float, bool]:
+        response_time = rng.lognormvariate(self.mu, self.sigma)
+        response_time *= self.op_time_factor.get(question.op, 1.0)
+        accuracy = self.op_accuracy.get(question.op, self.accuracy)
+        return max(self.min_time, response_time), rng.random() < accuracy
+
+
+def simulate_game(settings: dict, bot: BotPolicy, rng: random.Random = None,
+                  max_time: float = 600.0) -> dict:
+    """
+    模拟一局游戏
+    时间直接跳到下一个事件（生成障碍物或玩家提交答案），不按帧推进
+    :param settings: 游戏设置（同 GameRules.create_settings）
+    :param bot: 机器人玩家
+    :param rng: 随机数生成器（出题和机器人共用）
+    :param max_time: 最长模拟时间（秒），超过视为存活到结束
+    :return: GameState.get_stats() 的结果，另加 'end_reason'
+    """
+    rng = rng or random.Random()
+    game_state = GameState(settings)
+    generator = QuestionGenerator(
+        enabled_ops=settings.get('enabled_operations', ['add']),
+        difficulty=settings.get('difficulty', 'basic'),
+        rng=rng
+    )
+    game_state.start_game()
+    
+    end_reason = 'timeout'
+    while game_state.elapsed_time < max_time:
+        question = generator.generate()
+        game_state.current_question = question
+        response_time, correct = bot.answer(question, rng)
+        
+        # 推进到提交答案的时刻，途中按时生成障碍物
+        remaining = response_time
+        while remaining > 0 and not game_state.is_game_over:
+            until_spawn = game_state.spawn_interval - game_state.time_since_last_spawn
+            step = min(remaining, max(until_spawn, 0.0))
+            game_state.update(step)
+            remaining -= step
+        
+        if game_state.is_game_over:
+            end_reason = 'stack_full'
+            break
+        
+        if correct:
+            game_state.on_correct_answer()
+        else:
+            game_state.on_wrong_answer()
+    
+    stats = game_state.get_stats()
+    stats['end_reason'] = end_reason
+    return stats
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    """已排序数据的分位数（最近秩）"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def summarize(results: List[dict]) -> dict:
+    """
+    汇总多局模拟结果
+    :return: 各指标的均值和分位数，以及各结束原因的局数
+    """
+    summary = {'games': len(results), 'end_reasons': {}}
+    for result in results:
+        reason = result['end_reason']
+        summary['end_reasons'][reason] = summary['end_reasons'].get(reason, 0) + 1
+    
+    for key in ('elapsed_time', 'score', 'accuracy', 'max_combo', 'total_questions'):
+        values = sorted(result[key] for result in results)
+        summary[key] = {
+            'mean': statistics.fmean(values) if values else 0.0,
+            'p10': _percentile(values, 0.10),
+            'p50': _percentile(values, 0.50),
+            'p90': _percentile(values, 0.90),
+        }
+    return summary
+
+
+def run_simulations(settings: dict, bot: BotPolicy, games: int = 1000,
+                    seed: Optional[int] = None, max_time: float = 600.0) -> dict:
+    """
+    批量模拟
+    :param games: 对局数
+    :param seed: 随机种子（题目和机器人都使用该种子，结果可复现）
+    :return: summarize() 的结果，另加耗时和每秒模拟局数
+    """
+    rng = random.Random(seed)
+    
+    start = time.perf_counter()
+    results = [simulate_game(settings, bot, rng, max_time) for _ in range(games)]
+    wall_time = time.perf_counter() - start
+    
+    summary = summarize(results)
+    summary['wall_time'] = wall_time
+    summary['games_per_second'] = games / wall_time if wall_time > 0 else float('inf')
+    return summary
+
+
+def main():
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description='速算闯关无界面模拟')
+    parser.add_argument('--games', type=int, default=1000, help='模拟局数')
+    parser.add_argument('--accuracy', type=float, default=0.85, help='机器人正确率')
+    parser.add_argument('--median-time', type=float, default=2.5, help='答题用时中位数（秒）')
+    parser.add_argument('--sigma', type=float, default=0.4, help='答题用时分散程度')
+    parser.add_argument('--speed', default='normal', choices=['slow', 'normal', 'fast'])
+    parser.add_argument('--difficulty', default='basic', choices=['basic', 'advanced'])
+    parser.add_argument('--seed', type=int, default=None, help='随机种子')
+    args = parser.parse_args()
+    
+    settings = GameRules.create_settings(speed_mode=args.speed, difficulty=args.difficulty)
+    bot = DistributionBot(accuracy=args.accuracy, median_time=args.median_time, sigma=args.sigma)
+    summary = run_simulations(settings, bot, games=args.games, seed=args.seed)
+    
+    print(f"模拟 {summary['games']} 局，用时 {summary['wall_time']:.2f} 秒"
+          f"（{summary['games_per_second']:.0f} 局/秒）")
+    print(f"结束原因: {summary['end_reasons']}")
+    for key in ('elapsed_time', 'score', 'accuracy', 'max_combo', 'total_questions'):
+        stat = summary[key]
+        print(f"{key}: 均值 {stat['mean']:.1f}  p10 {stat['p10']:.1f}  "
+              f"p50 {stat['p50']:.1f}  p90 {stat['p90']:.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""
+参数扫描
+在 GameRules 参数网格上批量运行无界面模拟，多进程并行，
+每个参数组合（格子）跑完立即追加一行到 CSV，大规模扫描也不必把结果全部留在内存中。
+
+用法：python -m core.sweep --grid '{"spawn_interval_base": [2, 3, 4]}' --games 500 --out sweep.csv
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional
+from core.rules import GameRules
+from core.simulation import BotPolicy, DistributionBot, run_simulations
+
+
+# 可扫描的参数（speed_multiplier 会写入 speed_multipliers 中当前速度模式的倍率）
+SWEEP_PARAMS = ('spawn_interval_base', 'spawn_interval_min', 'wrong_penalty',
+                'correct_reward', 'max_stack', 'speed_mode', 'speed_multiplier')
+
+# 每个格子输出的统计指标
+METRICS = ('elapsed_time', 'score', 'accuracy', 'max_combo', 'total_questions')
+STATS = ('mean', 'p10', 'p50', 'p90')
+
+# 默认扫描网格
+DEFAULT_GRID = {
+    'spawn_interval_base': [2.0, 3.0, 4.0],
+    'spawn_interval_min': [0.5, 0.8],
+    'wrong_penalty': [0.1, 0.2, 0.3],
+}
+
+
+def expand_grid(grid: Dict[str, list]) -> Iterator[dict]:
+    """
+    展开参数网格
+    :param grid: 参数名 -> 取值列表
+    :return: 逐个产生参数组合（按参数名排序后的笛卡尔积）
+    """
+    unknown = set(grid) - set(SWEEP_PARAMS)
+    if unknown:
+        raise ValueError(f"不支持扫描的参数: {sorted(unknown)}")
+    
+    names = sorted(grid)
+    for values in itertools.product(*(grid[name] for name in names)):
+        yield dict(zip(names, values))
+
+
+def build_settings(params: dict, base_settings: dict = None) -> dict:
+    """把一个参数组合转换为游戏设置"""
+    overrides = dict(base_settings or {})
+    overrides.update(params)
+    multiplier = overrides.pop('speed_multiplier', None)
+    settings = GameRules.create_settings(**overrides)
+    if multiplier is not None:
+        speed_mode = settings.get('speed_mode', 'normal')
+        settings['speed_multipliers'] = dict(settings['speed_multipliers'])
+        settings['speed_multipliers'][speed_mode] = multiplier
+    return settings
+
+
+def run_cell(params: dict, bot: BotPolicy, games: int, seed: int,
+             base_settings: dict = None, max_time: float = 600.0) -> dict:
+    """
+    模拟一个格子（在子进程中运行）
+    :return: 参数和各指标统计展平后的一行
+    """
+    settings = build_settings(params, base_settings)
+    summary = run_simulations(settings, bot, games=games, seed=seed, max_time=max_time)
+    
+    row = dict(params)
+    row['games'] = summary['games']
+    row['timeouts'] = summary['end_reasons'].get('timeout', 0)
+    for metric in METRICS:
+        for stat in STATS:
+            row[f'{metric}_{stat}'] = summary[metric][stat]
+    return row
+
+
+def run_sweep(grid: Dict[str, list], bot: BotPolicy, output_path: str,
+              games_per_cell: int = 500, seed: int = 0, workers: Optional[int] = None,
+              base_settings: dict = None, max_time: float = 600.0) -> int:
+    """
+    并行扫描参数网格，结果逐行写入 CSV（完成顺序，不保证与网格顺序一致）
+    :param grid: 参数名 -> 取值列表
+    :param bot: 机器人玩家（需可 pickle）
+    :param output_path: 输出 CSV 路径
+    :param games_per_cell: 每个格子的模拟局数
+    :param seed: 随机种子（第 i 个格子使用 seed + i，结果可复现）
+    :param workers: 进程数（默认 CPU 核数）
+    :param base_settings: 所有格子共用的设置
+    :return: 完成的格子数
+    """
+    workers = workers or os.cpu_count() or 1
+    names = sorted(grid)
+    columns = names + ['games', 'timeouts'] + [f'{m}_{s}' for m in METRICS for s in STATS]
+    cells = enumerate(expand_grid(grid))
+    
+    completed = 0
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    
+    with open(output_path, 'w', newline='', encoding='utf-8') as f, \
+            ProcessPoolExecutor(max_workers=workers) as executor:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        
+        # 同时提交的任务数有上限，避免超大网格一次性占满内存
+        pending = set()
+        for index, params in cells:
+            pending.add(executor.submit(run_cell, params, bot, games_per_cell, seed + index,
+                                        base_settings, max_time))
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                completed += _write_rows(writer, f, done)
+        
+        done, _ = wait(pending)
+        completed += _write_rows(writer, f, done)
+    
+    return completed
+
+
+def _write_rows(writer: csv.DictWriter, f, futures) -> int:
+    """写出已完成格子的结果"""
+    for future in futures:
+        writer.writerow(future.result())
+    f.flush()
+    return len(futures)
+
+
+def main(argv: List[str] = None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description='速算闯关参数扫描')
+    parser.add_argument('--grid', default=None, help='参数网格（JSON），默认使用 DEFAULT_GRID')
+    parser.add_argument('--games', type=int, default=500, help='每个格子的模拟局数')
+    parser.add_argument('--out', default='sweep.csv', help='输出 CSV 路径')
+    parser.add_argument('--workers', type=int, default=None, help='进程数')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子')
+    parser.add_argument('--accuracy', type=float, default=0.85, help='机器人正确率')
+    parser.add_argument('--median-time', type=float, default=2.5, help='答题用时中位数（秒）')
+    args = parser.parse_args(argv)
+    
+    grid = json.loads(args.grid) if args.grid else DEFAULT_GRID
+    bot = DistributionBot(accuracy=args.accuracy, median_time=args.median_time)
+    completed = run_sweep(grid, bot, args.out, games_per_cell=args.games,
+                          seed=args.seed, workers=args.workers)
+    print(f"完成 {completed} 个格子，结果已写入 {args.out}")
+
+
+if __name__ == '__main__':
+    main()
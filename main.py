@@ -1,12 +1,23 @@
 """
 少儿速算闯关程序 - 主入口
 Speed Math Challenge for Kids
+
+启动时先显示主菜单，再在后台线程中加载记录文件并预热游戏界面的字体和图集；
+游戏界面和记录模块在用到时才导入
 """
+import time
+
+# 启动计时起点（在导入 pygame 之前）
+_START_TIME = time.perf_counter()
+
+import os
 import pygame
 import sys
+import threading
+from typing import Optional
+from ui.fonts import get_font
 from ui.main_menu import MainMenu
-from ui.game_view import GameView
-from storage.records import RecordManager
+from ui.profiler import get_profiler, OVERLAY_REFRESH_NS
 
 
 class SpeedMathGame:
@@ -25,6 +36,19 @@ class SpeedMathGame:
         # 时钟
         self.clock = pygame.time.Clock()
         self.fps = 60
+        self.background_fps = 10  # 窗口失去焦点时的渲染帧率
+        self.focused = True
+        
+        # 游戏逻辑按固定步长更新（与渲染帧率无关，结果可复现）
+        self.logic_rate = 60
+        self.max_catchup_steps = 15  # 卡顿后单帧最多追赶的逻辑步数，超出的时间直接丢弃
+        
+        # 脏矩形渲染（关闭后每帧整屏重绘并 flip，便于排查绘制问题）
+        self.use_dirty_rects = True
+        
+        # 空闲时不空转：没有动画时阻塞等待输入，直到画面下一次需要变化
+        self.idle_frame_pacing = True
+        self.max_idle_wait_ms = 1000
         
         # 状态
         self.state = 'menu'  # 'menu', 'game', 'result'
@@ -34,38 +58,165 @@ class SpeedMathGame:
         # 游戏设置
         self.game_settings = None
         
-        # 记录管理器
-        self.record_manager = RecordManager()
+        # 记录管理器（首帧显示后在后台线程中创建，见 _start_background_loading）
+        self.record_manager = None
+        self._loader: Optional[threading.Thread] = None
+        
+        # 启动耗时（毫秒）：首帧、可交互，以及后台加载的各部分
+        self.startup_times = {}
+        self._startup_reported = False
+        
+        # 帧耗时分析（F3 在所有界面之上显示覆盖层，F4 导出 trace）
+        self.profiler = get_profiler()
+        self.profiler_font = get_font(22)
+        self.trace_dir = 'profile'
+        
+        # 每局的回放保存目录（用 python -m ui.replay 重新执行核对成绩），在后台线程中写入
+        self.replay_dir = 'storage/replays'
+        self.replay_writer = None
     
     def run(self):
         """主循环"""
         running = True
+        step = 1.0 / self.logic_rate
+        accumulator = 0.0
+        
+        # 先显示菜单，其余资源在后台加载
+        pygame.display.update(self._draw(0.0))
+        self.startup_times['first_frame'] = (time.perf_counter() - _START_TIME) * 1000
+        self._start_background_loading()
         
         while running:
-            dt = self.clock.tick(self.fps) / 1000.0  # 转换为秒
+            timeout = self._time_until_change()
+            if timeout == 0:
+                fps = self.fps if self.focused else self.background_fps
+                frame_time = self.clock.tick(fps) / 1000.0  # 转换为秒
+                events = pygame.event.get()
+            else:
+                # 没有动画：等待输入或下一次画面变化
+                wait_ms = self.max_idle_wait_ms if timeout is None else max(1, int(timeout * 1000))
+                event = pygame.event.wait(min(wait_ms, self.max_idle_wait_ms))
+                events = pygame.event.get()
+                if event.type != pygame.NOEVENT:
+                    events.insert(0, event)
+                frame_time = self.clock.tick() / 1000.0
             
             # 处理事件
-            for event in pygame.event.get():
+            exposed = False
+            for event in events:
                 if event.type == pygame.QUIT:
                     running = False
+                elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                    # 窗口被遮挡后重新露出或从最小化恢复：窗口内容已失效，整屏重绘
+                    exposed = True
+                elif event.type == pygame.WINDOWFOCUSLOST:
+                    self.focused = False
+                elif event.type == pygame.WINDOWFOCUSGAINED:
+                    self.focused = True
                 else:
                     self._handle_event(event)
             
-            # 更新
-            self._update(dt)
+            # 按固定步长更新，不足一步的时间留到下一帧
+            # （空闲等待的时间是有意跳过的，需要补上，不算卡顿）
+            self.profiler.frame()
+            t = self.profiler.start()
+            limit = step * self.max_catchup_steps + (timeout or 0.0)
+            accumulator = min(accumulator + frame_time, limit)
+            while accumulator >= step:
+                self._update(step)
+                accumulator -= step
+            t = self.profiler.lap('update', t)
+            
+            # 绘制（在上一步和当前步之间插值）
+            if exposed:
+                view = self._current_view()
+                if view is not None:
+                    view.invalidate()
+            dirty_rects = self._draw(accumulator / step)
+            t = self.profiler.lap('draw', t)
             
-            # 绘制
-            self._draw()
+            # 刷新显示（只刷新有变化的区域）
+            if exposed or not self.use_dirty_rects:
+                pygame.display.flip()
+            elif dirty_rects:
+                pygame.display.update(dirty_rects)
+            self.profiler.lap('display', t)
             
-            # 刷新显示
-            pygame.display.flip()
+            if not self._startup_reported and not self._loader.is_alive():
+                self._report_startup()
         
-        # 退出
+        # 退出（先确保记录和回放落盘）
+        self._wait_for_loading()
+        self.record_manager.close()
+        if self.replay_writer is not None:
+            self.replay_writer.close()
         pygame.quit()
         sys.exit()
     
+    def _start_background_loading(self):
+        """在后台线程中加载记录并预热游戏界面资源"""
+        settings = self.main_menu.get_game_settings()
+        self._loader = threading.Thread(target=self._load_in_background, args=(settings,),
+                                        name='startup-loader', daemon=True)
+        self._loader.start()
+    
+    def _load_in_background(self, settings: dict):
+        """后台加载（记录管理器在完成前不会被主线程使用）"""
+        t = time.perf_counter()
+        from storage.records import RecordManager
+        self.record_manager = RecordManager()
+        self.startup_times['records'] = (time.perf_counter() - t) * 1000
+        
+        t = time.perf_counter()
+        try:
+            from ui.game_view import GameView
+            GameView.prewarm((self.width, self.height), settings)
+        except Exception as e:
+            # 预热失败不影响游戏，开始游戏时再正常加载
+            print(f"预加载游戏资源失败: {e}")
+        now = time.perf_counter()
+        self.startup_times['prewarm'] = (now - t) * 1000
+        self.startup_times['interactive'] = (now - _START_TIME) * 1000
+    
+    def _wait_for_loading(self):
+        """等待后台加载完成（开始游戏或退出前调用；还没开始加载时立即开始）"""
+        if self._loader is None:
+            self._start_background_loading()
+        self._loader.join()
+    
+    def _report_startup(self):
+        """打印启动耗时"""
+        self._startup_reported = True
+        times = self.startup_times
+        print(f"启动耗时: 首帧 {times['first_frame']:.0f} ms，可交互 {times['interactive']:.0f} ms"
+              f"（记录 {times['records']:.0f} ms，预热 {times['prewarm']:.0f} ms）")
+    
+    def _time_until_change(self):
+        """
+        当前界面距离画面下一次变化的时间（秒）
+        :return: 0 表示按正常帧率运行，None 表示可以一直等到有输入
+        """
+        if not self.idle_frame_pacing:
+            return 0.0
+        view = self._current_view()
+        if view is None:
+            return 0.0
+        timeout = view.time_until_change()
+        if self.profiler.overlay:
+            # 画面静止时覆盖层也要按刷新间隔更新
+            refresh = OVERLAY_REFRESH_NS / 1e9
+            timeout = refresh if timeout is None else min(timeout, refresh)
+        return timeout
+    
     def _handle_event(self, event: pygame.event.Event):
         """处理事件"""
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            self.profiler.toggle_overlay()
+            return
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+            self._export_trace()
+            return
+        
         if self.state == 'menu':
             action = self.main_menu.handle_event(event)
             if action == 'start':
@@ -82,37 +233,90 @@ class SpeedMathGame:
     def _update(self, dt: float):
         """更新游戏状态"""
         if self.state == 'game' and self.game_view:
+            # 游戏结束时由 game_ended 事件保存记录
             self.game_view.update(dt)
-            
-            # 检查游戏是否结束
-            if self.game_view.is_game_over():
-                # 保存游戏记录
-                stats = self.game_view.get_stats()
-                speed_mode = self.game_settings.get('speed_mode', 'normal')
-                self.record_manager.save_game_result(stats, speed_mode)
     
-    def _draw(self):
-        """绘制画面"""
+    def _current_view(self):
+        """当前显示的界面（主菜单或游戏界面，没有时为 None）"""
         if self.state == 'menu':
-            self.main_menu.draw()
-        elif self.state == 'game' and self.game_view:
-            self.game_view.draw()
+            return self.main_menu
+        if self.state == 'game' and self.game_view:
+            return self.game_view
+        return None
+    
+    def _draw(self, alpha: float = 1.0) -> list:
+        """
+        绘制画面
+        :param alpha: 插值系数（距上一逻辑步经过的时间占步长的比例）
+        :return: 需要刷新的区域列表
+        """
+        view = self._current_view()
+        if view is None:
+            return []
+        
+        # 先擦掉上一帧的帧耗时覆盖层，界面照常只重绘自己有变化的部分
+        dirty = []
+        overlay_rect = self.profiler.erase_overlay(self.screen)
+        if overlay_rect:
+            dirty.append(overlay_rect)
+        
+        if not self.use_dirty_rects:
+            view.invalidate()
+        dirty += view.draw(alpha) if view is self.game_view else view.draw()
+        
+        # 帧耗时覆盖层（F3）画在所有界面之上（包括主菜单和游戏结束画面）
+        overlay_rect = self.profiler.draw_overlay(self.screen, self.profiler_font)
+        if overlay_rect:
+            dirty.append(overlay_rect)
+        return dirty
     
     def _start_game(self):
         """开始游戏"""
         # 获取游戏设置
         self.game_settings = self.main_menu.get_game_settings()
         
-        # 创建游戏视图
-        self.game_view = GameView(self.screen, self.game_settings)
+        # 后台加载还没完成时在这里等待
+        self._wait_for_loading()
+        from ui.game_view import GameView
+        
+        # 创建游戏视图（按当前难度的算式掌握情况自适应出题）
+        mastery = self.record_manager.get_mastery(self.game_settings.get('difficulty', 'basic'))
+        self.game_view = GameView(self.screen, self.game_settings, mastery=mastery)
+        self.game_view.replay.step = 1.0 / self.logic_rate
+        
+        # 本局结束时保存记录和回放（每局只触发一次）
+        self.game_view.game_state.subscribe('game_ended', self.record_manager.on_game_ended)
+        self.game_view.game_state.subscribe('game_ended', self._save_replay)
         
         # 切换状态
         self.state = 'game'
     
+    def _export_trace(self):
+        """导出帧耗时 trace（Chrome trace-event JSON）"""
+        if not self.profiler.trace:
+            print("没有可导出的帧耗时数据，请先按 F3 开启")
+            return
+        path = os.path.join(self.trace_dir, time.strftime('trace-%Y%m%d-%H%M%S.json'))
+        try:
+            print(f"帧耗时 trace 已导出: {self.profiler.export_trace(path)}")
+        except OSError as e:
+            print(f"导出 trace 失败: {e}")
+    
+    def _save_replay(self, event: dict):
+        """game_ended 事件回调：把本局回放交给写盘线程保存（编码和写文件都不占渲染线程）"""
+        if self.replay_writer is None:
+            from storage.backends import BackgroundWriter, ReplayBackend
+            self.replay_writer = BackgroundWriter(ReplayBackend(self.replay_dir), snapshot=None,
+                                                  name='replay-writer')
+        replay = self.game_view.replay
+        replay.finish(self.game_view.tick, event['stats'])
+        self.replay_writer.append(None, replay)
+    
     def _return_to_menu(self):
         """返回主菜单"""
         self.state = 'menu'
         self.game_view = None
+        self.main_menu.invalidate()
 
 
 def main():
@@ -1,6 +1,10 @@
 """
 数据存储模块
 """
-from .records import RecordManager
+from .records import RecordManager, open_record_manager
+from .backends import StorageBackend, JsonFileBackend, JournalBackend, BackgroundWriter
+from .sqlite_records import SQLiteRecordManager
+from .leaderboard import Leaderboard, TopK
 
-__all__ = ['RecordManager']
+__all__ = ['RecordManager', 'open_record_manager', 'StorageBackend', 'JsonFileBackend',
+           'JournalBackend', 'BackgroundWriter', 'SQLiteRecordManager', 'Leaderboard', 'TopK']
@@ -0,0 +1,426 @@
+"""
+存储后端模块
+RecordManager 通过存储后端读写记录：
+- JsonFileBackend：每局结束后整文件重写 records.json（旧行为）
+- JournalBackend：每局结果追加一行到 JSON-lines 日志，定期压缩成快照
+- BackgroundWriter：包装上面的后端，在写盘线程中执行，主线程不等待磁盘 I/O
+- ReplayBackend：每局回放保存为一个文件，只保留最近的若干局（通常也包装在 BackgroundWriter 中）
+"""
+import atexit
+import json
+import os
+import queue
+import threading
+from typing import Callable, List, Optional
+from storage.leaderboard import Leaderboard, DEFAULT_DIFFICULTY, DEFAULT_K
+
+
+# 历史记录保留条数
+HISTORY_LIMIT = 100
+
+# 回放目录保留的回放文件数
+REPLAY_LIMIT = 200
+
+
+def create_empty_records() -> dict:
+    """创建空记录"""
+    return {
+        'best_scores': {
+            'slow': [],
+            'normal': [],
+            'fast': []
+        },
+        'total_games': 0,
+        'total_questions': 0,
+        'total_correct': 0,
+        'total_wrong': 0,
+        'history': [],
+        'mastery': {}
+    }
+
+
+def merge_mastery(records: dict, difficulty: str, updates: dict):
+    """
+    把一局中有变化的算式掌握情况合并到记录中
+    :param updates: MasteryTracker.pop_updates() 的结果
+    """
+    data = records.setdefault('mastery', {}).setdefault(difficulty, {'step': 0, 'facts': {}})
+    data['step'] = max(data['step'], updates['step'])
+    data['facts'].update(updates['facts'])
+    for key in updates.get('removed', ()):
+        data['facts'].pop(key, None)
+
+
+def apply_game_record(records: dict, game_record: dict, leaderboard: Leaderboard = None,
+                      best_k: int = DEFAULT_K) -> Optional[int]:
+    """
+    把一局结果合并到记录中（更新总计、历史和最高分）
+    :param records: 记录字典（原地修改）
+    :param game_record: 单局记录
+    :param leaderboard: 包装 records['best_scores'] 的排行榜（连续合并多局时复用）
+    :param best_k: 没有传入排行榜时，每个速度模式和难度保留的最高分条数
+    :return: 排行榜名次（未上榜返回 None）
+    """
+    # 算式掌握情况单独合并，不随对局记录存入历史和排行榜
+    if 'mastery' in game_record:
+        game_record = dict(game_record)
+        merge_mastery(records, game_record.get('difficulty', DEFAULT_DIFFICULTY),
+                      game_record.pop('mastery'))
+    
+    # 更新总计
+    records['total_games'] += 1
+    records['total_questions'] += game_record.get('total_questions', 0)
+    records['total_correct'] += game_record.get('correct_count', 0)
+    records['total_wrong'] += game_record.get('wrong_count', 0)
+    
+    # 添加到历史记录（保留最近100条）
+    records['history'].append(game_record)
+    if len(records['history']) > HISTORY_LIMIT:
+        del records['history'][:-HISTORY_LIMIT]
+    
+    # 更新最高分（每个速度模式和难度保留前K名）
+    if leaderboard is None:
+        leaderboard = Leaderboard(records['best_scores'], best_k)
+    return leaderboard.insert(game_record)
+
+
+def snapshot_records(records: dict) -> dict:
+    """
+    记录的一致快照（交给写盘线程，之后主线程继续修改原记录也不受影响）
+    只复制会被原地修改的容器：历史、榜单列表和算式掌握情况的字典；
+    单局记录存入后不再修改，算式记录更新时整体替换（见 MasteryTracker.record），都直接共享
+    """
+    snapshot = dict(records)
+    snapshot['history'] = list(records['history'])
+    snapshot['best_scores'] = {key: list(entries)
+                               for key, entries in records['best_scores'].items()}
+    snapshot['mastery'] = {
+        difficulty: {'step': data.get('step', 0), 'facts': dict(data.get('facts', {}))}
+        for difficulty, data in records.get('mastery', {}).items()
+    }
+    return snapshot
+
+
+def write_json_atomic(path: str, data: dict, indent: Optional[int] = None):
+    """原子写入 JSON 文件：先写临时文件并落盘，再替换目标文件"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class StorageBackend:
+    """存储后端基类"""
+    
+    def load(self) -> Optional[dict]:
+        """读取全部记录，没有记录时返回 None"""
+        raise NotImplementedError
+    
+    def append(self, records: dict, game_record: dict):
+        """
+        持久化一局结果
+        :param records: 已合并本局结果的完整记录
+        :param game_record: 本局记录
+        """
+        raise NotImplementedError
+    
+    def append_many(self, records: dict, game_records: List[dict]):
+        """
+        持久化多局结果（默认逐局调用 append）
+        :param records: 已合并这些对局的完整记录
+        :param game_records: 各局记录（按时间顺序）
+        """
+        for game_record in game_records:
+            self.append(records, game_record)
+    
+    def flush(self):
+        """把缓冲的数据写到磁盘"""
+    
+    def close(self):
+        """关闭后端"""
+        self.flush()
+
+
+class JsonFileBackend(StorageBackend):
+    """单个 JSON 文件存储（每次保存重写整个文件）"""
+    
+    def __init__(self, path: str):
+        self.path = path
+    
+    def load(self) -> Optional[dict]:
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def append(self, records: dict, game_record: dict):
+        write_json_atomic(self.path, records, indent=2)
+    
+    def append_many(self, records: dict, game_records: List[dict]):
+        # 整个文件只需按最新的记录重写一次
+        self.append(records, game_records[-1])
+
+
+class JournalBackend(StorageBackend):
+    """
+    追加日志存储
+    快照文件保存压缩后的完整记录（格式与 records.json 相同），
+    日志文件每行一局结果。读取时用快照加日志重建记录。
+    每行带一个递增的序号（journal_seq），快照记下压缩时的最后一个序号作为检查点；
+    不用对局时间戳判断，系统时钟回拨（夏令时结束、手动改时间）时也不会漏掉或重复对局
+    """
+    
+    def __init__(self, snapshot_path: str, journal_path: str = None,
+                 fsync_every: int = 4, compact_every: int = 200, best_k: int = DEFAULT_K):
+        """
+        :param snapshot_path: 快照文件路径
+        :param journal_path: 日志文件路径（默认为快照路径加 .journal）
+        :param fsync_every: 每追加多少行强制落盘一次
+        :param compact_every: 日志达到多少行时压缩到快照
+        :param best_k: 重放日志时每个速度模式和难度保留的最高分条数（与 RecordManager 相同）
+        """
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path or snapshot_path + '.journal'
+        self.fsync_every = fsync_every
+        self.compact_every = compact_every
+        self.best_k = best_k
+        
+        self._journal = None        # 追加模式打开的日志文件
+        self._journal_lines = 0     # 日志中的记录行数
+        self._unsynced = 0          # 尚未 fsync 的行数
+        self._seq = 0               # 最近一行的序号（压缩时写入快照作为检查点）
+    
+    def load(self) -> Optional[dict]:
+        records = None
+        checkpoint = None       # 序号不超过检查点的日志行已包含在快照中（压缩后、清空日志前崩溃的情况）
+        legacy_checkpoint = ''  # 旧版本按时间戳记录的检查点
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                records = json.load(f)
+            checkpoint = records.pop('journal_seq', None)
+            legacy_checkpoint = records.pop('journal_checkpoint', '')
+        self._seq = checkpoint or 0
+        
+        self._journal_lines = 0
+        leaderboard = None
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            
+            lines = content.split('\n')
+            if lines[-1]:
+                # 写入中途崩溃留下的残行：截掉，避免之后追加的记录接在残行后面
+                with open(self.journal_path, 'w', encoding='utf-8') as f:
+                    f.write(content[:len(content) - len(lines[-1])])
+            
+            for line in lines[:-1]:
+                try:
+                    game_record = json.loads(line)
+                except ValueError:
+                    continue
+                seq = game_record.pop('journal_seq', None)
+                if seq is None:
+                    # 旧版本写的日志行（没有序号）：快照已按序号压缩过时都已包含在内，
+                    # 否则按旧的时间戳检查点判断
+                    if checkpoint is not None or game_record.get('timestamp', '') <= legacy_checkpoint:
+                        continue
+                elif seq <= self._seq:
+                    continue
+                else:
+                    self._seq = seq
+                if records is None:
+                    records = create_empty_records()
+                if leaderboard is None:
+                    leaderboard = Leaderboard(records['best_scores'], self.best_k)
+                apply_game_record(records, game_record, leaderboard)
+                self._journal_lines += 1
+        
+        return records
+    
+    def _open_journal(self):
+        """以追加模式打开日志文件"""
+        if self._journal is None:
+            directory = os.path.dirname(self.journal_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        return self._journal
+    
+    def append(self, records: dict, game_record: dict):
+        self.append_many(records, [game_record])
+    
+    def append_many(self, records: dict, game_records: List[dict]):
+        # records 已包含整批对局：先写完整批日志行，再按需落盘和压缩。
+        # 不能逐局调用 append，否则批中途压缩时快照已含后面的对局，
+        # 检查点却停在中途，后面的日志行在读取时会被重复合并
+        journal = self._open_journal()
+        for game_record in game_records:
+            self._seq += 1
+            line = json.dumps(dict(game_record, journal_seq=self._seq), ensure_ascii=False)
+            journal.write(line + '\n')
+        journal.flush()
+        self._journal_lines += len(game_records)
+        self._unsynced += len(game_records)
+        
+        if self._unsynced >= self.fsync_every:
+            self.flush()
+        
+        if self._journal_lines >= self.compact_every:
+            self.compact(records)
+    
+    def compact(self, records: dict):
+        """把完整记录写成快照并清空日志"""
+        snapshot = dict(records, journal_seq=self._seq)
+        write_json_atomic(self.snapshot_path, snapshot, indent=2)
+        
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        open(self.journal_path, 'w', encoding='utf-8').close()
+        self._journal_lines = 0
+        self._unsynced = 0
+    
+    def flush(self):
+        if self._journal is not None and self._unsynced:
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._unsynced = 0
+    
+    def close(self):
+        self.flush()
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+
+class BackgroundWriter(StorageBackend):
+    """
+    后台写盘
+    保存请求连同记录快照放入有界队列，由写盘线程交给被包装的后端；
+    写盘线程每次取出队列中积压的全部对局，用最新的快照一次写出。
+    读取时由 RecordManager 直接使用内存中的记录，不需要等待写盘
+    """
+    
+    def __init__(self, backend: StorageBackend, max_pending: int = 64,
+                 snapshot: Optional[Callable[[dict], dict]] = snapshot_records,
+                 name: str = 'record-writer'):
+        """
+        :param backend: 实际执行读写的后端（只在写盘线程中使用）
+        :param max_pending: 队列上限（写盘严重落后时 append 会等待）
+        :param snapshot: 入队时复制记录的函数（None 表示不复制，如 ReplayBackend 不使用记录）
+        :param name: 写盘线程名
+        """
+        self.backend = backend
+        self.snapshot = snapshot
+        self.name = name
+        self._queue = queue.Queue(max_pending)
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+    
+    def load(self) -> Optional[dict]:
+        return self.backend.load()
+    
+    def append(self, records: dict, game_record: dict):
+        if self._closed:
+            raise RuntimeError('存储后端已关闭')
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+            # 没有调用 close() 就退出时也要写完
+            atexit.register(self.close)
+        if self.snapshot is not None:
+            records = self.snapshot(records)
+        self._queue.put((records, game_record))
+    
+    def _run(self):
+        """写盘线程"""
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            # None 表示关闭（由 close() 最后放入）
+            pending = [item for item in batch if item is not None]
+            if pending:
+                try:
+                    self.backend.append_many(pending[-1][0],
+                                             [game_record for _, game_record in pending])
+                except Exception as e:
+                    print(f"保存记录失败: {e}")
+            
+            for _ in batch:
+                self._queue.task_done()
+            if len(pending) < len(batch):
+                return
+    
+    def flush(self):
+        """等待队列中的对局写完，并让被包装的后端落盘"""
+        if self._thread is not None:
+            self._queue.join()
+        self.backend.flush()
+    
+    def close(self):
+        """写完队列中的对局后关闭（可重复调用）"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+        self.backend.close()
+
+
+class ReplayBackend(StorageBackend):
+    """
+    回放存储
+    每局回放保存为目录中的一个文件（<对局标识>.smr），每次写入后删除最旧的文件，
+    只保留最近 keep 局。append 的 game_record 为结束后的 core.replay.Replay，records 不使用
+    """
+    
+    def __init__(self, directory: str, keep: int = REPLAY_LIMIT):
+        """
+        :param directory: 回放目录
+        :param keep: 保留的回放文件数
+        """
+        self.directory = directory
+        self.keep = keep
+    
+    def load(self) -> Optional[dict]:
+        return None
+    
+    def append(self, records: Optional[dict], game_record):
+        self.append_many(records, [game_record])
+    
+    def append_many(self, records: Optional[dict], game_records: list):
+        for replay in game_records:
+            path = os.path.join(self.directory, f"{replay.stats['session_id']}.smr")
+            try:
+                replay.save(path)
+            except OSError as e:
+                print(f"保存回放失败: {e}")
+        self.prune()
+    
+    def prune(self):
+        """删除最旧的回放文件，只保留最近 keep 个"""
+        try:
+            entries = [entry for entry in os.scandir(self.directory)
+                       if entry.name.endswith('.smr') and entry.is_file()]
+        except OSError:
+            return
+        if len(entries) <= self.keep:
+            return
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:len(entries) - self.keep]:
+            try:
+                os.remove(entry.path)
+            except OSError as e:
+                print(f"删除旧回放失败: {e}")
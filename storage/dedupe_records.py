@@ -0,0 +1,124 @@
+"""
+记录去重工具（一次性使用）
+旧版本在游戏结束画面每帧都会保存一次结果，records.json 中留下了大量
+时间戳只相差几毫秒的重复记录。本工具删除这些重复记录并修正总计。
+
+默认只统计不修改；加 --write 才写回文件，写回前把原文件备份为 <路径>.bak。
+
+用法：python -m storage.dedupe_records [records.json路径] [--rebuild-totals] [--write]
+"""
+import argparse
+import json
+import shutil
+from datetime import datetime
+from typing import List, Tuple
+from storage.backends import write_json_atomic
+
+
+# 除时间戳外字段完全相同、且与上一条间隔不超过该秒数的记录视为重复
+DUPLICATE_WINDOW = 5.0
+
+# 比较时忽略的字段
+_IGNORED_FIELDS = ('timestamp', 'session_id')
+
+
+def _record_key(record: dict) -> tuple:
+    """记录内容（不含时间戳）"""
+    return tuple(sorted((k, v) for k, v in record.items() if k not in _IGNORED_FIELDS))
+
+
+def _parse_time(record: dict) -> datetime:
+    """解析记录时间戳"""
+    return datetime.fromisoformat(record['timestamp'])
+
+
+def find_duplicates(records: List[dict]) -> set:
+    """
+    找出重复记录
+    :param records: 记录列表（顺序不限）
+    :return: 重复记录的时间戳集合（每组保留最早的一条）
+    """
+    duplicates = set()
+    last_seen = {}  # 记录内容 -> 该组最近一条的时间
+    for record in sorted(records, key=_parse_time):
+        key = _record_key(record)
+        time = _parse_time(record)
+        previous = last_seen.get(key)
+        if previous is not None and (time - previous).total_seconds() <= DUPLICATE_WINDOW:
+            duplicates.add(record['timestamp'])
+        last_seen[key] = time
+    return duplicates
+
+
+def dedupe_records(data: dict, rebuild_totals: bool = False) -> Tuple[dict, int]:
+    """
+    删除重复记录
+    :param data: records.json 的内容（原地修改）
+    :param rebuild_totals: 是否按去重后的记录重新计算总计
+        （历史只保留最近100条，更早的重复无法逐条扣除，总计明显失真时使用）
+    :return: (修改后的数据, 删除的重复对局数)
+    """
+    # 历史和排行榜中的同一局时间戳相同，合并后按时间戳去重
+    unique = {}
+    for record in data.get('history', []):
+        unique[record['timestamp']] = record
+    for records in data.get('best_scores', {}).values():
+        for record in records:
+            unique[record['timestamp']] = record
+    
+    duplicates = find_duplicates(list(unique.values()))
+    
+    data['history'] = [r for r in data.get('history', []) if r['timestamp'] not in duplicates]
+    for mode, records in data.get('best_scores', {}).items():
+        data['best_scores'][mode] = [r for r in records if r['timestamp'] not in duplicates]
+    
+    if rebuild_totals:
+        kept = [r for ts, r in unique.items() if ts not in duplicates]
+        data['total_games'] = len(kept)
+        data['total_questions'] = sum(r.get('total_questions', 0) for r in kept)
+        data['total_correct'] = sum(r.get('correct_count', 0) for r in kept)
+        data['total_wrong'] = sum(r.get('wrong_count', 0) for r in kept)
+    else:
+        for timestamp in duplicates:
+            record = unique[timestamp]
+            data['total_games'] = max(0, data.get('total_games', 0) - 1)
+            data['total_questions'] = max(0, data.get('total_questions', 0)
+                                          - record.get('total_questions', 0))
+            data['total_correct'] = max(0, data.get('total_correct', 0)
+                                        - record.get('correct_count', 0))
+            data['total_wrong'] = max(0, data.get('total_wrong', 0)
+                                      - record.get('wrong_count', 0))
+    
+    return data, len(duplicates)
+
+
+def main(argv: List[str] = None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description='删除 records.json 中的重复对局记录')
+    parser.add_argument('path', nargs='?', default='storage/records.json', help='记录文件路径')
+    parser.add_argument('--rebuild-totals', action='store_true',
+                        help='按去重后的记录重新计算总计')
+    parser.add_argument('--write', action='store_true',
+                        help='写回文件（原文件备份为 <路径>.bak）；不加时只统计，不修改文件')
+    args = parser.parse_args(argv)
+    
+    with open(args.path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    total_games = data.get('total_games', 0)
+    
+    data, removed = dedupe_records(data, rebuild_totals=args.rebuild_totals)
+    summary = f"重复记录 {removed} 条，总局数 {total_games} -> {data.get('total_games', 0)}"
+    
+    if not args.write:
+        print(f"{summary}（未修改文件，加 --write 写回）: {args.path}")
+        return
+    
+    # 先备份，再原子替换（写到一半中断不会截断原文件）
+    backup_path = args.path + '.bak'
+    shutil.copy2(args.path, backup_path)
+    write_json_atomic(args.path, data, indent=2)
+    print(f"{summary}，已写回: {args.path}（原文件备份: {backup_path}）")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+排行榜模块
+每个速度模式和难度各保存一个前 K 名榜单，插入时二分定位，无需整体重新排序
+"""
+from bisect import bisect_right
+from typing import Dict, List, Optional
+
+
+# 默认保留的名次数
+DEFAULT_K = 10
+
+# 默认难度（旧记录没有 difficulty 字段，视为基础难度）
+DEFAULT_DIFFICULTY = 'basic'
+
+
+def board_key(speed_mode: str, difficulty: str = DEFAULT_DIFFICULTY) -> str:
+    """
+    榜单在 best_scores 中的键
+    基础难度直接用速度模式（与旧版 records.json 兼容），其他难度为 '速度模式/难度'
+    """
+    if difficulty == DEFAULT_DIFFICULTY:
+        return speed_mode
+    return f'{speed_mode}/{difficulty}'
+
+
+class TopK:
+    """
+    前 K 名榜单
+    直接包装 best_scores 中的记录列表（按分数降序），序列化时无需转换
+    """
+    
+    def __init__(self, entries: List[dict] = None, k: int = DEFAULT_K):
+        """
+        :param entries: 记录列表（原地维护；未排序或超出 K 条时会整理一次）
+        :param k: 保留的名次数
+        """
+        self.k = k
+        self.entries = entries if entries is not None else []
+        
+        # 同分时保持原顺序（先达到的排在前面）
+        self.entries.sort(key=lambda x: x['score'], reverse=True)
+        del self.entries[k:]
+        
+        # 分数取负后升序排列，便于二分查找
+        self._keys = [-entry['score'] for entry in self.entries]
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+    
+    def rank(self, score: int) -> int:
+        """该分数的名次（从1开始，同分排在已有记录之后；可能大于 K）"""
+        return bisect_right(self._keys, -score) + 1
+    
+    def insert(self, entry: dict) -> Optional[int]:
+        """
+        插入一条记录
+        :return: 名次（从1开始），未进入前 K 名时返回 None
+        """
+        key = -entry['score']
+        pos = bisect_right(self._keys, key)
+        if pos >= self.k:
+            return None
+        
+        self._keys.insert(pos, key)
+        self.entries.insert(pos, entry)
+        if len(self.entries) > self.k:
+            self._keys.pop()
+            self.entries.pop()
+        return pos + 1
+    
+    def best_score(self) -> Optional[int]:
+        """最高分"""
+        return self.entries[0]['score'] if self.entries else None
+    
+    def top(self, limit: int = None) -> List[dict]:
+        """前 limit 名记录"""
+        return self.entries[:limit]
+
+
+class Leaderboard:
+    """
+    全部榜单
+    包装记录中的 best_scores 字典，每个速度模式和难度一个 TopK
+    """
+    
+    def __init__(self, best_scores: Dict[str, List[dict]], k: int = DEFAULT_K):
+        self.best_scores = best_scores
+        self.k = k
+        self._boards: Dict[str, TopK] = {}
+    
+    def board(self, speed_mode: str, difficulty: str = DEFAULT_DIFFICULTY,
+              create: bool = False) -> TopK:
+        """
+        获取榜单
+        :param create: 不存在时是否在 best_scores 中创建（只读查询时返回临时的空榜单）
+        """
+        key = board_key(speed_mode, difficulty)
+        board = self._boards.get(key)
+        if board is None:
+            if key not in self.best_scores and not create:
+                return TopK([], self.k)
+            board = TopK(self.best_scores.setdefault(key, []), self.k)
+            self._boards[key] = board
+        return board
+    
+    def insert(self, game_record: dict) -> Optional[int]:
+        """插入一局记录，返回名次（未上榜返回 None）"""
+        board = self.board(game_record.get('speed_mode'),
+                           game_record.get('difficulty', DEFAULT_DIFFICULTY), create=True)
+        return board.insert(game_record)
@@ -2,57 +2,80 @@
 数据存储模块
 负责保存和读取游戏记录
 """
-import json
 import os
 from datetime import datetime
 from typing import Optional, Dict, List
+from core.mastery import MasteryTracker
+from storage.backends import (StorageBackend, BackgroundWriter, JournalBackend,
+                              apply_game_record, create_empty_records)
+from storage.leaderboard import Leaderboard, DEFAULT_K, DEFAULT_DIFFICULTY
 
 
 class RecordManager:
     """记录管理器"""
     
-    def __init__(self, storage_file: str = 'storage/records.json'):
+    def __init__(self, storage_file: str = 'storage/records.json',
+                 backend: StorageBackend = None, best_k: int = DEFAULT_K):
+        """
+        :param storage_file: 记录文件路径
+        :param backend: 存储后端（默认在后台线程中写以记录文件为快照的追加日志）
+        :param best_k: 每个速度模式和难度保留的最高分条数
+        """
         self.storage_file = storage_file
+        self.backend = backend or BackgroundWriter(JournalBackend(storage_file, best_k=best_k))
         self.records = self._load_records()
+        
+        # 排行榜（原地维护 records['best_scores'] 中的列表）
+        self.leaderboard = Leaderboard(self.records['best_scores'], best_k)
+        self.last_rank: Optional[int] = None  # 最近一局的名次（未上榜为 None）
+        
+        # 已保存过的对局标识（同一局结果只保存一次）
+        self._saved_sessions = self._collect_session_ids()
+        
+        # 各难度的算式掌握情况（原地维护 records['mastery'] 中的数据）
+        self._mastery: Dict[str, MasteryTracker] = {}
+    
+    def _collect_session_ids(self) -> set:
+        """收集记录中已有的对局标识"""
+        session_ids = set()
+        entries = list(self.records['history'])
+        for records in self.records['best_scores'].values():
+            entries.extend(records)
+        for entry in entries:
+            if entry.get('session_id'):
+                session_ids.add(entry['session_id'])
+        return session_ids
     
     def _load_records(self) -> dict:
         """加载记录"""
-        if os.path.exists(self.storage_file):
-            try:
-                with open(self.storage_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"加载记录失败: {e}")
-                return self._create_empty_records()
-        else:
+        try:
+            records = self.backend.load()
+        except Exception as e:
+            print(f"加载记录失败: {e}")
             return self._create_empty_records()
+        return records if records is not None else self._create_empty_records()
     
     def _create_empty_records(self) -> dict:
         """创建空记录"""
-        return {
-            'best_scores': {
-                'slow': [],
-                'normal': [],
-                'fast': []
-            },
-            'total_games': 0,
-            'total_questions': 0,
-            'total_correct': 0,
-            'total_wrong': 0,
-            'history': []
-        }
+        return create_empty_records()
     
-    def save_game_result(self, stats: dict, speed_mode: str):
+    def on_game_ended(self, event: dict):
+        """game_ended 事件回调：保存本局结果"""
+        stats = event['stats']
+        self.save_game_result(stats, stats.get('speed_mode', 'normal'))
+    
+    def save_game_result(self, stats: dict, speed_mode: str) -> bool:
         """
         保存游戏结果
-        :param stats: 游戏统计数据
+        :param stats: 游戏统计数据（含 session_id 时同一局只会保存一次）
         :param speed_mode: 速度模式
+        :return: 是否保存（重复的对局返回 False）
         """
-        # 更新总计
-        self.records['total_games'] += 1
-        self.records['total_questions'] += stats.get('total_questions', 0)
-        self.records['total_correct'] += stats.get('correct_count', 0)
-        self.records['total_wrong'] += stats.get('wrong_count', 0)
+        session_id = stats.get('session_id')
+        if session_id:
+            if session_id in self._saved_sessions:
+                return False
+            self._saved_sessions.add(session_id)
         
         # 创建游戏记录
         game_record = {
@@ -64,50 +87,59 @@ class RecordManager:
             'total_questions': stats.get('total_questions', 0),
             'accuracy': stats.get('accuracy', 0),
             'elapsed_time': stats.get('elapsed_time', 0),
-            'max_combo': stats.get('max_combo', 0)
+            'max_combo': stats.get('max_combo', 0),
+            'difficulty': stats.get('difficulty', DEFAULT_DIFFICULTY)
         }
+        if session_id:
+            game_record['session_id'] = session_id
         
-        # 添加到历史记录（保留最近100条）
-        self.records['history'].append(game_record)
-        if len(self.records['history']) > 100:
-            self.records['history'] = self.records['history'][-100:]
-        
-        # 更新最高分（每个速度模式保留前10名）
-        if speed_mode in self.records['best_scores']:
-            self.records['best_scores'][speed_mode].append(game_record)
-            # 按分数排序
-            self.records['best_scores'][speed_mode].sort(
-                key=lambda x: x['score'], 
-                reverse=True
-            )
-            # 只保留前10名
-            self.records['best_scores'][speed_mode] = \
-                self.records['best_scores'][speed_mode][:10]
+        # 本局有变化的算式掌握情况随对局一起保存
+        tracker = self._mastery.get(game_record['difficulty'])
+        updates = tracker.pop_updates() if tracker else None
+        if updates:
+            game_record['mastery'] = updates
         
-        # 保存到文件
-        self._save_to_file()
+        # 合并到内存中的记录并持久化
+        self.last_rank = apply_game_record(self.records, game_record, self.leaderboard)
+        self._save(game_record)
+        return True
+    
+    def _save(self, game_record: dict):
+        """通过存储后端保存"""
+        try:
+            self.backend.append(self.records, game_record)
+        except Exception as e:
+            print(f"保存记录失败: {e}")
     
-    def _save_to_file(self):
-        """保存到文件"""
+    def close(self):
+        """关闭存储后端（退出前调用，确保数据落盘）"""
         try:
-            # 确保目录存在
-            os.makedirs(os.path.dirname(self.storage_file), exist_ok=True)
-            
-            with open(self.storage_file, 'w', encoding='utf-8') as f:
-                json.dump(self.records, f, ensure_ascii=False, indent=2)
+            self.backend.close()
         except Exception as e:
             print(f"保存记录失败: {e}")
     
-    def get_best_score(self, speed_mode: str) -> Optional[int]:
+    def get_mastery(self, difficulty: str = DEFAULT_DIFFICULTY) -> MasteryTracker:
+        """获取某个难度的算式掌握情况（作答记录在下一次保存对局时一并保存）"""
+        tracker = self._mastery.get(difficulty)
+        if tracker is None:
+            data = self.records.setdefault('mastery', {}).setdefault(difficulty, {})
+            tracker = self._mastery[difficulty] = MasteryTracker(data)
+        return tracker
+    
+    def get_best_score(self, speed_mode: str,
+                       difficulty: str = DEFAULT_DIFFICULTY) -> Optional[int]:
         """获取某个速度模式的最高分"""
-        scores = self.records['best_scores'].get(speed_mode, [])
-        if scores:
-            return scores[0]['score']
-        return None
+        return self.leaderboard.board(speed_mode, difficulty).best_score()
     
-    def get_best_records(self, speed_mode: str, limit: int = 5) -> List[dict]:
+    def get_best_records(self, speed_mode: str, limit: int = 5,
+                         difficulty: str = DEFAULT_DIFFICULTY) -> List[dict]:
         """获取某个速度模式的最佳记录"""
-        return self.records['best_scores'].get(speed_mode, [])[:limit]
+        return self.leaderboard.board(speed_mode, difficulty).top(limit)
+    
+    def get_rank(self, score: int, speed_mode: str,
+                 difficulty: str = DEFAULT_DIFFICULTY) -> int:
+        """查询分数在排行榜中的名次（从1开始，可能超出保留的名次数）"""
+        return self.leaderboard.board(speed_mode, difficulty).rank(score)
     
     def get_overall_stats(self) -> dict:
         """获取总体统计"""
@@ -129,3 +161,16 @@ class RecordManager:
     def get_recent_games(self, limit: int = 10) -> List[dict]:
         """获取最近的游戏记录"""
         return self.records['history'][-limit:][::-1]  # 倒序返回
+
+
+def open_record_manager(storage_file: str = 'storage/records.json'):
+    """
+    按文件扩展名选择记录存储
+    :param storage_file: .db / .sqlite 使用 SQLite（首次创建时导入同目录的 records.json），
+        其他使用 JSON 快照加追加日志
+    """
+    if storage_file.endswith(('.db', '.sqlite')):
+        from storage.sqlite_records import SQLiteRecordManager
+        json_file = os.path.join(os.path.dirname(storage_file), 'records.json')
+        return SQLiteRecordManager(storage_file, import_from=json_file)
+    return RecordManager(storage_file)
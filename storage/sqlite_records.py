@@ -0,0 +1,342 @@
+"""
+SQLite 记录存储
+与 RecordManager 接口相同，适合多名学生共用一台电脑、对局数量很大的场景。
+排行榜和历史查询走索引，不需要把全部记录读入内存。
+"""
+import os
+import sqlite3
+from datetime import datetime
+from typing import Dict, Optional, List
+from core.mastery import MasteryTracker
+from storage.backends import JournalBackend
+from storage.leaderboard import DEFAULT_DIFFICULTY, DEFAULT_K
+
+
+# 数据库结构版本（记录在 PRAGMA user_version 中）
+SCHEMA_VERSION = 3
+
+# 单局记录字段（与 records.json 中的字段相同）
+GAME_FIELDS = ('timestamp', 'speed_mode', 'difficulty', 'score', 'correct_count',
+               'wrong_count', 'total_questions', 'accuracy', 'elapsed_time', 'max_combo')
+
+# 算式掌握情况（每个难度的每个算式一行，另记各难度已作答题数）
+_MASTERY_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS mastery (
+    difficulty TEXT NOT NULL,
+    fact TEXT NOT NULL,
+    mastery REAL NOT NULL,
+    avg_time REAL NOT NULL,
+    attempts INTEGER NOT NULL,
+    box INTEGER NOT NULL,
+    due INTEGER NOT NULL,
+    PRIMARY KEY (difficulty, fact)
+);
+CREATE TABLE IF NOT EXISTS mastery_steps (
+    difficulty TEXT PRIMARY KEY,
+    step INTEGER NOT NULL
+);
+'''
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT UNIQUE,
+    player TEXT NOT NULL DEFAULT '',
+    timestamp TEXT NOT NULL,
+    speed_mode TEXT NOT NULL,
+    difficulty TEXT NOT NULL DEFAULT 'basic',
+    score INTEGER NOT NULL,
+    correct_count INTEGER NOT NULL,
+    wrong_count INTEGER NOT NULL,
+    total_questions INTEGER NOT NULL,
+    accuracy REAL NOT NULL,
+    elapsed_time REAL NOT NULL,
+    max_combo INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_games_mode_score ON games (speed_mode, difficulty, score DESC, id);
+CREATE INDEX IF NOT EXISTS idx_games_timestamp ON games (timestamp);
+CREATE INDEX IF NOT EXISTS idx_games_player_timestamp ON games (player, timestamp);
+CREATE TABLE IF NOT EXISTS totals (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    total_games INTEGER NOT NULL,
+    total_questions INTEGER NOT NULL,
+    total_correct INTEGER NOT NULL,
+    total_wrong INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO totals VALUES (1, 0, 0, 0, 0);
+''' + _MASTERY_SCHEMA
+
+# 版本1 -> 2：增加难度列，排行榜索引加入难度
+_MIGRATE_V2 = '''
+ALTER TABLE games ADD COLUMN difficulty TEXT NOT NULL DEFAULT 'basic';
+DROP INDEX IF EXISTS idx_games_mode_score;
+CREATE INDEX idx_games_mode_score ON games (speed_mode, difficulty, score DESC, id);
+'''
+
+# 版本2 -> 3：增加算式掌握情况
+_MIGRATE_V3 = _MASTERY_SCHEMA
+
+
+class SQLiteRecordManager:
+    """SQLite 记录管理器"""
+    
+    def __init__(self, db_file: str = 'storage/records.db',
+                 import_from: Optional[str] = 'storage/records.json', best_k: int = DEFAULT_K):
+        """
+        :param db_file: 数据库文件路径
+        :param import_from: 首次创建数据库时导入的 records.json（None 表示不导入）
+        :param best_k: 排行榜名次区分的前 K 名（与 RecordManager 的 best_k 相同）
+        """
+        self.db_file = db_file
+        self.best_k = best_k
+        directory = os.path.dirname(db_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self.conn = sqlite3.connect(db_file)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self._migrate(import_from)
+        
+        self.last_rank: Optional[int] = None  # 最近一局的名次（未上榜为 None）
+        self._mastery: Dict[str, MasteryTracker] = {}
+    
+    def _migrate(self, import_from: Optional[str]):
+        """建表或升级表结构，首次创建时导入旧的 JSON 记录"""
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        
+        if version > 0:
+            if version < 2:
+                self.conn.executescript(_MIGRATE_V2)
+            if version < 3:
+                self.conn.executescript(_MIGRATE_V3)
+            self.conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            return
+        
+        self.conn.executescript(_SCHEMA)
+        with self.conn:
+            if import_from and os.path.exists(import_from):
+                self.import_json(import_from)
+            self.conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+    
+    def import_json(self, path: str) -> int:
+        """
+        导入 records.json（含追加日志）中的记录
+        :return: 导入的对局数
+        """
+        records = JournalBackend(path).load()
+        if not records:
+            return 0
+        
+        # 历史和排行榜中的同一局时间戳相同，按时间戳去重
+        unique = {}
+        for record in records.get('history', []):
+            unique[record['timestamp']] = record
+        for best in records.get('best_scores', {}).values():
+            for record in best:
+                unique[record['timestamp']] = record
+        
+        with self.conn:
+            for timestamp in sorted(unique):
+                self._insert(unique[timestamp])
+            # 历史只保留了最近的对局，总计以 JSON 中的数值为准
+            self.conn.execute(
+                'UPDATE totals SET total_games = ?, total_questions = ?, '
+                'total_correct = ?, total_wrong = ? WHERE id = 1',
+                (records.get('total_games', 0), records.get('total_questions', 0),
+                 records.get('total_correct', 0), records.get('total_wrong', 0))
+            )
+            for difficulty, data in records.get('mastery', {}).items():
+                self._save_mastery(difficulty, data)
+        return len(unique)
+    
+    def _insert(self, game_record: dict) -> bool:
+        """插入一局记录，session_id 重复时忽略"""
+        cursor = self.conn.execute(
+            'INSERT OR IGNORE INTO games (session_id, player, ' + ', '.join(GAME_FIELDS) + ') '
+            'VALUES (' + ', '.join('?' * (len(GAME_FIELDS) + 2)) + ')',
+            (game_record.get('session_id'), game_record.get('player', '')) +
+            tuple(game_record.get(field, DEFAULT_DIFFICULTY if field == 'difficulty' else 0)
+                  for field in GAME_FIELDS)
+        )
+        return cursor.rowcount > 0
+    
+    def _save_mastery(self, difficulty: str, updates: dict):
+        """写入有变化的算式掌握情况"""
+        self.conn.executemany(
+            'INSERT OR REPLACE INTO mastery VALUES (?, ?, ?, ?, ?, ?, ?)',
+            [(difficulty, key) + tuple(entry) for key, entry in updates.get('facts', {}).items()]
+        )
+        self.conn.executemany(
+            'DELETE FROM mastery WHERE difficulty = ? AND fact = ?',
+            [(difficulty, key) for key in updates.get('removed', ())]
+        )
+        self.conn.execute(
+            'INSERT OR REPLACE INTO mastery_steps VALUES (?, ?)',
+            (difficulty, updates.get('step', 0))
+        )
+    
+    def on_game_ended(self, event: dict):
+        """game_ended 事件回调：保存本局结果"""
+        stats = event['stats']
+        self.save_game_result(stats, stats.get('speed_mode', 'normal'))
+    
+    def save_game_result(self, stats: dict, speed_mode: str) -> bool:
+        """
+        保存游戏结果
+        :param stats: 游戏统计数据（含 session_id 时同一局只会保存一次）
+        :param speed_mode: 速度模式
+        :return: 是否保存（重复的对局返回 False）
+        """
+        game_record = {
+            'session_id': stats.get('session_id'),
+            'player': stats.get('player', ''),
+            'timestamp': datetime.now().isoformat(),
+            'speed_mode': speed_mode,
+            'difficulty': stats.get('difficulty', DEFAULT_DIFFICULTY),
+            'score': stats.get('score', 0),
+            'correct_count': stats.get('correct_count', 0),
+            'wrong_count': stats.get('wrong_count', 0),
+            'total_questions': stats.get('total_questions', 0),
+            'accuracy': stats.get('accuracy', 0),
+            'elapsed_time': stats.get('elapsed_time', 0),
+            'max_combo': stats.get('max_combo', 0)
+        }
+        
+        try:
+            with self.conn:
+                rank = self.get_rank(game_record['score'], speed_mode, game_record['difficulty'])
+                if not self._insert(game_record):
+                    return False
+                self.last_rank = rank if rank <= self.best_k else None
+                tracker = self._mastery.get(game_record['difficulty'])
+                updates = tracker.pop_updates() if tracker else None
+                if updates:
+                    self._save_mastery(game_record['difficulty'], updates)
+                self.conn.execute(
+                    'UPDATE totals SET total_games = total_games + 1, '
+                    'total_questions = total_questions + ?, '
+                    'total_correct = total_correct + ?, '
+                    'total_wrong = total_wrong + ? WHERE id = 1',
+                    (game_record['total_questions'], game_record['correct_count'],
+                     game_record['wrong_count'])
+                )
+        except sqlite3.Error as e:
+            print(f"保存记录失败: {e}")
+            return False
+        return True
+    
+    def _to_dict(self, row: sqlite3.Row) -> dict:
+        """把查询结果行转换为与 JSON 记录相同的字典"""
+        record = {field: row[field] for field in GAME_FIELDS}
+        if row['session_id']:
+            record['session_id'] = row['session_id']
+        if row['player']:
+            record['player'] = row['player']
+        return record
+    
+    def get_mastery(self, difficulty: str = DEFAULT_DIFFICULTY) -> MasteryTracker:
+        """获取某个难度的算式掌握情况（作答记录在下一次保存对局时一并保存）"""
+        tracker = self._mastery.get(difficulty)
+        if tracker is None:
+            row = self.conn.execute(
+                'SELECT step FROM mastery_steps WHERE difficulty = ?', (difficulty,)
+            ).fetchone()
+            rows = self.conn.execute(
+                'SELECT fact, mastery, avg_time, attempts, box, due FROM mastery '
+                'WHERE difficulty = ?', (difficulty,)
+            )
+            data = {'step': row[0] if row else 0,
+                    'facts': {r[0]: list(r[1:]) for r in rows}}
+            tracker = self._mastery[difficulty] = MasteryTracker(data)
+        return tracker
+    
+    def get_best_score(self, speed_mode: str,
+                       difficulty: str = DEFAULT_DIFFICULTY) -> Optional[int]:
+        """获取某个速度模式的最高分"""
+        row = self.conn.execute(
+            'SELECT MAX(score) FROM games WHERE speed_mode = ? AND difficulty = ?',
+            (speed_mode, difficulty)
+        ).fetchone()
+        return row[0]
+    
+    def get_best_records(self, speed_mode: str, limit: int = 5,
+                         difficulty: str = DEFAULT_DIFFICULTY) -> List[dict]:
+        """获取某个速度模式的最佳记录"""
+        rows = self.conn.execute(
+            'SELECT * FROM games WHERE speed_mode = ? AND difficulty = ? '
+            'ORDER BY score DESC, id LIMIT ?',
+            (speed_mode, difficulty, limit)
+        )
+        return [self._to_dict(row) for row in rows]
+    
+    def get_rank(self, score: int, speed_mode: str,
+                 difficulty: str = DEFAULT_DIFFICULTY) -> int:
+        """
+        查询分数在排行榜中的名次（从1开始，同分排在已有记录之后）
+        与 RecordManager 一样只区分前 K 名：排在 K 名之后时返回 K + 1，
+        计数最多扫描 K 行索引，不随对局总数变慢
+        """
+        row = self.conn.execute(
+            'SELECT COUNT(*) FROM (SELECT 1 FROM games '
+            'WHERE speed_mode = ? AND difficulty = ? AND score >= ? LIMIT ?)',
+            (speed_mode, difficulty, score, self.best_k)
+        ).fetchone()
+        return row[0] + 1
+    
+    def get_overall_stats(self) -> dict:
+        """获取总体统计"""
+        row = self.conn.execute('SELECT * FROM totals WHERE id = 1').fetchone()
+        total_questions = row['total_questions']
+        total_correct = row['total_correct']
+        
+        overall_accuracy = 0
+        if total_questions > 0:
+            overall_accuracy = (total_correct / total_questions) * 100
+        
+        return {
+            'total_games': row['total_games'],
+            'total_questions': total_questions,
+            'total_correct': total_correct,
+            'total_wrong': row['total_wrong'],
+            'overall_accuracy': overall_accuracy
+        }
+    
+    def get_recent_games(self, limit: int = 10) -> List[dict]:
+        """获取最近的游戏记录"""
+        rows = self.conn.execute('SELECT * FROM games ORDER BY id DESC LIMIT ?', (limit,))
+        return [self._to_dict(row) for row in rows]
+    
+    def get_games(self, player: Optional[str] = None, since: Optional[str] = None,
+                  until: Optional[str] = None, limit: int = 100) -> List[dict]:
+        """
+        按学生和日期查询对局（最新的在前）
+        :param player: 学生名（None 表示不限）
+        :param since: 起始时间（ISO 格式，含）
+        :param until: 结束时间（ISO 格式，不含）
+        """
+        conditions = []
+        params = []
+        if player is not None:
+            conditions.append('player = ?')
+            params.append(player)
+        if since is not None:
+            conditions.append('timestamp >= ?')
+            params.append(since)
+        if until is not None:
+            conditions.append('timestamp < ?')
+            params.append(until)
+        
+        where = ('WHERE ' + ' AND '.join(conditions)) if conditions else ''
+        rows = self.conn.execute(
+            f'SELECT * FROM games {where} ORDER BY timestamp DESC LIMIT ?',
+            params + [limit]
+        )
+        return [self._to_dict(row) for row in rows]
+    
+    def close(self):
+        """关闭数据库连接"""
+        self.conn.close()
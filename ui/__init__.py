@@ -1,8 +1,19 @@
 """
 UI模块
+GameView 在第一次访问时才导入（连带 numpy 和游戏逻辑），导入主菜单不需要等它加载
 """
-from .fonts import FontManager, get_font_manager, get_font
+from .fonts import (FontManager, GlyphAtlas, TextCache, get_font_manager, get_font,
+                    get_atlas, render_text)
+from .sprites import SpriteCache, get_sprite_cache
 from .main_menu import MainMenu
-from .game_view import GameView
 
-__all__ = ['FontManager', 'get_font_manager', 'get_font', 'MainMenu', 'GameView']
+__all__ = ['FontManager', 'GlyphAtlas', 'TextCache', 'get_font_manager', 'get_font',
+           'get_atlas', 'render_text', 'SpriteCache', 'get_sprite_cache',
+           'MainMenu', 'GameView']
+
+
+def __getattr__(name: str):
+    if name == 'GameView':
+        from .game_view import GameView
+        return GameView
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,137 @@
+"""
+实体存储模块
+怪兽、子弹等同类实体按字段分别存放在 NumPy 数组中（结构数组），
+移动、浮动、淡出等每帧更新对整个数组一次完成，不必逐个遍历 Python 对象。
+存储本身就是对象池：槽位预先分配，取用（acquire）时重置为默认值，释放（release）后复用；
+每帧计算用的临时数组也按名称复用（scratch），对局中不再分配内存
+"""
+import numpy as np
+from typing import Dict, Optional
+
+
+class EntityStore:
+    """
+    同类实体的结构数组存储（对象池）
+    每个字段一个 NumPy 数组，前 count 个槽位是在用的实体；容量不足时成倍扩容，
+    用 reserve 预留到预计的最大数量后，对局中不会再扩容。
+    释放时用末尾的实体填补空位（不保持顺序，只有释放末尾的实体时顺序不变）
+    """
+    
+    def __init__(self, fields: Dict[str, type], capacity: int = 16,
+                 defaults: Optional[Dict[str, float]] = None):
+        """
+        :param fields: 字段名 -> dtype
+        :param capacity: 初始容量
+        :param defaults: 取用槽位时各字段的初始值（未给出的字段为 0）
+        """
+        self.fields = dict(fields)
+        self.defaults = dict(defaults or {})
+        self.capacity = capacity
+        self.count = 0
+        # 字段名 -> 整个容量的数组（逐个实体读写时直接按下标访问，不创建视图）
+        self.arrays = {name: np.zeros(capacity, dtype) for name, dtype in self.fields.items()}
+        self._scratch: Dict[str, np.ndarray] = {}
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def __getitem__(self, name: str) -> np.ndarray:
+        """字段的在用部分（视图，可原地修改）"""
+        return self.arrays[name][:self.count]
+    
+    def scratch(self, name: str, dtype=np.float64) -> np.ndarray:
+        """
+        与在用部分等长的临时数组（按名称复用，作为 NumPy 运算的 out 参数）
+        内容不保留，使用前需要重新写入
+        """
+        array = self._scratch.get(name)
+        if array is None or array.dtype != dtype:
+            array = self._scratch[name] = np.zeros(self.capacity, dtype)
+        return array[:self.count]
+    
+    def reserve(self, capacity: int):
+        """预留容量（之后实体数不超过该数量时不再扩容）"""
+        while self.capacity < capacity:
+            self._grow()
+    
+    def reset(self, index: int):
+        """把槽位的各字段恢复为默认值"""
+        defaults = self.defaults
+        for name, array in self.arrays.items():
+            array[index] = defaults.get(name, 0)
+    
+    def acquire(self) -> int:
+        """
+        取用一个槽位（各字段为默认值）
+        :return: 实体下标
+        """
+        if self.count == self.capacity:
+            self._grow()
+        index = self.count
+        self.reset(index)
+        self.count += 1
+        return index
+    
+    def acquire_many(self, count: int) -> slice:
+        """
+        取用连续的 count 个槽位（各字段为默认值），用于成批生成实体
+        :return: 下标切片
+        """
+        self.reserve(self.count + count)
+        block = slice(self.count, self.count + count)
+        defaults = self.defaults
+        for name, array in self.arrays.items():
+            array[block] = defaults.get(name, 0)
+        self.count += count
+        return block
+    
+    def release(self, index: int):
+        """释放一个实体（末尾的实体移到该位置）"""
+        last = self.count - 1
+        if index != last:
+            for array in self.arrays.values():
+                array[index] = array[last]
+        self.count = last
+    
+    def release_where(self, mask: np.ndarray):
+        """
+        释放 mask 为真的实体
+        保留下来的末尾实体依次填补前面的空位，只移动被填补的那几个
+        """
+        if not mask.any():
+            return
+        removed = np.flatnonzero(mask)
+        remaining = self.count - len(removed)
+        holes = removed[removed < remaining]
+        movers = np.flatnonzero(~mask[remaining:]) + remaining
+        for array in self.arrays.values():
+            array[holes] = array[movers]
+        self.count = remaining
+    
+    def transfer(self, index: int, other: 'EntityStore') -> int:
+        """
+        把一个实体移到另一个字段相同的存储中（例如从场上移到消除动画中）
+        :return: 在另一个存储中的下标
+        """
+        target = other.acquire()
+        for name, array in self.arrays.items():
+            other.arrays[name][target] = array[index]
+        self.release(index)
+        return target
+    
+    def get(self, index: int) -> dict:
+        """读取一个实体的全部字段（调试用）"""
+        return {name: array[index].item() for name, array in self.arrays.items()}
+    
+    def clear(self):
+        """释放全部实体"""
+        self.count = 0
+    
+    def _grow(self):
+        """容量翻倍"""
+        self.capacity *= 2
+        for name, array in self.arrays.items():
+            grown = np.zeros(self.capacity, array.dtype)
+            grown[:self.count] = array[:self.count]
+            self.arrays[name] = grown
+        self._scratch.clear()
@@ -1,18 +1,37 @@
 """
 字体管理模块 - 直接使用系统字体文件
+缓存可在后台线程中预热（启动时预先加载游戏界面的字体和图集），访问时加锁
 """
 import pygame
 import sys
 import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Tuple
+
+
+# 字形图集默认预渲染的字符：数字、运算符和题目中用到的符号
+ATLAS_CHARSET = '0123456789+-−×÷=?%:. '
 
 
 class FontManager:
     """字体管理器"""
     
+    # 最多缓存的字体对象数量（超出后淘汰最久未使用的）
+    MAX_CACHED_FONTS = 16
+    
     def __init__(self):
         pygame.font.init()
         self._font_path = self._find_system_font()
         print(f"使用字体文件: {self._font_path}")
+        
+        # 字体缓存：(路径, 字号, 粗体) -> Font
+        self._fonts: OrderedDict = OrderedDict()
+        # 字形图集缓存：(字体, 颜色, 抗锯齿) -> GlyphAtlas
+        self._atlases: Dict[tuple, 'GlyphAtlas'] = {}
+        
+        # 同一个字体对象不能被两个线程同时用来渲染
+        self._lock = threading.RLock()
     
     def _find_system_font(self):
         """查找系统中文字体文件"""
@@ -53,7 +72,22 @@ class FontManager:
         return None
     
     def get_font(self, size: int, bold: bool = False) -> pygame.font.Font:
-        """获取指定大小的字体"""
+        """获取指定大小的字体（带缓存，避免重复解析字体文件）"""
+        key = (self._font_path, size, bold)
+        with self._lock:
+            font = self._fonts.get(key)
+            if font is not None:
+                self._fonts.move_to_end(key)
+                return font
+            
+            font = self._load_font(size, bold)
+            self._fonts[key] = font
+            if len(self._fonts) > self.MAX_CACHED_FONTS:
+                self._fonts.popitem(last=False)
+            return font
+    
+    def _load_font(self, size: int, bold: bool) -> pygame.font.Font:
+        """从字体文件加载字体"""
         try:
             if self._font_path:
                 return pygame.font.Font(self._font_path, size)
@@ -63,20 +97,172 @@ class FontManager:
         except Exception as e:
             print(f"字体加载失败: {e}")
             return pygame.font.Font(None, size)
+    
+    def get_atlas(self, font: pygame.font.Font, color: tuple,
+                  antialias: bool = True, strings: Iterable[str] = ()) -> 'GlyphAtlas':
+        """
+        获取字形图集
+        :param font: 字体
+        :param color: 文字颜色
+        :param antialias: 是否抗锯齿
+        :param strings: 需要整串预渲染的固定文本
+        """
+        key = (font, tuple(color), antialias)
+        with self._lock:
+            atlas = self._atlases.get(key)
+            if atlas is None:
+                atlas = GlyphAtlas(font, color, antialias)
+                self._atlases[key] = atlas
+            atlas.add_strings(strings)
+            return atlas
+
+
+class GlyphAtlas:
+    """字形图集：预渲染单个字符和固定文本，绘制时直接从图集贴图"""
+    
+    def __init__(self, font: pygame.font.Font, color: tuple,
+                 antialias: bool = True, charset: str = ATLAS_CHARSET):
+        self.font = font
+        self.color = tuple(color)
+        self.antialias = antialias
+        self.height = font.get_height()
+        
+        # 图集表面和各条目在图集中的位置
+        self._sheet = None
+        self._rects: Dict[str, pygame.Rect] = {}
+        self._chars = set()
+        self._strings = set()
+        
+        self._build(set(charset), set())
+    
+    def _build(self, chars: set, strings: set):
+        """把所有字符和固定文本排布到一张图集表面上"""
+        entries = sorted(chars | strings)
+        surfaces = [self.font.render(entry, self.antialias, self.color) for entry in entries]
+        width = sum(surface.get_width() for surface in surfaces) or 1
+        height = max([surface.get_height() for surface in surfaces] + [1])
+        
+        sheet = pygame.Surface((width, height), pygame.SRCALPHA)
+        rects = {}
+        x = 0
+        for entry, surface in zip(entries, surfaces):
+            # BLEND_RGBA_MAX 保留原始颜色和透明度（透明底上直接混合会使边缘变暗）
+            sheet.blit(surface, (x, 0), special_flags=pygame.BLEND_RGBA_MAX)
+            rects[entry] = pygame.Rect(x, 0, surface.get_width(), surface.get_height())
+            x += surface.get_width()
+        
+        self._sheet = sheet
+        self._rects = rects
+        self._chars = chars
+        self._strings = strings
+    
+    def add_strings(self, strings: Iterable[str]):
+        """追加固定文本（会重建图集，仅应在初始化时调用）"""
+        new_strings = set(strings) - self._strings
+        if new_strings:
+            self._build(self._chars, self._strings | new_strings)
+    
+    def can_draw(self, text: str) -> bool:
+        """文本能否完全由图集绘制"""
+        return text in self._strings or all(ch in self._chars for ch in text)
+    
+    def size(self, text: str) -> Tuple[int, int]:
+        """计算文本绘制尺寸"""
+        if text in self._rects:
+            return self._rects[text].size
+        if not self.can_draw(text):
+            return self.font.size(text)
+        return sum(self._rects[ch].width for ch in text), self.height
+    
+    def draw(self, screen: pygame.Surface, text: str, **anchor) -> pygame.Rect:
+        """
+        绘制文本
+        :param anchor: 定位参数，与 Rect 属性同名，例如 center=(x, y)
+        :return: 绘制区域
+        """
+        rect = pygame.Rect((0, 0), self.size(text))
+        for name, value in anchor.items():
+            setattr(rect, name, value)
+        
+        if text in self._rects:
+            screen.blit(self._sheet, rect, self._rects[text])
+        elif self.can_draw(text):
+            x = rect.x
+            for ch in text:
+                area = self._rects[ch]
+                screen.blit(self._sheet, (x, rect.y), area)
+                x += area.width
+        else:
+            # 图集中没有的字符：退回到直接渲染
+            screen.blit(self.font.render(text, self.antialias, self.color), rect)
+        return rect
+
+
+class TextCache:
+    """文本表面缓存：相同文字只渲染一次，按最近最少使用淘汰"""
+    
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self._surfaces: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def render(self, font: pygame.font.Font, text: str, antialias: bool,
+               color: tuple) -> pygame.Surface:
+        """渲染文本（命中缓存时直接返回之前的表面）"""
+        key = (font, text, tuple(color), antialias)
+        with self._lock:
+            surface = self._surfaces.get(key)
+            if surface is not None:
+                self._surfaces.move_to_end(key)
+                return surface
+            
+            surface = font.render(text, antialias, color)
+            self._surfaces[key] = surface
+            if len(self._surfaces) > self.max_size:
+                self._surfaces.popitem(last=False)
+            return surface
+    
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._surfaces.clear()
 
 
 # 全局字体管理器实例
 _font_manager = None
+_font_manager_lock = threading.Lock()
+
+# 全局文本缓存实例
+_text_cache = TextCache()
 
 
 def get_font_manager() -> FontManager:
     """获取全局字体管理器实例"""
     global _font_manager
     if _font_manager is None:
-        _font_manager = FontManager()
+        with _font_manager_lock:
+            if _font_manager is None:
+                _font_manager = FontManager()
     return _font_manager
 
 
+def get_text_cache() -> TextCache:
+    """获取全局文本缓存实例"""
+    return _text_cache
+
+
 def get_font(size: int, bold: bool = False) -> pygame.font.Font:
     """快捷函数：获取字体"""
     return get_font_manager().get_font(size, bold)
+
+
+def get_atlas(font: pygame.font.Font, color: tuple,
+              antialias: bool = True, strings: Iterable[str] = ()) -> GlyphAtlas:
+    """快捷函数：获取字形图集"""
+    return get_font_manager().get_atlas(font, color, antialias, strings)
+
+
+def render_text(font: pygame.font.Font, text: str, antialias: bool,
+                color: tuple) -> pygame.Surface:
+    """快捷函数：渲染文本（带缓存，参数顺序与 Font.render 相同）"""
+    return _text_cache.render(font, text, antialias, color)
@@ -2,149 +2,153 @@
 游戏主界面
 显示题目、输入框、障碍物堆叠等
 """
+import random
+import numpy as np
 import pygame
 from typing import Optional
 from core.game_state import GameState
 from core.question_generator import QuestionGenerator, Question
-from ui.fonts import get_font
+from core.replay import Replay
+from ui.entities import EntityStore
+from ui.fonts import get_font, get_atlas, render_text
+from ui.particles import ParticleSystem
+from ui.profiler import get_profiler
+from ui.sprites import (BULLET_RADIUS, FLAME_LENGTHS, MONSTER_COLORS, flame_origin,
+                        get_sprite_cache)
 
 
-class Obstacle:
-    """敌人类（小怪物）"""
-    
-    def __init__(self, x: int, y: int, size: int = 28, index: int = 0):
-        self.x = x
-        self.y = y
-        self.size = size
-        self.target_x = x
-        self.target_y = y
-        self.alpha = 255
-        self.scale = 1.0
-        self.color = self._random_color()
-        
-        # 动画参数
-        import random
-        self.float_offset = 0  # 悬浮偏移
-        self.float_speed = 1.5 + random.random() * 1.0  # 悬浮速度（随机）
-        self.float_amplitude = 8 + random.random() * 4  # 悬浮幅度（随机）
-        self.wobble_offset = 0  # 摆动偏移
-        self.wobble_speed = 2.0 + random.random() * 1.0  # 摆动速度
-        self.time = random.random() * 6.28  # 随机起始时间（避免所有怪兽同步）
-        self.index = index  # 怪兽索引（用于交错排列）
+# 怪兽字段：当前位置、上一逻辑步的绘制位置（渲染时在两步之间插值）、目标位置、
+# 悬浮和摆动动画参数、消除动画的透明度和缩放、颜色（MONSTER_COLORS 下标）
+MONSTER_FIELDS = {
+    'x': np.float64, 'y': np.float64,
+    'prev_x': np.float64, 'prev_y': np.float64,
+    'target_x': np.float64, 'target_y': np.float64,
+    'float_offset': np.float64, 'float_speed': np.float64, 'float_amplitude': np.float64,
+    'wobble_offset': np.float64, 'wobble_speed': np.float64,
+    'time': np.float64,
+    'alpha': np.float64, 'scale': np.float64,
+    'color': np.int8,
+}
+
+# 怪兽取用时的初始值（未列出的字段为 0）
+MONSTER_DEFAULTS = {'alpha': 255, 'scale': 1.0}
+
+# 子弹字段：x 固定，y 垂直向上飞到目标高度；颜色为目标怪兽的颜色（击中时碎片用）
+BULLET_FIELDS = {
+    'x': np.float64, 'y': np.float64, 'prev_y': np.float64, 'target_y': np.float64,
+    'time': np.float64, 'speed': np.float64,
+    'color': np.int8,
+}
+
+# 怪兽尺寸
+MONSTER_SIZE = 28
+
+# 子弹颜色和速度
+BULLET_COLOR = (255, 255, 0)
+BULLET_SPEED = 600
+
+# 尾焰闪烁时每帧持续的逻辑步数
+FLAME_FRAME_TICKS = 4
+
+
+def spawn_monster(store: EntityStore, x: float, y: float, rng=random) -> int:
+    """
+    添加一只怪兽（随机颜色和动画参数）
+    :return: 怪兽下标
+    """
+    index = store.acquire()
+    arrays = store.arrays
+    arrays['color'][index] = rng.randrange(len(MONSTER_COLORS))
+    arrays['x'][index] = arrays['prev_x'][index] = arrays['target_x'][index] = x
+    arrays['y'][index] = arrays['prev_y'][index] = arrays['target_y'][index] = y
+    arrays['float_speed'][index] = 1.5 + rng.random() * 1.0      # 悬浮速度
+    arrays['float_amplitude'][index] = 8 + rng.random() * 4      # 悬浮幅度
+    arrays['wobble_speed'][index] = 2.0 + rng.random() * 1.0     # 摆动速度
+    arrays['time'][index] = rng.random() * 6.28  # 随机起始时间（避免所有怪兽同步）
+    return index
+
+
+def update_monsters(store: EntityStore, dt: float):
+    """所有怪兽向目标位置移动，并更新悬浮和摆动动画"""
+    x, y = store['x'], store['y']
+    float_offset, wobble_offset = store['float_offset'], store['wobble_offset']
+    np.add(x, wobble_offset, out=store['prev_x'])
+    np.add(y, float_offset, out=store['prev_y'])
     
-    def _random_color(self) -> tuple:
-        """随机颜色"""
-        import random
-        colors = [
-            (255, 100, 100),  # 红色怪物
-            (255, 150, 50),   # 橙色怪物
-            (200, 100, 200),  # 紫色怪物
-            (100, 150, 255),  # 蓝色怪物
-        ]
-        return random.choice(colors)
+    # 向目标位置移动（相差不到 1 像素时不再移动）
+    delta, step = store.scratch('delta'), store.scratch('step')
+    moving = store.scratch('moving', np.bool_)
+    for position, target in ((x, store['target_x']), (y, store['target_y'])):
+        np.subtract(target, position, out=delta)
+        np.greater(np.abs(delta, out=step), 1, out=moving)
+        if moving.any():
+            np.multiply(delta, 5 * dt, out=step)
+            step *= moving
+            position += step
     
-    def update(self, dt: float):
-        """更新位置和动画"""
-        import math
-        
-        # 向目标位置移动
-        if abs(self.target_y - self.y) > 1:
-            self.y += (self.target_y - self.y) * 5 * dt
-        if abs(self.target_x - self.x) > 1:
-            self.x += (self.target_x - self.x) * 5 * dt
-        
-        # 更新动画时间
-        self.time += dt
-        
-        # 悬浮动画（上下浮动）
-        self.float_offset = math.sin(self.time * self.float_speed) * self.float_amplitude
-        
-        # 摆动动画（轻微左右摆动）
-        self.wobble_offset = math.sin(self.time * self.wobble_speed) * 3
-    
-    def draw(self, screen: pygame.Surface):
-        """绘制👾样式的外星怪兽"""
-        size = int(self.size * self.scale)
-        # 应用动画偏移
-        center_x = int(self.x + self.wobble_offset)
-        center_y = int(self.y + self.float_offset)
-        
-        # 创建带透明度的表面
-        monster_surface = pygame.Surface((size * 2 + 20, size * 2 + 20), pygame.SRCALPHA)
-        base_x = size + 10
-        base_y = size + 10
-        
-        # 外星人身体（方形）
-        body_rect = pygame.Rect(base_x - size, base_y - size, size * 2, size * 2)
-        pygame.draw.rect(monster_surface, (*self.color, self.alpha), body_rect)
-        
-        # 触角（上方两个小方块）
-        antenna_size = size // 3
-        pygame.draw.rect(monster_surface, (*self.color, self.alpha), 
-                        (base_x - size // 2 - antenna_size // 2, base_y - size - antenna_size, 
-                         antenna_size, antenna_size))
-        pygame.draw.rect(monster_surface, (*self.color, self.alpha), 
-                        (base_x + size // 2 - antenna_size // 2, base_y - size - antenna_size, 
-                         antenna_size, antenna_size))
-        
-        # 眼睛（方形）
-        eye_size = size // 3
-        left_eye_x = base_x - size // 2
-        right_eye_x = base_x + size // 2 - eye_size
-        eye_y = base_y - size // 3
-        
-        pygame.draw.rect(monster_surface, (255, 255, 255, self.alpha),
-                        (left_eye_x, eye_y, eye_size, eye_size))
-        pygame.draw.rect(monster_surface, (255, 255, 255, self.alpha),
-                        (right_eye_x, eye_y, eye_size, eye_size))
-        
-        # 眼珠（小方块）
-        pupil_size = eye_size // 2
-        pygame.draw.rect(monster_surface, (0, 0, 0, self.alpha),
-                        (left_eye_x + eye_size // 4, eye_y + eye_size // 4, pupil_size, pupil_size))
-        pygame.draw.rect(monster_surface, (0, 0, 0, self.alpha),
-                        (right_eye_x + eye_size // 4, eye_y + eye_size // 4, pupil_size, pupil_size))
-        
-        # 嘴巴（锯齿状）
-        mouth_y = base_y + size // 4
-        tooth_width = size // 5
-        for i in range(5):
-            x = base_x - size + i * tooth_width * 2
-            if i % 2 == 0:
-                points = [
-                    (x, mouth_y),
-                    (x + tooth_width, mouth_y),
-                    (x + tooth_width // 2, mouth_y + tooth_width)
-                ]
-                pygame.draw.polygon(monster_surface, (50, 50, 50, self.alpha), points)
-        
-        # 手臂（两侧小方块）
-        arm_size = size // 4
-        pygame.draw.rect(monster_surface, (*self.color, self.alpha),
-                        (base_x - size - arm_size, base_y, arm_size, size // 2))
-        pygame.draw.rect(monster_surface, (*self.color, self.alpha),
-                        (base_x + size, base_y, arm_size, size // 2))
-        
-        # 绘制到屏幕
-        rect = monster_surface.get_rect(center=(center_x, center_y))
-        screen.blit(monster_surface, rect)
+    # 悬浮（上下浮动）和摆动（轻微左右摆动）
+    time = store['time']
+    time += dt
+    phase = store.scratch('phase')
+    np.sin(np.multiply(time, store['float_speed'], out=phase), out=phase)
+    np.multiply(phase, store['float_amplitude'], out=float_offset)
+    np.sin(np.multiply(time, store['wobble_speed'], out=phase), out=phase)
+    np.multiply(phase, 3, out=wobble_offset)
+
+
+def monster_centers(store: EntityStore, alpha: float = 1.0):
+    """
+    怪兽的绘制中心（含动画偏移，在上一逻辑步和当前位置之间插值）
+    :return: (x 数组, y 数组)，整数
+    """
+    centers = []
+    for axis, offset in (('x', 'wobble_offset'), ('y', 'float_offset')):
+        prev = store['prev_' + axis]
+        position = store.scratch('draw_' + axis)
+        np.add(store[axis], store[offset], out=position)
+        position -= prev
+        position *= alpha
+        position += prev
+        center = store.scratch('center_' + axis, np.int_)
+        center[:] = position  # 截断取整
+        centers.append(center)
+    return centers
 
 
 class GameView:
     """游戏主界面"""
     
-    def __init__(self, screen: pygame.Surface, settings: dict):
+    def __init__(self, screen: pygame.Surface, settings: dict, mastery=None,
+                 seed: Optional[int] = None):
+        """
+        :param screen: 屏幕
+        :param settings: 游戏设置
+        :param mastery: 当前难度的 MasteryTracker（用于自适应出题，可选）
+        :param seed: 本局随机种子（默认随机生成；相同种子、设置和按键得到相同的对局）
+        """
         self.screen = screen
         self.width = screen.get_width()
         self.height = screen.get_height()
         
+        # 本局随机数：出题和画面效果各用一个独立的随机流，互不影响
+        self.seed = seed if seed is not None else random.getrandbits(63)
+        self.visual_rng = random.Random(f'{self.seed}/visuals')
+        
         # 游戏状态
         self.game_state = GameState(settings)
         self.question_generator = QuestionGenerator(
             enabled_ops=settings.get('enabled_operations', ['add']),
-            difficulty=settings.get('difficulty', 'basic')
+            difficulty=settings.get('difficulty', 'basic'),
+            mastery=mastery,
+            rng=random.Random(f'{self.seed}/questions')
         )
         
+        # 回放记录（开局时的掌握情况也要保存，才能重现自适应出的题；
+        # 只保存本局启用的运算，其他运算的算式抽不到，也不影响清理，见 MasteryTracker）
+        self.tick = 0  # 已执行的逻辑步数
+        self.replay = Replay(self.seed, settings, mastery=(
+            mastery.snapshot(self.question_generator.enabled_ops) if mastery is not None else None))
+        
         # 字体
         self.title_font = get_font(38, bold=True)
         self.question_font = get_font(68, bold=True)
@@ -152,13 +156,23 @@ class GameView:
         self.info_font = get_font(28)
         self.small_font = get_font(22)
         
+        # 字形图集（数字、运算符和固定文本预渲染，绘制时直接贴图）
+        self.question_atlas = get_atlas(self.question_font, (255, 255, 255))
+        self.input_atlas = get_atlas(self.input_font, (50, 50, 50))
+        self.title_atlas = get_atlas(self.title_font, (255, 255, 255),
+                                     strings=('答题区', '👾 外星入侵'))
+        self.game_over_atlas = get_atlas(self.title_font, (255, 100, 100), strings=('游戏结束!',))
+        self.hint_atlas = get_atlas(self.small_font, (200, 200, 200), strings=('回车提交',))
+        self.info_hint_atlas = get_atlas(self.info_font, (200, 200, 200),
+                                         strings=('按 ESC 返回主菜单',))
+        
         # 输入（右半区）
         self.user_input = ""
         right_center = self.width // 2 + self.width // 4
         self.input_rect = pygame.Rect(right_center - 180, 420, 360, 90)
         
-        # 怪兽进攻（交错排列在左半区，避免重叠）
-        self.obstacles = []
+        # 怪兽进攻（交错排列在左半区，避免重叠；按进场顺序排列，最后一只最先被消除）
+        self.obstacles = EntityStore(MONSTER_FIELDS, defaults=MONSTER_DEFAULTS)
         self.obstacle_area_x = self.width // 4  # 左半区中心（与标题对齐）
         self.obstacle_start_y = 200  # 从这里开始往下排（往下移20px）
         self.obstacle_spacing_y = 56   # 垂直间距（确保10个能排下：200+9*56=704 < 740飞机位置）
@@ -171,7 +185,7 @@ class GameView:
         self.plane_size = 50
         
         # 子弹系统
-        self.bullets = []  # 存储飞行中的子弹
+        self.bullets = EntityStore(BULLET_FIELDS, defaults={'speed': BULLET_SPEED})  # 飞行中的子弹
         
         # 提示信息
         self.feedback_text = ""
@@ -179,20 +193,56 @@ class GameView:
         self.feedback_timer = 0
         
         # 动画
-        self.removing_obstacles = []  # 正在消除的障碍物
+        self.removing_obstacles = EntityStore(MONSTER_FIELDS, defaults=MONSTER_DEFAULTS)  # 正在消除的障碍物
+        
+        # 实体池按最多同时存在的数量预留（堆满时全部答对可能同时消除、发射），对局中不再扩容
+        for store in (self.obstacles, self.removing_obstacles, self.bullets):
+            store.reserve(self.game_state.max_stack)
         
         # 背景
         self.bg_color = (147, 112, 219)
         
+        # 预渲染怪兽精灵（消除动画最大放大到约 1.8 倍）和子弹精灵
+        get_sprite_cache().prewarm_monsters(MONSTER_SIZE, max_scale=1.8)
+        get_sprite_cache().get_bullet(BULLET_COLOR)
+        
+        # 粒子特效（击中碎片、连击闪光），用独立的随机流，不影响怪兽动画
+        self.particles = ParticleSystem(
+            rng=np.random.default_rng(random.Random(f'{self.seed}/particles').getrandbits(64)))
+        self.particles.prewarm('explosion', MONSTER_COLORS)
+        self.particles.prewarm('sparkle')
+        
+        # 帧耗时分析（F3 开关）
+        self.profiler = get_profiler()
+        
+        # 脏矩形渲染：静态图层预先合成到背景，每帧只重绘动态元素
+        self._background = self._build_background()
+        self._frame_rects = []   # 本帧绘制过的区域
+        self._prev_rects = []    # 上一帧绘制过的区域（下一帧需要用背景擦除）
+        self._full_redraw = True
+        self._game_over_drawn = False
+        
         # 生成第一个题目
         self._generate_new_question()
         
         # 开始游戏
         self.game_state.start_game()
     
+    @classmethod
+    def prewarm(cls, size: tuple, settings: dict):
+        """
+        预热游戏界面用到的资源（可在后台线程调用）
+        构造一个不显示的界面，让字体、字形图集、怪兽精灵和题目表提前进入缓存，
+        之后点击"开始游戏"时直接命中缓存
+        :param size: 窗口尺寸
+        :param settings: 游戏设置
+        """
+        cls(pygame.Surface(size), settings, seed=0)
+    
     def _generate_new_question(self):
         """生成新题目"""
         self.game_state.current_question = self.question_generator.generate()
+        self.question_start_time = self.game_state.elapsed_time
         self.user_input = ""
     
     def update(self, dt: float):
@@ -200,6 +250,10 @@ class GameView:
         if self.game_state.is_game_over:
             return
         
+        self.tick += 1
+        profiler = self.profiler
+        t = profiler.start()
+        
         # 更新游戏状态
         events = self.game_state.update(dt)
         
@@ -209,35 +263,46 @@ class GameView:
                 self._spawn_obstacle()
             elif event['type'] == 'game_over':
                 pass  # 游戏结束在 game_state 中已处理
+        t = profiler.lap('update.state', t)
         
-        # 更新障碍物位置（交错排列，避免重叠）
-        for i, obs in enumerate(self.obstacles):
-            obs.target_y = self.obstacle_start_y + i * self.obstacle_spacing_y
-            # 交错排列：奇数向左，偶数向右
-            x_offset = self.obstacle_spacing_x if i % 2 == 0 else -self.obstacle_spacing_x
-            obs.target_x = self.obstacle_area_x + x_offset
-            obs.update(dt)
-        
-        # 更新正在消除的障碍物
-        for obs in self.removing_obstacles[:]:
-            obs.alpha -= 500 * dt
-            obs.scale += 1.5 * dt
-            if obs.alpha <= 0:
-                self.removing_obstacles.remove(obs)
-        
-        # 更新子弹 - 垂直向上飞
-        for bullet in self.bullets[:]:
-            bullet['time'] += dt
-            bullet['y'] -= bullet['speed'] * dt  # 垂直向上
-            
-            # 到达目标高度或超时，移除子弹
-            if bullet['y'] <= bullet['target_y'] or bullet['time'] > 2:
-                if bullet in self.bullets:
-                    self.bullets.remove(bullet)
+        # 更新障碍物位置和动画（怪兽只从末尾进出，下标不变，目标位置在生成时已确定）
+        if self.obstacles:
+            update_monsters(self.obstacles, dt)
+        
+        # 更新正在消除的障碍物（淡出并放大，位置不再变化）
+        removing = self.removing_obstacles
+        if removing:
+            fade, scale = removing['alpha'], removing['scale']
+            fade -= 500 * dt
+            scale += 1.5 * dt
+            removing.release_where(np.less_equal(fade, 0, out=removing.scratch('done', np.bool_)))
+        t = profiler.lap('update.obstacles', t)
+        
+        # 更新子弹 - 垂直向上飞，到达目标高度或超时后移除
+        bullets = self.bullets
+        if bullets:
+            time, y = bullets['time'], bullets['y']
+            time += dt
+            np.copyto(bullets['prev_y'], y)
+            y -= np.multiply(bullets['speed'], dt, out=bullets.scratch('step'))
+            done = np.less_equal(y, bullets['target_y'], out=bullets.scratch('done', np.bool_))
+            if done.any():
+                # 击中怪兽：在目标位置炸开碎片
+                for x, target_y, color in zip(bullets['x'][done].tolist(),
+                                              bullets['target_y'][done].tolist(),
+                                              bullets['color'][done].tolist()):
+                    self.particles.emit('explosion', x, target_y, MONSTER_COLORS[color])
+            timeout = np.greater(time, 2, out=bullets.scratch('timeout', np.bool_))
+            bullets.release_where(np.logical_or(done, timeout, out=done))
         
         # 更新反馈计时
         if self.feedback_timer > 0:
             self.feedback_timer -= dt
+        t = profiler.lap('update.bullets', t)
+        
+        # 更新粒子
+        self.particles.update(dt)
+        profiler.lap('update.particles', t)
     
     def _spawn_obstacle(self):
         """生成新障碍物"""
@@ -246,98 +311,199 @@ class GameView:
         # 根据索引决定初始X位置（交错）
         x_offset = self.obstacle_spacing_x if index % 2 == 0 else -self.obstacle_spacing_x
         x = self.obstacle_area_x + x_offset
-        obstacle = Obstacle(x, y, index=index)
-        self.obstacles.append(obstacle)
+        spawn_monster(self.obstacles, x, y, rng=self.visual_rng)
     
     def _remove_obstacle(self):
         """移除障碍物 - 发射子弹"""
         if self.obstacles:
-            obs = self.obstacles.pop()
-            # 发射子弹特效
-            self._fire_bullet(obs)
-            self.removing_obstacles.append(obs)
+            index = len(self.obstacles) - 1
+            arrays = self.obstacles.arrays
+            # 发射子弹特效（和怪兽目标位置对齐，不包含摆动和悬浮偏移）
+            self._fire_bullet(arrays['target_x'][index], arrays['target_y'][index],
+                              arrays['color'][index])
+            self.obstacles.transfer(index, self.removing_obstacles)
     
-    def _fire_bullet(self, target):
-        """发射子弹击中怪兽 - 从飞机发射"""
-        bullet = {
-            'x': target.target_x,  # 和怪兽目标X坐标对齐（不包含摆动偏移）
-            'y': self.plane_y - 20,  # 从飞机顶部发射
-            'target_y': target.target_y,  # 目标Y坐标（不包含悬浮偏移）
-            'time': 0,
-            'speed': 600,  # 子弹速度
-            'color': (255, 255, 0)  # 黄色子弹
-        }
-        self.bullets.append(bullet)
+    def _fire_bullet(self, x: float, target_y: float, color: int = 0):
+        """
+        发射子弹击中怪兽 - 从飞机顶部垂直向上发射
+        :param color: 目标怪兽的颜色（MONSTER_COLORS 下标）
+        """
+        index = self.bullets.acquire()
+        arrays = self.bullets.arrays
+        arrays['x'][index] = x
+        arrays['color'][index] = color
+        arrays['y'][index] = arrays['prev_y'][index] = self.plane_y - 20
+        arrays['target_y'][index] = target_y
     
-    def draw(self):
-        """绘制游戏界面"""
-        # 背景
-        self.screen.fill(self.bg_color)
+    def _build_background(self) -> pygame.Surface:
+        """合成静态背景：背景色、信息栏、分隔线、输入框、固定文字和飞机"""
+        background = pygame.Surface((self.width, self.height))
+        if pygame.display.get_surface() is not None:
+            background = background.convert()
+        background.fill(self.bg_color)
+        
+        # 顶部信息栏底色
+        pygame.draw.rect(background, (120, 90, 200), pygame.Rect(0, 0, self.width, 50))
+        
+        # 左右分区分隔线
+        divider_x = self.width // 2
+        pygame.draw.line(background, (150, 120, 200), 
+                        (divider_x, 50), (divider_x, self.height), 3)
+        
+        # 右半区标题
+        right_center = self.width // 2 + self.width // 4
+        self.title_atlas.draw(background, '答题区', center=(right_center, 80))
+        
+        # 输入框背景和提示
+        pygame.draw.rect(background, (255, 255, 255), self.input_rect, border_radius=12)
+        pygame.draw.rect(background, (100, 100, 255), self.input_rect, 5, border_radius=12)
+        self.hint_atlas.draw(background, '回车提交',
+                             center=(self.input_rect.centerx, self.input_rect.bottom + 25))
+        
+        # 飞机（位置固定）
+        self._draw_plane(background)
+        
+        return background
+    
+    def invalidate(self):
+        """要求下一帧整屏重绘（例如从其他界面切换回来）"""
+        self._full_redraw = True
+        self._game_over_drawn = False
+    
+    def time_until_change(self) -> Optional[float]:
+        """
+        距离画面下一次变化的时间（秒）
+        :return: 有动画（怪兽、子弹、粒子、反馈提示）时为 0；没有动画时为下一次计时刷新
+            或生成怪兽的时间；游戏结束画面画完后为 None（只有输入才会改变画面）
+        """
+        if self.game_state.is_game_over:
+            return None if self._game_over_drawn else 0.0
+        if (self._full_redraw or self.obstacles or self.removing_obstacles or self.bullets
+                or self.particles or self.feedback_timer > 0):
+            return 0.0
+        
+        # 信息栏的时间按整秒显示
+        next_second = 1.0 - self.game_state.elapsed_time % 1.0
+        next_spawn = self.game_state.spawn_interval - self.game_state.time_since_last_spawn
+        return max(0.0, min(next_second, next_spawn))
+    
+    def _mark(self, rect: pygame.Rect):
+        """记录本帧绘制过的区域"""
+        self._frame_rects.append(rect)
+    
+    def draw(self, alpha: float = 1.0) -> list:
+        """
+        绘制游戏界面
+        :param alpha: 插值系数（逻辑按固定步长更新，渲染时在上一步和当前步之间插值）
+        :return: 需要刷新到显示器的区域列表
+        """
+        # 游戏结束画面是静态的，画过一次后无需再画
+        if self._game_over_drawn:
+            return []
+        
+        profiler = self.profiler
+        t = profiler.start()
+        
+        # 用背景擦除上一帧的动态元素
+        if self._full_redraw:
+            self.screen.blit(self._background, (0, 0))
+        else:
+            for rect in self._prev_rects:
+                self.screen.blit(self._background, rect, rect)
+        
+        self._frame_rects = []
+        t = profiler.lap('draw.erase', t)
         
         # 顶部信息栏
         self._draw_info_bar()
+        t = profiler.lap('draw.info', t)
         
         # 障碍物
-        self._draw_obstacles()
-        
-        # 飞机（在左半区底部）
-        self._draw_plane()
-        
-        # 子弹（在题目下方绘制）
-        for bullet in self.bullets:
-            self._draw_bullet(bullet)
+        self._draw_obstacles(alpha)
+        t = profiler.lap('draw.monsters', t)
+        
+        # 子弹（在题目下方绘制），发射期间飞机尾焰闪烁
+        bullets = self.bullets
+        if bullets:
+            frame = self.tick // FLAME_FRAME_TICKS % len(FLAME_LENGTHS)
+            self._mark(self._draw_flame(self.screen, frame))
+            prev_y = bullets['prev_y']
+            position = np.subtract(bullets['y'], prev_y, out=bullets.scratch('draw_y'))
+            position *= alpha
+            position += prev_y
+            xs, ys = bullets.scratch('center_x', np.int_), bullets.scratch('center_y', np.int_)
+            xs[:] = bullets['x']
+            ys[:] = position
+            for x, y in zip(xs.tolist(), ys.tolist()):
+                self._draw_bullet(x, y)
+        t = profiler.lap('draw.bullets', t)
+        
+        # 粒子（碎片和闪光）
+        self._frame_rects.extend(self.particles.draw(self.screen, alpha))
+        t = profiler.lap('draw.particles', t)
         
         # 题目
         self._draw_question()
+        t = profiler.lap('draw.question', t)
         
         # 输入框
         self._draw_input()
+        t = profiler.lap('draw.input', t)
         
         # 反馈信息（右半区）
         if self.feedback_timer > 0:
             right_center = self.width // 2 + self.width // 4
-            feedback_surface = self.info_font.render(self.feedback_text, True, self.feedback_color)
+            feedback_surface = render_text(self.info_font, self.feedback_text, True,
+                                           self.feedback_color)
             feedback_rect = feedback_surface.get_rect(center=(right_center, 560))
-            self.screen.blit(feedback_surface, feedback_rect)
+            self._mark(self.screen.blit(feedback_surface, feedback_rect))
+        t = profiler.lap('draw.feedback', t)
         
-        # 游戏结束提示
+        # 游戏结束提示（遮罩覆盖整屏）
         if self.game_state.is_game_over:
+            if not self._full_redraw:
+                # 遮罩需要叠加在完整画面上，先补画整屏背景
+                self._full_redraw = True
+                return self.draw(alpha)
             self._draw_game_over()
+            self._game_over_drawn = True
+        
+        if self._full_redraw:
+            dirty = [self.screen.get_rect()]
+            self._full_redraw = False
+        else:
+            dirty = self._prev_rects + self._frame_rects
+        self._prev_rects = self._frame_rects
+        return dirty
     
     def _draw_info_bar(self):
         """绘制信息栏"""
-        # 背景
-        info_rect = pygame.Rect(0, 0, self.width, 50)
-        pygame.draw.rect(self.screen, (120, 90, 200), info_rect)
-        
-        # 分数（左）
-        score_text = self.info_font.render(f'分数: {self.game_state.score}', True, (255, 255, 255))
-        self.screen.blit(score_text, (30, 12))
+        # 分数（左）（信息栏底色在背景图层中）
+        score_text = render_text(self.info_font, f'分数: {self.game_state.score}', True,
+                                 (255, 255, 255))
+        self._mark(self.screen.blit(score_text, (30, 12)))
         
         # 时间（中）
         time_str = f'{int(self.game_state.elapsed_time)}秒'
-        time_text = self.info_font.render(f'时间: {time_str}', True, (255, 255, 255))
+        time_text = render_text(self.info_font, f'时间: {time_str}', True, (255, 255, 255))
         time_rect = time_text.get_rect(center=(self.width // 2, 25))
-        self.screen.blit(time_text, time_rect)
+        self._mark(self.screen.blit(time_text, time_rect))
         
         # 连击或正确率（右）
         if self.game_state.combo > 0:
-            combo_text = self.info_font.render(f'连击: {self.game_state.combo}', True, (255, 215, 0))
+            combo_text = render_text(self.info_font, f'连击: {self.game_state.combo}', True,
+                                     (255, 215, 0))
             combo_rect = combo_text.get_rect(right=self.width - 30, centery=25)
-            self.screen.blit(combo_text, combo_rect)
+            self._mark(self.screen.blit(combo_text, combo_rect))
         else:
             accuracy = self.game_state.get_accuracy()
-            accuracy_text = self.info_font.render(f'正确率: {accuracy:.0f}%', True, (255, 255, 255))
+            accuracy_text = render_text(self.info_font, f'正确率: {accuracy:.0f}%', True,
+                                        (255, 255, 255))
             accuracy_rect = accuracy_text.get_rect(right=self.width - 30, centery=25)
-            self.screen.blit(accuracy_text, accuracy_rect)
+            self._mark(self.screen.blit(accuracy_text, accuracy_rect))
     
-    def _draw_obstacles(self):
-        """绘制怪兽区域"""
-        # 绘制左半区分隔线
-        divider_x = self.width // 2
-        pygame.draw.line(self.screen, (150, 120, 200), 
-                        (divider_x, 50), (divider_x, self.height), 3)
-        
+    def _draw_obstacles(self, alpha: float = 1.0):
+        """绘制怪兽区域（分隔线在背景图层中）"""
         # 计算状态
         progress = self.game_state.stack_count / self.game_state.max_stack
         if progress < 0.3:
@@ -358,15 +524,15 @@ class GameView:
         left_x = self.width // 4
         
         # 标题 "👾 外星入侵"（左侧）
-        title_text = self.title_font.render('👾 外星入侵', True, (255, 255, 255))
+        title_size = self.title_atlas.size('👾 外星入侵')
         
         # 数量和状态（竖着排列，右侧）
-        count_text = self.info_font.render(f'{self.game_state.stack_count}/{self.game_state.max_stack}', 
-                                          True, (255, 255, 255))
-        status_text = self.info_font.render(status, True, status_color)
+        count_text = render_text(self.info_font, f'{self.game_state.stack_count}/{self.game_state.max_stack}', 
+                                 True, (255, 255, 255))
+        status_text = render_text(self.info_font, status, True, status_color)
         
         # 计算布局：标题在左，数量状态在右（竖着）
-        title_width = title_text.get_width()
+        title_width = title_size[0]
         status_block_width = max(count_text.get_width(), status_text.get_width())
         total_width = title_width + 30 + status_block_width  # 30px间距
         
@@ -374,65 +540,69 @@ class GameView:
         start_x = left_x - total_width // 2
         
         # 绘制标题（垂直居中于数量+状态的整体）
-        title_height = title_text.get_height()
+        title_height = title_size[1]
         status_total_height = count_text.get_height() + 8 + status_text.get_height()
         title_y_offset = (status_total_height - title_height) // 2
         
-        self.screen.blit(title_text, (start_x, info_y + title_y_offset))
+        self._mark(self.title_atlas.draw(self.screen, '👾 外星入侵',
+                                         topleft=(start_x, info_y + title_y_offset)))
         
         # 绘制数量（竖着，第一行）
         count_x = start_x + title_width + 30
-        self.screen.blit(count_text, (count_x, info_y))
+        self._mark(self.screen.blit(count_text, (count_x, info_y)))
         
         # 绘制状态（竖着，第二行）
         status_x = count_x + (count_text.get_width() - status_text.get_width()) // 2  # 状态文本居中对齐数量
-        self.screen.blit(status_text, (status_x, info_y + count_text.get_height() + 8))
+        self._mark(self.screen.blit(status_text, (status_x, info_y + count_text.get_height() + 8)))
         
         # 绘制怪兽（保持与上方信息居中对齐）
-        for obs in self.obstacles:
-            obs.draw(self.screen)
-        
-        # 绘制正在消除的怪兽
-        for obs in self.removing_obstacles:
-            obs.draw(self.screen)
+        self._draw_monsters(alpha)
+    
+    def _draw_monsters(self, alpha: float = 1.0):
+        """绘制怪兽（从精灵缓存贴图；场上的怪兽不透明，一次批量贴图）"""
+        sprite_cache = get_sprite_cache()
+        obstacles = self.obstacles
+        if obstacles:
+            sprites = [sprite_cache.get_monster(color, MONSTER_SIZE) for color in MONSTER_COLORS]
+            for sprite in sprites:
+                sprite.set_alpha(255)
+            xs, ys = monster_centers(obstacles, alpha)
+            blits = []
+            for color, x, y in zip(obstacles['color'].tolist(), xs.tolist(), ys.tolist()):
+                sprite = sprites[color]
+                blits.append((sprite, (x - sprite.get_width() // 2, y - sprite.get_height() // 2)))
+            self._frame_rects.extend(self.screen.blits(blits))
+        
+        # 正在消除的怪兽（各自的透明度和缩放）
+        removing = self.removing_obstacles
+        if removing:
+            xs, ys = monster_centers(removing, alpha)
+            for color, scale, fade, x, y in zip(removing['color'].tolist(), removing['scale'].tolist(),
+                                                removing['alpha'].tolist(), xs.tolist(), ys.tolist()):
+                sprite = sprite_cache.get_monster(MONSTER_COLORS[color], MONSTER_SIZE, scale)
+                sprite.set_alpha(max(0, int(fade)))
+                self._mark(self.screen.blit(sprite, sprite.get_rect(center=(x, y))))
     
     def _draw_question(self):
-        """绘制题目（右半区）"""
-        # 右半区标题
+        """绘制题目（右半区，标题在背景图层中）"""
         right_center = self.width // 2 + self.width // 4
-        title_text = self.title_font.render('答题区', True, (255, 255, 255))
-        title_rect = title_text.get_rect(center=(right_center, 80))
-        self.screen.blit(title_text, title_rect)
         
         # 题目
         if self.game_state.current_question:
-            question_text = self.question_font.render(
-                self.game_state.current_question.text, 
-                True, (255, 255, 255)
-            )
-            question_rect = question_text.get_rect(center=(right_center, 280))
+            text = self.game_state.current_question.text
+            question_rect = pygame.Rect((0, 0), self.question_atlas.size(text))
+            question_rect.center = (right_center, 280)
             
             # 背景
             bg_rect = question_rect.inflate(60, 30)
-            pygame.draw.rect(self.screen, (120, 90, 200), bg_rect, border_radius=15)
+            self._mark(pygame.draw.rect(self.screen, (120, 90, 200), bg_rect, border_radius=15))
             
-            self.screen.blit(question_text, question_rect)
+            self.question_atlas.draw(self.screen, text, topleft=question_rect.topleft)
     
     def _draw_input(self):
-        """绘制输入框"""
-        # 输入框背景
-        pygame.draw.rect(self.screen, (255, 255, 255), self.input_rect, border_radius=12)
-        pygame.draw.rect(self.screen, (100, 100, 255), self.input_rect, 5, border_radius=12)
-        
-        # 输入文本
-        input_surface = self.input_font.render(self.user_input or '?', True, (50, 50, 50))
-        input_rect = input_surface.get_rect(center=self.input_rect.center)
-        self.screen.blit(input_surface, input_rect)
-        
-        # 提示（更小）
-        hint = self.small_font.render('回车提交', True, (200, 200, 200))
-        hint_rect = hint.get_rect(center=(self.input_rect.centerx, self.input_rect.bottom + 25))
-        self.screen.blit(hint, hint_rect)
+        """绘制输入文本（输入框和提示在背景图层中）"""
+        self._mark(self.input_atlas.draw(self.screen, self.user_input or '?',
+                                         center=self.input_rect.center))
     
     def _draw_game_over(self):
         """绘制游戏结束界面"""
@@ -442,9 +612,7 @@ class GameView:
         self.screen.blit(overlay, (0, 0))
         
         # 游戏结束文字
-        game_over_text = self.title_font.render('游戏结束!', True, (255, 100, 100))
-        game_over_rect = game_over_text.get_rect(center=(self.width // 2, 200))
-        self.screen.blit(game_over_text, game_over_rect)
+        self.game_over_atlas.draw(self.screen, '游戏结束!', center=(self.width // 2, 200))
         
         # 统计信息
         stats = self.game_state.get_stats()
@@ -458,15 +626,13 @@ class GameView:
         ]
         
         for line in info_lines:
-            text = self.info_font.render(line, True, (255, 255, 255))
+            text = render_text(self.info_font, line, True, (255, 255, 255))
             text_rect = text.get_rect(center=(self.width // 2, y))
             self.screen.blit(text, text_rect)
             y += 50
         
         # 提示
-        hint = self.info_font.render('按 ESC 返回主菜单', True, (200, 200, 200))
-        hint_rect = hint.get_rect(center=(self.width // 2, 600))
-        self.screen.blit(hint, hint_rect)
+        self.info_hint_atlas.draw(self.screen, '按 ESC 返回主菜单', center=(self.width // 2, 600))
     
     def handle_event(self, event: pygame.event.Event) -> Optional[str]:
         """
@@ -479,22 +645,38 @@ class GameView:
             
             if not self.game_state.is_game_over:
                 if event.key == pygame.K_RETURN or event.key == pygame.K_KP_ENTER:
-                    self._submit_answer()
+                    self.press_key('\r')
                 elif event.key == pygame.K_BACKSPACE:
-                    self.user_input = self.user_input[:-1]
+                    self.press_key('\b')
                 elif event.unicode.isdigit() or event.unicode == '-':
-                    if len(self.user_input) < 10:  # 限制长度
-                        self.user_input += event.unicode
+                    self.press_key(event.unicode)
         
         return None
     
+    def press_key(self, char: str):
+        """
+        处理一次答题按键（记录到回放中）
+        :param char: 数字或 '-'，'\b' 为退格，'\r' 为回车
+        """
+        self.replay.record(self.tick, char)
+        if char == '\r':
+            self._submit_answer()
+        elif char == '\b':
+            self.user_input = self.user_input[:-1]
+        elif len(self.user_input) < 10:  # 限制长度
+            self.user_input += char
+    
     def _submit_answer(self):
         """提交答案"""
         if not self.user_input:
             return
         
         question = self.game_state.current_question
-        if question.check_answer(self.user_input):
+        correct = question.check_answer(self.user_input)
+        self.question_generator.record_answer(
+            question, correct, self.game_state.elapsed_time - self.question_start_time)
+        
+        if correct:
             # 答对
             result = self.game_state.on_correct_answer()
             self.feedback_text = f'正确! +{result["score_gained"]}分'
@@ -506,6 +688,11 @@ class GameView:
             # 消除障碍物
             for _ in range(result['removed_count']):
                 self._remove_obstacle()
+            
+            # 连击达到加分档位时在反馈信息处闪光
+            if result['combo_milestone']:
+                right_center = self.width // 2 + self.width // 4
+                self.particles.emit('sparkle', right_center, 560)
         else:
             # 答错
             result = self.game_state.on_wrong_answer()
@@ -516,77 +703,28 @@ class GameView:
         # 生成新题目
         self._generate_new_question()
     
-    def _draw_plane(self):
-        """绘制飞机（战斗机样式）"""
-        x = int(self.plane_x)
-        y = int(self.plane_y)
-        size = self.plane_size
-        
-        # 创建飞机表面
-        plane_surface = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
-        center = size
-        
-        # 机身（三角形）
-        body_points = [
-            (center, center - size // 2),  # 顶部（机头）
-            (center - size // 3, center + size // 2),  # 左下
-            (center + size // 3, center + size // 2),  # 右下
-        ]
-        pygame.draw.polygon(plane_surface, (100, 200, 255), body_points)
-        pygame.draw.polygon(plane_surface, (50, 150, 200), body_points, 3)
-        
-        # 机翼（左右两侧）
-        # 左翼
-        left_wing = [
-            (center - size // 3, center),
-            (center - size, center + size // 4),
-            (center - size // 2, center + size // 3),
-        ]
-        pygame.draw.polygon(plane_surface, (80, 180, 230), left_wing)
-        
-        # 右翼
-        right_wing = [
-            (center + size // 3, center),
-            (center + size, center + size // 4),
-            (center + size // 2, center + size // 3),
-        ]
-        pygame.draw.polygon(plane_surface, (80, 180, 230), right_wing)
-        
-        # 驾驶舱（亮点）
-        pygame.draw.circle(plane_surface, (200, 230, 255), (center, center), size // 6)
-        
-        # 喷射火焰（尾部）
-        flame_points = [
-            (center - size // 6, center + size // 2),
-            (center, center + size // 2 + size // 4),
-            (center + size // 6, center + size // 2),
-        ]
-        pygame.draw.polygon(plane_surface, (255, 150, 50), flame_points)
-        pygame.draw.polygon(plane_surface, (255, 200, 100), flame_points, 2)
-        
-        # 绘制到屏幕
-        rect = plane_surface.get_rect(center=(x, y))
-        self.screen.blit(plane_surface, rect)
+    def _draw_plane(self, surface: pygame.Surface):
+        """绘制飞机（战斗机样式，尾焰为静止时的第一帧）"""
+        sprite_cache = get_sprite_cache()
+        plane = sprite_cache.get_plane(self.plane_size)
+        surface.blit(plane, plane.get_rect(center=(int(self.plane_x), int(self.plane_y))))
+        self._draw_flame(surface, 0)
+    
+    def _draw_flame(self, surface: pygame.Surface, frame: int) -> pygame.Rect:
+        """
+        绘制尾焰的一帧（从预渲染的帧条中截取）
+        :return: 绘制区域
+        """
+        strip = get_sprite_cache().get_flame_strip(self.plane_size)
+        width = strip.get_width() // len(FLAME_LENGTHS)
+        dx, dy = flame_origin(self.plane_size)
+        area = pygame.Rect(frame * width, 0, width, strip.get_height())
+        return surface.blit(strip, (int(self.plane_x) + dx, int(self.plane_y) + dy), area)
     
-    def _draw_bullet(self, bullet):
-        """绘制子弹特效"""
-        x = int(bullet['x'])
-        y = int(bullet['y'])
-        
-        # 子弹核心（黄色圆点）
-        pygame.draw.circle(self.screen, bullet['color'], (x, y), 8)
-        pygame.draw.circle(self.screen, (255, 255, 255), (x, y), 5)
-        
-        # 子弹尾迹（渐变效果）
-        for i in range(3):
-            trail_y = y + i * 15
-            trail_alpha = 255 - i * 80
-            trail_size = 6 - i * 2
-            if trail_size > 0:
-                trail_surface = pygame.Surface((trail_size * 2, trail_size * 2), pygame.SRCALPHA)
-                pygame.draw.circle(trail_surface, (*bullet['color'], trail_alpha), 
-                                 (trail_size, trail_size), trail_size)
-                self.screen.blit(trail_surface, (x - trail_size, trail_y - trail_size))
+    def _draw_bullet(self, x: int, y: int):
+        """绘制子弹特效（核心加渐变尾迹，预渲染为一张精灵）"""
+        sprite = get_sprite_cache().get_bullet(BULLET_COLOR)
+        self._mark(self.screen.blit(sprite, (x - BULLET_RADIUS, y - BULLET_RADIUS)))
     
     def is_game_over(self) -> bool:
         """是否游戏结束"""
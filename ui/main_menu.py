@@ -4,7 +4,7 @@
 """
 import pygame
 from typing import Optional, Tuple
-from ui.fonts import get_font
+from ui.fonts import get_font, get_atlas, render_text
 
 
 class Button:
@@ -21,7 +21,7 @@ class Button:
         self.icon = icon
         self.selected = False
         self.hovered = False
-        
+    
     def draw(self, screen: pygame.Surface, font: pygame.font.Font, 
              small_font: pygame.font.Font = None):
         """绘制按钮"""
@@ -45,20 +45,17 @@ class Button:
         
         # 图标（如果有）
         if self.icon:
-            icon_font = get_font(self.font_size + 20, bold=True)
-            icon_surface = icon_font.render(self.icon, True, self.text_color)
-            icon_rect = icon_surface.get_rect(center=(self.rect.centerx, self.rect.centery - 20))
-            screen.blit(icon_surface, icon_rect)
+            icon_atlas = get_atlas(get_font(self.font_size + 20, bold=True), self.text_color,
+                                   strings=(self.icon,))
+            icon_atlas.draw(screen, self.icon, center=(self.rect.centerx, self.rect.centery - 20))
             
             # 文字在下方
-            text_surface = small_font.render(self.text, True, self.text_color)
-            text_rect = text_surface.get_rect(center=(self.rect.centerx, self.rect.centery + 30))
-            screen.blit(text_surface, text_rect)
+            text_atlas = get_atlas(small_font, self.text_color, strings=(self.text,))
+            text_atlas.draw(screen, self.text, center=(self.rect.centerx, self.rect.centery + 30))
         else:
             # 只有文字
-            text_surface = font.render(self.text, True, self.text_color)
-            text_rect = text_surface.get_rect(center=self.rect.center)
-            screen.blit(text_surface, text_rect)
+            text_atlas = get_atlas(font, self.text_color, strings=(self.text,))
+            text_atlas.draw(screen, self.text, center=self.rect.center)
     
     def handle_event(self, event: pygame.event.Event) -> bool:
         """处理事件，返回是否被点击"""
@@ -149,35 +146,74 @@ class MainMenu:
         settings_x = (self.width - settings_button_width) // 2
         self.settings_button = Button(settings_x, 730, settings_button_width, 60,
                                       '设置', (200, 200, 200), (50, 50, 50))
+        
+        # 脏矩形渲染：标题等静态内容预先合成到背景，只有按钮状态变化时才重绘
+        self._background = self._build_background()
+        self._needs_redraw = True
     
-    def draw(self):
-        """绘制主菜单"""
-        # 背景
-        self.screen.fill(self.bg_color)
+    def _build_background(self) -> pygame.Surface:
+        """合成静态背景：背景色和各标题"""
+        background = pygame.Surface((self.width, self.height))
+        if pygame.display.get_surface() is not None:
+            background = background.convert()
+        background.fill(self.bg_color)
         
         # 标题
-        title_text = self.title_font.render('速算闯关', True, (255, 255, 255))
+        title_text = render_text(self.title_font, '速算闯关', True, (255, 255, 255))
         title_rect = title_text.get_rect(center=(self.width // 2, 100))
-        self.screen.blit(title_text, title_rect)
+        background.blit(title_text, title_rect)
         
-        subtitle_text = self.small_font.render('Speed Math Challenge', True, (255, 255, 255))
+        subtitle_text = render_text(self.small_font, 'Speed Math Challenge', True, (255, 255, 255))
         subtitle_rect = subtitle_text.get_rect(center=(self.width // 2, 150))
-        self.screen.blit(subtitle_text, subtitle_rect)
+        background.blit(subtitle_text, subtitle_rect)
         
         # 选择运算类型标题 - 贴近按钮
-        ops_title = self.button_font.render('选择运算类型', True, (255, 255, 255))
+        ops_title = render_text(self.button_font, '选择运算类型', True, (255, 255, 255))
         ops_title_rect = ops_title.get_rect(center=(self.width // 2, 220))  # 贴近按钮，保持15px间距
-        self.screen.blit(ops_title, ops_title_rect)
+        background.blit(ops_title, ops_title_rect)
+        
+        # 速度选择标题 - 贴近按钮
+        speed_title = render_text(self.button_font, '速度选择', True, (255, 255, 255))
+        speed_title_rect = speed_title.get_rect(center=(self.width // 2, 432))  # 贴近按钮，保持15px间距
+        background.blit(speed_title, speed_title_rect)
+        
+        return background
+    
+    def _all_buttons(self) -> list:
+        """所有按钮"""
+        return (list(self.op_buttons.values()) + list(self.speed_buttons.values())
+                + [self.start_button, self.settings_button])
+    
+    def _button_states(self) -> tuple:
+        """按钮的选中/悬停状态（用于判断是否需要重绘）"""
+        return tuple((btn.selected, btn.hovered) for btn in self._all_buttons())
+    
+    def invalidate(self):
+        """要求下一帧重绘（例如从游戏界面返回）"""
+        self._needs_redraw = True
+    
+    def time_until_change(self) -> Optional[float]:
+        """
+        距离画面下一次变化的时间（秒）
+        菜单没有动画，只有输入才会改变画面：需要重绘时返回 0，否则返回 None
+        """
+        return 0.0 if self._needs_redraw else None
+    
+    def draw(self) -> list:
+        """
+        绘制主菜单
+        :return: 需要刷新到显示器的区域列表（画面无变化时为空）
+        """
+        if not self._needs_redraw:
+            return []
+        
+        # 背景和标题
+        self.screen.blit(self._background, (0, 0))
         
         # 运算类型按钮
         for btn in self.op_buttons.values():
             btn.draw(self.screen, self.button_font, self.small_font)
         
-        # 速度选择标题 - 贴近按钮
-        speed_title = self.button_font.render('速度选择', True, (255, 255, 255))
-        speed_title_rect = speed_title.get_rect(center=(self.width // 2, 432))  # 贴近按钮，保持15px间距
-        self.screen.blit(speed_title, speed_title_rect)
-        
         # 速度按钮
         for btn in self.speed_buttons.values():
             btn.draw(self.screen, self.small_font)
@@ -190,12 +226,23 @@ class MainMenu:
         
         # 显示当前选择的提示
         self._draw_selection_hint()
+        
+        self._needs_redraw = False
+        return [self.screen.get_rect()]
     
     def handle_event(self, event: pygame.event.Event) -> Optional[str]:
         """
         处理事件
         :return: 'start' 开始游戏, 'settings' 打开设置, None 无操作
         """
+        states_before = self._button_states()
+        action = self._handle_button_event(event)
+        if self._button_states() != states_before:
+            self._needs_redraw = True
+        return action
+    
+    def _handle_button_event(self, event: pygame.event.Event) -> Optional[str]:
+        """分发事件给各按钮"""
         # 运算类型按钮
         for op_name, btn in self.op_buttons.items():
             if btn.handle_event(event):
@@ -222,7 +269,7 @@ class MainMenu:
         #     return 'settings'
         
         # 鼠标移动效果
-        for btn in list(self.op_buttons.values()) + list(self.speed_buttons.values()) + [self.start_button, self.settings_button]:
+        for btn in self._all_buttons():
             btn.handle_event(event)
         
         return None
@@ -266,7 +313,7 @@ class MainMenu:
         
         # 绘制提示框 - 贴近开始游戏按钮
         hint_text = f"已选择: {ops_text}  |  速度: {speed_text}"
-        hint_surface = self.small_font.render(hint_text, True, (255, 255, 255))
+        hint_surface = render_text(self.small_font, hint_text, True, (255, 255, 255))
         hint_rect = hint_surface.get_rect(center=(self.width // 2, 620))  # 贴近开始游戏按钮（Y=650），保持约15px间距
         
         # 半透明背景
@@ -0,0 +1,243 @@
+"""
+粒子特效模块
+击中怪兽时的碎片、连击档位的闪光等粒子保存在预先分配的结构数组中（EntityStore），
+每帧对所有粒子一次完成运动积分，绘制时按剩余寿命选取预渲染的淡出贴片，一次批量贴图。
+粒子总数有硬上限：接近上限时新的爆发按剩余预算成比例减少，用满时不再生成，
+不会因为同时爆炸太多而拖慢帧率或在对局中扩容。
+绘制区域按每次爆发的包围盒计算，互相重叠的再合并，分处屏幕两侧的爆发不会把中间一起标脏
+"""
+import math
+import numpy as np
+import pygame
+from typing import Dict, List, Optional, Tuple
+from ui.entities import EntityStore
+from ui.sprites import get_sprite_cache
+
+
+# 粒子字段：位置、上一逻辑步的位置（渲染时插值）、速度、剩余寿命和总寿命、
+# 重力加速度、阻力系数、半径、贴片种类（颜色和半径的组合）、所属的爆发序号
+PARTICLE_FIELDS = {
+    'x': np.float64, 'y': np.float64,
+    'prev_x': np.float64, 'prev_y': np.float64,
+    'vx': np.float64, 'vy': np.float64,
+    'life': np.float64, 'ttl': np.float64,
+    'gravity': np.float64, 'drag': np.float64,
+    'radius': np.int16, 'kind': np.int16,
+    'burst': np.int32,
+}
+
+# 同时存在的粒子数上限
+PARTICLE_BUDGET = 512
+
+# 淡出档位数（每种贴片按剩余寿命预渲染这么多个透明度）
+FADE_LEVELS = 8
+FADE_ALPHAS = tuple(255 * (level + 1) // FADE_LEVELS for level in range(FADE_LEVELS))
+
+# 发射器预设
+#   count: 每次爆发的粒子数        speed: 初速度范围（像素/秒，方向随机）
+#   life: 寿命范围（秒）           spread: 出生位置的随机偏移（像素）
+#   gravity: 重力（像素/秒²，负数向上飘）   drag: 阻力（速度每秒衰减为 e^-drag 倍）
+#   radius: 半径范围（像素）        colors: 颜色（发射时可再加一种，如怪兽颜色）
+EMITTER_PRESETS = {
+    # 子弹击中怪兽：向四周飞散后下落的碎片
+    'explosion': {
+        'count': 24, 'speed': (90, 320), 'life': (0.35, 0.8), 'spread': 8,
+        'gravity': 520, 'drag': 1.5, 'radius': (2, 4),
+        'colors': ((255, 255, 255), (255, 220, 120)),
+    },
+    # 连击达到加分档位：缓慢上飘的金色闪光
+    'sparkle': {
+        'count': 36, 'speed': (30, 160), 'life': (0.5, 1.1), 'spread': 110,
+        'gravity': -40, 'drag': 2.5, 'radius': (1, 3),
+        'colors': ((255, 215, 0), (255, 255, 255), (255, 240, 150)),
+    },
+}
+
+
+class ParticleSystem:
+    """
+    粒子系统（对象池）
+    用法：
+        particles.emit('explosion', x, y, color)   # 逻辑更新中发射
+        particles.update(dt)                       # 每个逻辑步积分一次
+        rects = particles.draw(screen, alpha)      # 绘制，返回绘制区域列表
+    """
+    
+    def __init__(self, budget: int = PARTICLE_BUDGET, rng: Optional[np.random.Generator] = None):
+        """
+        :param budget: 同时存在的粒子数上限
+        :param rng: 随机数生成器（同一局用固定种子，粒子效果可复现）
+        """
+        self.budget = budget
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.store = EntityStore(PARTICLE_FIELDS, capacity=budget)
+        self.dropped = 0  # 因预算不足少生成的粒子数
+        self._bursts = 0  # 已发射的爆发数（作为下一次爆发的序号）
+        # (颜色, 半径) -> 贴片种类；种类 k 的各淡出档位贴片在 _stamps[k * FADE_LEVELS:] 中
+        self._kinds: Dict[Tuple[tuple, int], int] = {}
+        self._stamps: List[pygame.Surface] = []
+    
+    def __len__(self) -> int:
+        return len(self.store)
+    
+    def _kind(self, color: tuple, radius: int) -> int:
+        """获取（必要时登记并预渲染）颜色和半径对应的贴片种类"""
+        key = (color, radius)
+        kind = self._kinds.get(key)
+        if kind is None:
+            kind = self._kinds[key] = len(self._kinds)
+            sprite_cache = get_sprite_cache()
+            self._stamps.extend(sprite_cache.get_particle(color, radius, alpha)
+                                for alpha in FADE_ALPHAS)
+        return kind
+    
+    def _palette(self, preset: dict, color: Optional[tuple]) -> Tuple[List[int], List[int]]:
+        """预设（加上发射时指定的颜色）可用的贴片种类及其半径"""
+        colors = preset['colors'] + ((color,) if color is not None else ())
+        low, high = preset['radius']
+        kinds, radii = [], []
+        for c in colors:
+            for radius in range(low, high + 1):
+                kinds.append(self._kind(c, radius))
+                radii.append(radius)
+        return kinds, radii
+    
+    def prewarm(self, preset: str, colors=()):
+        """预渲染预设用到的贴片（colors 为发射时可能指定的颜色）"""
+        params = EMITTER_PRESETS[preset]
+        for color in (None, *colors):
+            self._palette(params, color)
+    
+    def allowance(self, count: int) -> int:
+        """
+        按当前负载允许生成的粒子数
+        用掉一半预算之前按原数量生成，之后随剩余预算线性减少，用满时为 0
+        """
+        free = self.budget - len(self.store)
+        return max(0, min(count, free, count * 2 * free // self.budget))
+    
+    def emit(self, preset: str, x: float, y: float, color: Optional[tuple] = None) -> int:
+        """
+        在 (x, y) 处爆发一组粒子
+        :param preset: 发射器预设名（EMITTER_PRESETS）
+        :param color: 额外的粒子颜色（如被击中怪兽的颜色）
+        :return: 实际生成的粒子数
+        """
+        params = EMITTER_PRESETS[preset]
+        count = self.allowance(params['count'])
+        self.dropped += params['count'] - count
+        if count == 0:
+            return 0
+        
+        rng = self.rng
+        kinds, radii = self._palette(params, color)
+        choice = rng.integers(len(kinds), size=count)
+        angle = rng.uniform(0, 2 * math.pi, count)
+        speed = rng.uniform(*params['speed'], count)
+        spread = params['spread']
+        
+        store = self.store
+        block = store.acquire_many(count)
+        arrays = store.arrays
+        arrays['kind'][block] = np.take(kinds, choice)
+        arrays['radius'][block] = np.take(radii, choice)
+        arrays['x'][block] = arrays['prev_x'][block] = x + rng.uniform(-spread, spread, count)
+        arrays['y'][block] = arrays['prev_y'][block] = y + rng.uniform(-spread, spread, count)
+        arrays['vx'][block] = np.cos(angle) * speed
+        arrays['vy'][block] = np.sin(angle) * speed
+        arrays['life'][block] = arrays['ttl'][block] = rng.uniform(*params['life'], count)
+        arrays['gravity'][block] = params['gravity']
+        arrays['drag'][block] = params['drag']
+        arrays['burst'][block] = self._bursts
+        self._bursts += 1
+        return count
+    
+    def update(self, dt: float):
+        """所有粒子积分一步（阻力、重力、位移），移除寿命耗尽的粒子"""
+        store = self.store
+        if not store:
+            return
+        x, y, vx, vy = store['x'], store['y'], store['vx'], store['vy']
+        np.copyto(store['prev_x'], x)
+        np.copyto(store['prev_y'], y)
+        
+        damping, step = store.scratch('damping'), store.scratch('step')
+        np.exp(np.multiply(store['drag'], -dt, out=damping), out=damping)
+        vx *= damping
+        vy *= damping
+        vy += np.multiply(store['gravity'], dt, out=step)
+        x += np.multiply(vx, dt, out=step)
+        y += np.multiply(vy, dt, out=step)
+        
+        life = store['life']
+        life -= dt
+        store.release_where(np.less_equal(life, 0, out=store.scratch('done', np.bool_)))
+    
+    def draw(self, screen: pygame.Surface, alpha: float = 1.0) -> List[pygame.Rect]:
+        """
+        绘制所有粒子（一次批量贴图）
+        :param alpha: 插值系数
+        :return: 绘制区域：每次爆发的包围盒，互相重叠的合并为一个（没有粒子时为空列表）
+        """
+        store = self.store
+        if not store:
+            return []
+        
+        positions = []
+        for axis in ('x', 'y'):
+            prev = store['prev_' + axis]
+            position = np.subtract(store[axis], prev, out=store.scratch('draw_' + axis))
+            position *= alpha
+            position += prev
+            position -= store['radius']  # 贴片左上角
+            corner = store.scratch('corner_' + axis, np.int_)
+            corner[:] = position
+            positions.append(corner)
+        
+        # 贴片下标：种类 * FADE_LEVELS + 淡出档位（按剩余寿命比例）
+        level = np.divide(store['life'], store['ttl'], out=store.scratch('level'))
+        level *= FADE_LEVELS
+        stamp = store.scratch('stamp', np.int_)
+        stamp[:] = level
+        np.minimum(stamp, FADE_LEVELS - 1, out=stamp)
+        stamp += np.multiply(store['kind'], FADE_LEVELS, out=store.scratch('base', np.int_))
+        
+        stamps = self._stamps
+        screen.blits(zip(map(stamps.__getitem__, stamp.tolist()),
+                         zip(*(corner.tolist() for corner in positions))), doreturn=False)
+        return self._burst_rects(screen.get_rect(), *positions)
+    
+    def _burst_rects(self, bounds: pygame.Rect, left: np.ndarray,
+                     top: np.ndarray) -> List[pygame.Rect]:
+        """
+        每次爆发的粒子的包围盒（贴片边长为 2 * 半径），互相重叠的合并，裁剪到屏幕内
+        :param left: 各粒子贴片左上角的 x
+        :param top: 各粒子贴片左上角的 y
+        """
+        # 按爆发序号排序后分段取最小、最大值
+        burst = self.store['burst']
+        order = np.argsort(burst, kind='stable')
+        ordered = burst[order]
+        starts = np.flatnonzero(np.concatenate(([True], ordered[1:] != ordered[:-1])))
+        size = self.store['radius'][order] * 2
+        left, top = left[order], top[order]
+        boxes = zip(np.minimum.reduceat(left, starts).tolist(),
+                    np.minimum.reduceat(top, starts).tolist(),
+                    np.maximum.reduceat(left + size, starts).tolist(),
+                    np.maximum.reduceat(top + size, starts).tolist())
+        
+        merged: List[pygame.Rect] = []
+        for x0, y0, x1, y1 in boxes:
+            rect = pygame.Rect(x0, y0, x1 - x0, y1 - y0).clip(bounds)
+            if not rect:
+                continue
+            index = rect.collidelist(merged)
+            while index >= 0:
+                rect.union_ip(merged.pop(index))
+                index = rect.collidelist(merged)
+            merged.append(rect)
+        return merged
+    
+    def clear(self):
+        """移除全部粒子"""
+        self.store.clear()
@@ -0,0 +1,206 @@
+"""
+帧耗时分析模块
+用 perf_counter_ns 记录每帧各阶段（绘制信息栏、怪兽、子弹……以及逻辑更新）的耗时，
+保存在固定长度的环形缓冲区中；F3 显示各阶段 p50/p95/p99 和帧率，F4 导出
+Chrome trace-event JSON（可在 chrome://tracing 或 Perfetto 中查看）。
+关闭时每个计时点只是一次方法调用加一次判断。
+"""
+import json
+import os
+import time
+from array import array
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+import pygame
+from ui.fonts import render_text
+
+
+# 每个阶段保留的最近样本数
+RING_SIZE = 600
+
+# trace 中保留的最近事件数
+TRACE_SIZE = 20000
+
+# 覆盖层统计数据的刷新间隔（纳秒）
+OVERLAY_REFRESH_NS = 500_000_000
+
+
+class RingBuffer:
+    """固定长度的整数环形缓冲区"""
+    
+    def __init__(self, size: int = RING_SIZE):
+        self.samples = array('q', bytes(8 * size))
+        self.size = size
+        self.count = 0  # 累计写入次数
+    
+    def add(self, value: int):
+        self.samples[self.count % self.size] = value
+        self.count += 1
+    
+    def values(self) -> List[int]:
+        """缓冲区中的样本（不保证顺序）"""
+        return list(self.samples[:min(self.count, self.size)])
+    
+    def percentiles(self, fractions=(0.5, 0.95, 0.99)) -> Tuple[int, ...]:
+        """样本的分位数（最近秩）"""
+        values = sorted(self.values())
+        if not values:
+            return tuple(0 for _ in fractions)
+        return tuple(values[min(len(values) - 1, int(f * len(values)))] for f in fractions)
+
+
+class FrameProfiler:
+    """
+    帧耗时分析器
+    用法：
+        t = profiler.start()
+        ...
+        t = profiler.lap('阶段名', t)   # 记录从 t 到现在的耗时，返回现在的时间
+    """
+    
+    def __init__(self):
+        self.enabled = False
+        self.overlay = False  # 是否显示覆盖层（显示时自动开启计时）
+        self.phases: Dict[str, RingBuffer] = {}
+        self.frame_times = RingBuffer()
+        self.trace = deque(maxlen=TRACE_SIZE)  # (阶段名, 开始时间, 耗时)，单位纳秒
+        self._last_frame: Optional[int] = None
+        self._overlay_lines: List[Tuple[str, tuple]] = []
+        self._overlay_refreshed = 0
+        # 上一次覆盖层下面的画面和位置（下一帧界面绘制前恢复）
+        self._overlay_under: Optional[Tuple[pygame.Surface, pygame.Rect]] = None
+    
+    def set_enabled(self, enabled: bool):
+        """开启或关闭计时"""
+        self.enabled = enabled
+        self._last_frame = None
+    
+    def toggle_overlay(self):
+        """切换覆盖层（F3）"""
+        self.overlay = not self.overlay
+        self.set_enabled(self.overlay)
+    
+    def start(self) -> int:
+        """开始计时，返回当前时间（关闭时返回 0）"""
+        return time.perf_counter_ns() if self.enabled else 0
+    
+    def lap(self, phase: str, start: int) -> int:
+        """
+        记录一个阶段的耗时
+        :param phase: 阶段名
+        :param start: 阶段开始时间（start() 或上一次 lap() 的返回值）
+        :return: 当前时间，可作为下一个阶段的开始时间
+        """
+        if not self.enabled:
+            return 0
+        now = time.perf_counter_ns()
+        buffer = self.phases.get(phase)
+        if buffer is None:
+            buffer = self.phases[phase] = RingBuffer()
+        buffer.add(now - start)
+        self.trace.append((phase, start, now - start))
+        return now
+    
+    def frame(self):
+        """每帧调用一次，记录帧间隔"""
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        if self._last_frame is not None:
+            self.frame_times.add(now - self._last_frame)
+            self.trace.append(('frame', self._last_frame, now - self._last_frame))
+        self._last_frame = now
+    
+    def summary(self) -> Dict[str, dict]:
+        """各阶段的分位数（毫秒）"""
+        result = {}
+        for phase, buffer in self.phases.items():
+            p50, p95, p99 = buffer.percentiles()
+            result[phase] = {'p50': p50 / 1e6, 'p95': p95 / 1e6, 'p99': p99 / 1e6,
+                             'samples': min(buffer.count, buffer.size)}
+        return result
+    
+    def fps(self) -> float:
+        """最近的平均帧率"""
+        values = self.frame_times.values()
+        if not values:
+            return 0.0
+        return len(values) * 1e9 / sum(values)
+    
+    def export_trace(self, path: str) -> str:
+        """
+        导出 Chrome trace-event JSON
+        :return: 文件路径
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        pid = os.getpid()
+        events = [
+            {'name': phase, 'cat': 'frame' if phase == 'frame' else 'phase', 'ph': 'X',
+             'ts': start / 1000, 'dur': duration / 1000, 'pid': pid,
+             'tid': 0 if phase == 'frame' else 1}
+            for phase, start, duration in self.trace
+        ]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        return path
+    
+    def _refresh_overlay(self):
+        """重新计算覆盖层显示的文字"""
+        lines = [(f'FPS {self.fps():5.1f}', (255, 255, 0)),
+                 (f"{'phase':<16}  p50   p95   p99 ms", (200, 200, 200))]
+        for phase, stat in sorted(self.summary().items()):
+            lines.append((f"{phase:<16} {stat['p50']:5.2f} {stat['p95']:5.2f} "
+                          f"{stat['p99']:5.2f}", (255, 255, 255)))
+        self._overlay_lines = lines
+    
+    def erase_overlay(self, screen: pygame.Surface) -> Optional[pygame.Rect]:
+        """
+        恢复上一次覆盖层下面的画面（在界面绘制之前调用，界面只需重绘自己有变化的部分）
+        :return: 恢复的区域（上一次没有绘制时为 None）
+        """
+        if self._overlay_under is None:
+            return None
+        under, rect = self._overlay_under
+        self._overlay_under = None
+        return screen.blit(under, rect)
+    
+    def draw_overlay(self, screen: pygame.Surface, font: pygame.font.Font,
+                     topleft: Tuple[int, int] = (10, 50)) -> Optional[pygame.Rect]:
+        """
+        在界面之上绘制覆盖层（统计数据每 0.5 秒刷新一次），并保存被覆盖的画面供 erase_overlay 恢复
+        :return: 绘制区域（未显示时为 None）
+        """
+        if not self.overlay:
+            return None
+        now = time.perf_counter_ns()
+        if now - self._overlay_refreshed >= OVERLAY_REFRESH_NS:
+            self._refresh_overlay()
+            self._overlay_refreshed = now
+        
+        line_height = font.get_linesize()
+        surfaces = [render_text(font, text, True, color) for text, color in self._overlay_lines]
+        width = max(surface.get_width() for surface in surfaces) + 16
+        height = line_height * len(surfaces) + 12
+        
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        for i, surface in enumerate(surfaces):
+            panel.blit(surface, (8, 6 + i * line_height))
+        
+        rect = panel.get_rect(topleft=topleft).clip(screen.get_rect())
+        self._overlay_under = (screen.subsurface(rect).copy(), rect)
+        return screen.blit(panel, rect)
+
+# 全局分析器
+_profiler = None
+
+
+def get_profiler() -> FrameProfiler:
+    """获取全局帧耗时分析器"""
+    global _profiler
+    if _profiler is None:
+        _profiler = FrameProfiler()
+    return _profiler
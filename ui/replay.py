@@ -0,0 +1,82 @@
+"""
+回放运行器
+在无界面的情况下按最快速度重新执行一局回放，核对最终成绩是否与记录一致，
+可用于回归测试和核查有争议的高分。
+
+用法：python -m ui.replay storage/replays/<对局标识>.smr
+"""
+import argparse
+import copy
+import os
+import sys
+from typing import Tuple
+from core.mastery import MasteryTracker
+from core.replay import Replay
+
+
+# 回放时使用的画面大小（只影响画面布局，不影响成绩）
+SCREEN_SIZE = (1000, 800)
+
+# 核对成绩时忽略的字段（对局标识每次运行都不同）
+IGNORED_STATS = ('session_id',)
+
+
+def run_replay(replay: Replay) -> dict:
+    """
+    重新执行一局回放
+    :return: 结束时的游戏统计数据
+    """
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    import pygame
+    from ui.game_view import GameView
+    
+    pygame.init()
+    mastery = None
+    if replay.mastery is not None:
+        mastery = MasteryTracker(copy.deepcopy(replay.mastery))
+    view = GameView(pygame.Surface(SCREEN_SIZE), replay.settings, mastery=mastery,
+                    seed=replay.seed)
+    
+    events = replay.events
+    index = 0
+    for tick in range(replay.end_tick):
+        # 按键在第 tick 个逻辑步之前生效
+        while index < len(events) and events[index][0] == tick:
+            view.press_key(events[index][1])
+            index += 1
+        view.update(replay.step)
+    
+    return view.get_stats()
+
+
+def verify_replay(replay: Replay) -> Tuple[bool, dict]:
+    """
+    重新执行回放并与记录的成绩比较
+    :return: (是否一致, 重新执行得到的统计数据)
+    """
+    stats = run_replay(replay)
+    recorded = {key: value for key, value in (replay.stats or {}).items()
+                if key not in IGNORED_STATS}
+    replayed = {key: value for key, value in stats.items() if key not in IGNORED_STATS}
+    return recorded == replayed, stats
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description='速算闯关回放核对')
+    parser.add_argument('paths', nargs='+', help='回放文件')
+    args = parser.parse_args(argv)
+    
+    mismatched = 0
+    for path in args.paths:
+        replay = Replay.load(path)
+        matched, stats = verify_replay(replay)
+        mismatched += not matched
+        print(f"{'一致' if matched else '不一致'}  {path}  得分 {stats['score']}  "
+              f"答对 {stats['correct_count']}/{stats['total_questions']}  "
+              f"用时 {stats['elapsed_time']:.1f}秒")
+    return 1 if mismatched else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,266 @@
+"""
+精灵缓存模块
+预渲染游戏中反复绘制的图形，绘制时直接贴图，避免每帧重新创建表面
+"""
+import pygame
+from typing import Dict, Tuple
+
+
+# 怪兽颜色
+MONSTER_COLORS = [
+    (255, 100, 100),  # 红色怪物
+    (255, 150, 50),   # 橙色怪物
+    (200, 100, 200),  # 紫色怪物
+    (100, 150, 255),  # 蓝色怪物
+]
+
+# 缩放量化步长（消除动画中的缩放按此步长取整，限制缓存的尺寸数量）
+SCALE_STEP = 0.1
+
+# 尾焰闪烁各帧的火焰长度（第一帧为静止时的长度），以及帧内四周留白
+FLAME_LENGTHS = (1.0, 1.35, 1.15, 1.5, 1.2, 1.4)
+FLAME_MARGIN = 2
+
+# 子弹核心半径，以及尾迹各段的 (半径, 透明度) 和间距
+BULLET_RADIUS = 8
+BULLET_TRAIL = ((6, 255), (4, 175), (2, 95))
+BULLET_TRAIL_SPACING = 15
+
+
+def _finish(surface: pygame.Surface) -> pygame.Surface:
+    """已创建窗口时转换为显示格式，贴图更快"""
+    if pygame.display.get_surface() is not None:
+        return surface.convert_alpha()
+    return surface
+
+
+def render_monster(color: tuple, size: int) -> pygame.Surface:
+    """绘制👾样式的外星怪兽（不透明，透明度在贴图时通过 set_alpha 设置）"""
+    monster_surface = pygame.Surface((size * 2 + 20, size * 2 + 20), pygame.SRCALPHA)
+    base_x = size + 10
+    base_y = size + 10
+    
+    # 外星人身体（方形）
+    body_rect = pygame.Rect(base_x - size, base_y - size, size * 2, size * 2)
+    pygame.draw.rect(monster_surface, color, body_rect)
+    
+    # 触角（上方两个小方块）
+    antenna_size = size // 3
+    pygame.draw.rect(monster_surface, color, 
+                    (base_x - size // 2 - antenna_size // 2, base_y - size - antenna_size, 
+                     antenna_size, antenna_size))
+    pygame.draw.rect(monster_surface, color, 
+                    (base_x + size // 2 - antenna_size // 2, base_y - size - antenna_size, 
+                     antenna_size, antenna_size))
+    
+    # 眼睛（方形）
+    eye_size = size // 3
+    left_eye_x = base_x - size // 2
+    right_eye_x = base_x + size // 2 - eye_size
+    eye_y = base_y - size // 3
+    
+    pygame.draw.rect(monster_surface, (255, 255, 255),
+                    (left_eye_x, eye_y, eye_size, eye_size))
+    pygame.draw.rect(monster_surface, (255, 255, 255),
+                    (right_eye_x, eye_y, eye_size, eye_size))
+    
+    # 眼珠（小方块）
+    pupil_size = eye_size // 2
+    pygame.draw.rect(monster_surface, (0, 0, 0),
+                    (left_eye_x + eye_size // 4, eye_y + eye_size // 4, pupil_size, pupil_size))
+    pygame.draw.rect(monster_surface, (0, 0, 0),
+                    (right_eye_x + eye_size // 4, eye_y + eye_size // 4, pupil_size, pupil_size))
+    
+    # 嘴巴（锯齿状）
+    mouth_y = base_y + size // 4
+    tooth_width = size // 5
+    for i in range(5):
+        x = base_x - size + i * tooth_width * 2
+        if i % 2 == 0:
+            points = [
+                (x, mouth_y),
+                (x + tooth_width, mouth_y),
+                (x + tooth_width // 2, mouth_y + tooth_width)
+            ]
+            pygame.draw.polygon(monster_surface, (50, 50, 50), points)
+    
+    # 手臂（两侧小方块）
+    arm_size = size // 4
+    pygame.draw.rect(monster_surface, color,
+                    (base_x - size - arm_size, base_y, arm_size, size // 2))
+    pygame.draw.rect(monster_surface, color,
+                    (base_x + size, base_y, arm_size, size // 2))
+    
+    return _finish(monster_surface)
+
+
+def render_plane(size: int) -> pygame.Surface:
+    """绘制飞机机身（战斗机样式，不含尾焰），表面尺寸为 2 * size，飞机中心在表面中心"""
+    plane_surface = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+    center = size
+    
+    # 机身（三角形）
+    body_points = [
+        (center, center - size // 2),  # 顶部（机头）
+        (center - size // 3, center + size // 2),  # 左下
+        (center + size // 3, center + size // 2),  # 右下
+    ]
+    pygame.draw.polygon(plane_surface, (100, 200, 255), body_points)
+    pygame.draw.polygon(plane_surface, (50, 150, 200), body_points, 3)
+    
+    # 机翼（左右两侧）
+    # 左翼
+    left_wing = [
+        (center - size // 3, center),
+        (center - size, center + size // 4),
+        (center - size // 2, center + size // 3),
+    ]
+    pygame.draw.polygon(plane_surface, (80, 180, 230), left_wing)
+    
+    # 右翼
+    right_wing = [
+        (center + size // 3, center),
+        (center + size, center + size // 4),
+        (center + size // 2, center + size // 3),
+    ]
+    pygame.draw.polygon(plane_surface, (80, 180, 230), right_wing)
+    
+    # 驾驶舱（亮点）
+    pygame.draw.circle(plane_surface, (200, 230, 255), (center, center), size // 6)
+    
+    return _finish(plane_surface)
+
+
+def flame_origin(size: int) -> Tuple[int, int]:
+    """尾焰帧左上角相对于飞机中心的偏移"""
+    return -(size // 6) - FLAME_MARGIN, size // 2 - FLAME_MARGIN
+
+
+def render_flame_strip(size: int, lengths: Tuple[float, ...] = FLAME_LENGTHS) -> pygame.Surface:
+    """
+    绘制尾焰帧条：各帧等宽横向排列，帧的左上角贴在飞机中心加 flame_origin(size) 处
+    :param lengths: 各帧火焰长度（相对于静止时的长度，都不短于静止时，后一帧能完全盖住静止的火焰）
+    """
+    half = size // 6
+    frame_width = half * 2 + FLAME_MARGIN * 2 + 1
+    frame_height = int(size // 4 * max(lengths)) + FLAME_MARGIN * 2 + 1
+    strip = pygame.Surface((frame_width * len(lengths), frame_height), pygame.SRCALPHA)
+    for i, length in enumerate(lengths):
+        left = i * frame_width + FLAME_MARGIN
+        flame_points = [
+            (left, FLAME_MARGIN),
+            (left + half, FLAME_MARGIN + int(size // 4 * length)),
+            (left + half * 2, FLAME_MARGIN),
+        ]
+        pygame.draw.polygon(strip, (255, 150, 50), flame_points)
+        pygame.draw.polygon(strip, (255, 200, 100), flame_points, 2)
+    return _finish(strip)
+
+
+def render_bullet(color: tuple) -> pygame.Surface:
+    """
+    绘制子弹：核心圆点加三段逐渐变淡变小的尾迹，合成为一张表面
+    子弹中心在表面的 (BULLET_RADIUS, BULLET_RADIUS)，尾迹向下延伸
+    """
+    height = BULLET_RADIUS + (len(BULLET_TRAIL) - 1) * BULLET_TRAIL_SPACING + BULLET_TRAIL[-1][0]
+    surface = pygame.Surface((BULLET_RADIUS * 2, height + 1), pygame.SRCALPHA)
+    center = (BULLET_RADIUS, BULLET_RADIUS)
+    
+    # 子弹核心（彩色圆点加白色高光）
+    pygame.draw.circle(surface, color, center, BULLET_RADIUS)
+    pygame.draw.circle(surface, (255, 255, 255), center, 5)
+    
+    # 尾迹（各段互不重叠，直接写入带透明度的颜色，与逐段半透明贴图效果相同）
+    for i, (radius, alpha) in enumerate(BULLET_TRAIL):
+        pygame.draw.circle(surface, (*color, alpha),
+                           (BULLET_RADIUS, BULLET_RADIUS + i * BULLET_TRAIL_SPACING), radius)
+    return _finish(surface)
+
+
+def render_particle(color: tuple, radius: int, alpha: int) -> pygame.Surface:
+    """绘制粒子贴片：半透明实心圆，表面尺寸为 2 * radius"""
+    surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+    pygame.draw.circle(surface, (*color, alpha), (radius, radius), radius)
+    return _finish(surface)
+
+
+class SpriteCache:
+    """精灵缓存"""
+    
+    def __init__(self):
+        # 怪兽精灵：(颜色, 像素尺寸) -> Surface
+        self._monsters: Dict[Tuple[tuple, int], pygame.Surface] = {}
+        # 飞机机身、尾焰帧条和子弹（按尺寸或颜色缓存）
+        self._planes: Dict[int, pygame.Surface] = {}
+        self._flames: Dict[int, pygame.Surface] = {}
+        self._bullets: Dict[tuple, pygame.Surface] = {}
+        # 粒子贴片：(颜色, 半径, 透明度) -> Surface
+        self._particles: Dict[Tuple[tuple, int, int], pygame.Surface] = {}
+    
+    def get_monster(self, color: tuple, base_size: int, scale: float = 1.0) -> pygame.Surface:
+        """
+        获取怪兽精灵
+        :param color: 怪兽颜色
+        :param base_size: 基础尺寸
+        :param scale: 缩放（按 SCALE_STEP 量化）
+        """
+        level = max(1, round(scale / SCALE_STEP))
+        size = int(base_size * level * SCALE_STEP)
+        key = (color, size)
+        sprite = self._monsters.get(key)
+        if sprite is None:
+            sprite = render_monster(color, size)
+            self._monsters[key] = sprite
+        return sprite
+    
+    def get_plane(self, size: int) -> pygame.Surface:
+        """获取飞机机身精灵"""
+        sprite = self._planes.get(size)
+        if sprite is None:
+            sprite = render_plane(size)
+            self._planes[size] = sprite
+        return sprite
+    
+    def get_flame_strip(self, size: int) -> pygame.Surface:
+        """获取尾焰帧条（帧数为 len(FLAME_LENGTHS)，帧宽为帧条宽度除以帧数）"""
+        strip = self._flames.get(size)
+        if strip is None:
+            strip = render_flame_strip(size)
+            self._flames[size] = strip
+        return strip
+    
+    def get_bullet(self, color: tuple) -> pygame.Surface:
+        """获取子弹精灵（含尾迹）"""
+        sprite = self._bullets.get(color)
+        if sprite is None:
+            sprite = render_bullet(color)
+            self._bullets[color] = sprite
+        return sprite
+    
+    def get_particle(self, color: tuple, radius: int, alpha: int) -> pygame.Surface:
+        """获取粒子贴片（透明度预先画进贴片，贴图时不必再设置）"""
+        key = (color, radius, alpha)
+        sprite = self._particles.get(key)
+        if sprite is None:
+            sprite = render_particle(color, radius, alpha)
+            self._particles[key] = sprite
+        return sprite
+    
+    def prewarm_monsters(self, base_size: int, max_scale: float = 2.0):
+        """预渲染所有颜色在各缩放档位下的怪兽精灵"""
+        levels = int(round(max_scale / SCALE_STEP))
+        for color in MONSTER_COLORS:
+            for level in range(int(round(1.0 / SCALE_STEP)), levels + 1):
+                self.get_monster(color, base_size, level * SCALE_STEP)
+
+
+# 全局精灵缓存实例
+_sprite_cache = None
+
+
+def get_sprite_cache() -> SpriteCache:
+    """获取全局精灵缓存实例"""
+    global _sprite_cache
+    if _sprite_cache is None:
+        _sprite_cache = SpriteCache()
+    return _sprite_cache